@@ -0,0 +1,135 @@
+import argparse
+import csv
+import time
+from password_policy import CLASSES, DEFAULT_POLICY, PasswordPolicy
+from money import from_cents, to_cents
+from passwords import hash_password
+from storage import get_backend
+
+# Accounts checked, hashed and stored together
+BATCH_SIZE = 10000
+# Columns of the report file, one row per account that was not imported
+REPORT_HEADER = ["line", "username", "rule", "reason"]
+# Rules an account can break besides the password policy
+MALFORMED = "malformed"
+TAKEN = "taken"
+
+# Function to read accounts from a CSV file with username and password columns, and optionally wallet
+# Yields (line number, username, password, wallet in cents); password is None when the row cannot be used
+def read_accounts(file_path):
+    with open(file_path, "r", newline="") as file:
+        reader = csv.DictReader(file)
+        for row in reader:
+            username = (row.get("username") or "").strip()
+            password = row.get("password")
+            try:
+                # to_cents refuses nan and inf, which User() could not hold later
+                wallet_cents = to_cents(row.get("wallet") or 0)
+            except ValueError:
+                wallet_cents = None
+            if not username or password is None or wallet_cents is None or wallet_cents < 0:
+                yield reader.line_num, username, None, 0
+            else:
+                yield reader.line_num, username, password, wallet_cents
+
+#Imports user accounts from a CSV file, checking a batch of passwords at a time against a policy
+#Accounts whose password breaks the policy, whose username is taken or that are malformed are
+#counted by rule and can be written to a report; check_only stops before anything is stored
+class AccountImport:
+    def __init__(self, backend=None, policy=DEFAULT_POLICY, iterations=None, check_only=False):
+        self.backend = backend if backend is not None else get_backend()
+        self.policy = policy
+        self.iterations = iterations
+        self.check_only = check_only
+        # Rule -> number of accounts that broke it, and "ok" for the accepted ones
+        self.counts = {}
+        # Usernames accepted so far, so a file cannot create the same user twice
+        self.seen = set()
+
+    # Method to count an outcome
+    def count(self, rule):
+        self.counts[rule] = self.counts.get(rule, 0) + 1
+
+    # Method to describe a rule that was broken
+    def describe(self, rule):
+        if rule == MALFORMED:
+            return "missing username or password, or a wallet that is negative or not an amount"
+        if rule == TAKEN:
+            return "username already exists"
+        return "password " + self.policy.describe(rule)
+
+    # Method to check and import one batch of (line, username, password, wallet in cents) accounts
+    # Returns the rejected ones as (line, username, rule)
+    def process(self, batch):
+        rejected = []
+        usable = [account for account in batch if account[2] is not None]
+        for line, username, password, wallet_cents in batch:
+            if password is None:
+                rejected.append((line, username, MALFORMED))
+        accepted = []
+        for (line, username, password, wallet_cents), rule in zip(usable, self.policy.check_many([account[2] for account in usable])):
+            if rule is None and (username in self.seen or self.backend.get_user(username) is not None):
+                rule = TAKEN
+            if rule is not None:
+                rejected.append((line, username, rule))
+                continue
+            self.seen.add(username)
+            accepted.append((username, password, wallet_cents))
+        for line, username, rule in rejected:
+            self.count(rule)
+        self.counts["ok"] = self.counts.get("ok", 0) + len(accepted)
+        if accepted and not self.check_only:
+            self.backend.add_users([{"username": username, "password": hash_password(password, self.iterations),
+                                     "wallet": from_cents(wallet_cents)} for username, password, wallet_cents in accepted])
+        rejected.sort()
+        return rejected
+
+    # Method to import every account of a file, writing the rejected ones to report_path if given
+    def run(self, file_path, report_path=None):
+        report = open(report_path, "w", newline="") if report_path else None
+        try:
+            writer = csv.writer(report) if report else None
+            if writer:
+                writer.writerow(REPORT_HEADER)
+            batch = []
+            for account in read_accounts(file_path):
+                batch.append(account)
+                if len(batch) == BATCH_SIZE:
+                    self.write_report(writer, self.process(batch))
+                    batch = []
+            if batch:
+                self.write_report(writer, self.process(batch))
+        finally:
+            if report:
+                report.close()
+        return self.counts
+
+    # Method to write rejected accounts to the report
+    def write_report(self, writer, rejected):
+        if writer:
+            writer.writerows([line, username, rule, self.describe(rule)] for line, username, rule in rejected)
+
+# Function to run an import from the command line and report what happened
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Import user accounts from a CSV file with username,password[,wallet]")
+    parser.add_argument("accounts", help="CSV file of accounts")
+    parser.add_argument("--report", help="CSV file to list the accounts that were not imported in")
+    parser.add_argument("--check-only", action="store_true", help="only check the passwords, store nothing")
+    parser.add_argument("--min-length", type=int, default=DEFAULT_POLICY.min_length)
+    parser.add_argument("--require", nargs="*", choices=CLASSES, default=DEFAULT_POLICY.required,
+                        help="character classes a password must contain")
+    parser.add_argument("--iterations", type=int, help="PBKDF2 iterations for the imported passwords")
+    options = parser.parse_args(arguments)
+    policy = PasswordPolicy(options.min_length, options.require)
+    start = time.perf_counter()
+    importer = AccountImport(policy=policy, iterations=options.iterations, check_only=options.check_only)
+    counts = importer.run(options.accounts, options.report)
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print("%d accounts in %.2f s: %.0f accounts/s" % (total, elapsed, total / elapsed if elapsed else 0))
+    for rule, count in sorted(counts.items(), key=lambda item: -item[1]):
+        print("  %-10s %d" % (rule, count))
+    return importer
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks on this platform, writers rely on the atomic rename alone
+    fcntl = None
+
+# Function to take an advisory lock on an open file (no-op without fcntl)
+def lock_file(file, exclusive):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+# Function to release an advisory lock taken with lock_file
+def unlock_file(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+# Function to make a rename in a directory survive a crash (not possible on every platform)
+def fsync_directory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+# Function to replace a file with what is written inside the with block, all at once or not at all
+# The data goes to a unique temporary file next to it, which is renamed over the file once it is
+# complete, so readers and crashes only ever see the old or the new contents.
+# durable: fsync the data and the directory before returning (skip it for files that can be rebuilt)
+# lock: hold an exclusive advisory lock on path + ".lock" meanwhile, so writers take turns
+@contextmanager
+def atomic_write(path, mode="w", newline=None, durable=True, lock=False):
+    directory = os.path.dirname(os.path.abspath(path))
+    lock_handle = None
+    if lock:
+        lock_handle = open(path + ".lock", "ab")
+        lock_file(lock_handle, exclusive=True)
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode, newline=newline) as file:
+                # mkstemp makes the file private, keep the permissions the old file had
+                try:
+                    os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+                except FileNotFoundError:
+                    os.chmod(temp_path, 0o644)
+                yield file
+                file.flush()
+                if durable:
+                    os.fsync(file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        if durable:
+            fsync_directory(directory)
+    finally:
+        if lock_handle is not None:
+            unlock_file(lock_handle)
+            lock_handle.close()
@@ -0,0 +1,292 @@
+import argparse
+import csv
+import json
+import time
+from itertools import islice
+from checkout_and_payment import ShoppingCart, User, checkout, load_products
+from console import BufferedConsole
+from money import format_cents, from_cents
+from storage import get_backend
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Columns of the results file, one row per order
+RESULT_HEADER = ["order", "username", "status", "charged", "message"]
+# Orders priced together by the vectorized stage
+CHUNK_SIZE = 10000
+
+# Function to turn "Apple:2;Banana" into {"Apple": 2, "Banana": 1}
+def parse_items(text):
+    items = {}
+    for part in text.split(";"):
+        name, _, quantity = part.strip().rpartition(":")
+        if not name:
+            name, quantity = quantity, "1"
+        if name:
+            items[name] = items.get(name, 0) + int(quantity)
+    return items
+
+# Function to read an order file one order at a time, as (username, items) pairs
+# .jsonl files hold {"username": ..., "items": {"Apple": 2} or ["Apple", "Apple"]} per line,
+# other files are CSV with username and items columns, items written like "Apple:2;Banana"
+# A malformed order comes out with items set to None, so it can be reported and skipped
+def read_orders(file_path):
+    with open(file_path, "r", newline="") as file:
+        if file_path.endswith(".jsonl"):
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    order = json.loads(line)
+                    items = order["items"]
+                    if isinstance(items, list):
+                        counted = {}
+                        for name in items:
+                            counted[name] = counted.get(name, 0) + 1
+                        items = counted
+                    yield order["username"], {name: int(quantity) for name, quantity in items.items()}
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    yield None, None
+        else:
+            for row in csv.DictReader(file):
+                try:
+                    yield row["username"], parse_items(row["items"])
+                except (ValueError, KeyError, AttributeError):
+                    yield row.get("username"), None
+
+#Checks out many orders in one run with the same rules as checkout(): the wallet must cover
+#the order, only units in stock are sold and sold-out products leave the inventory
+#Everything happens in memory; what the run spent and sold is written to the backend once, by finish()
+#With NumPy, orders are priced a chunk at a time (see process_chunk), with the same results
+class BatchCheckout:
+    def __init__(self, backend=None, products=None, vectorized=True):
+        self.backend = backend if backend is not None else get_backend()
+        self.products = products if products is not None else load_products(self.backend)
+        # Name -> product, kept after a product sells out so later orders are told it is out of stock
+        self.by_name = {}
+        for product in self.products:
+            self.by_name.setdefault(product.name, product)
+        self.menu = list(self.products)
+        # Units of each menu product when the run started, finish() writes only what was sold since
+        self.start_units = [product.units for product in self.menu]
+        self.vectorized = vectorized and numpy is not None
+        if self.vectorized:
+            # Column of each product in the quantity matrix, and the price of each column
+            self.column = {}
+            for position, product in enumerate(self.menu):
+                self.column.setdefault(product.name, position)
+            self.prices = numpy.array([product.price_cents for product in self.menu], dtype=numpy.int64)
+        # Username -> User, or None for usernames that do not exist
+        self.users = {}
+        # Username -> wallet in cents when the user was looked up, finish() writes only what was spent since
+        self.start_wallets = {}
+        self.changed = set()
+        self.console = BufferedConsole()
+        self.ok = 0
+        self.rejected = 0
+
+    # Method to get the user for a username, looking it up in the backend once
+    def user(self, username):
+        if username not in self.users:
+            entry = self.backend.get_user(username)
+            self.users[username] = None if entry is None else User(entry["username"], entry["wallet"])
+            if entry is not None:
+                self.start_wallets[username] = self.users[username].wallet_cents
+        return self.users[username]
+
+    # Method to check out one order, returns (status, cents charged, message)
+    def process(self, username, items):
+        if items is None:
+            return self.reject("invalid order")
+        user = self.user(username)
+        if user is None:
+            return self.reject("unknown user")
+        cart = ShoppingCart()
+        for name, quantity in items.items():
+            product = self.by_name.get(name)
+            if product is None:
+                return self.reject("unknown product %s" % name)
+            if quantity < 0:
+                return self.reject("invalid quantity for %s" % name)
+            cart.add_item(product, quantity)
+        before = user.wallet_cents
+        self.console.parts = []
+        bought = checkout(user, cart, self.products, console=self.console)
+        message = " ".join(line for line in self.console.getvalue().splitlines() if line.strip())
+        if not bought:
+            return self.reject(message)
+        self.ok += 1
+        self.changed.add(username)
+        return "ok", before - user.wallet_cents, message
+
+    # Method to check out a chunk of orders, returns the (status, cents charged, message) of each
+    # The totals of all orders come from one product of the quantity matrix and the price column.
+    # An order is settled in bulk when its outcome cannot depend on the orders around it: its user
+    # can pay for all of their orders in the chunk, and none of its products is wanted by the chunk
+    # more than it is stocked. The other orders go through process() one at a time, in order.
+    def process_chunk(self, chunk):
+        results = [None] * len(chunk)
+        # The quantity matrix in sparse form: one (row, column, quantity) entry per order line
+        rows, columns, quantities = [], [], []
+        candidates, owners, slots, users = [], [], {}, []
+        single, held_back = [], set()
+        # Stock the orders handled one at a time may take, as (column, quantity) pairs
+        single_columns, single_quantities = [], []
+        for position, (username, items) in enumerate(chunk):
+            user = self.user(username) if items is not None else None
+            known = user is not None and items and all(name in self.column and quantity > 0
+                                                       for name, quantity in items.items())
+            if not known:
+                # Rejections and odd orders keep the exact per-order rules and messages
+                single.append(position)
+                held_back.add(username)
+                # They can still buy, e.g. an order with a zero line, so they count towards what is wanted
+                for name, quantity in (items or {}).items():
+                    if name in self.column and quantity > 0:
+                        single_columns.append(self.column[name])
+                        single_quantities.append(quantity)
+                continue
+            row = len(candidates)
+            candidates.append(position)
+            if username not in slots:
+                slots[username] = len(users)
+                users.append(user)
+            owners.append(slots[username])
+            for name, quantity in items.items():
+                rows.append(row)
+                columns.append(self.column[name])
+                quantities.append(quantity)
+
+        if candidates:
+            rows = numpy.array(rows, dtype=numpy.int64)
+            columns = numpy.array(columns, dtype=numpy.int64)
+            quantities = numpy.array(quantities, dtype=numpy.int64)
+            owners = numpy.array(owners, dtype=numpy.int64)
+            count = len(candidates)
+            totals = numpy.zeros(count, dtype=numpy.int64)
+            numpy.add.at(totals, rows, self.prices[columns] * quantities)
+
+            # Running spend of each user over their orders in chunk order, in a single pass
+            wallets = numpy.array([user.wallet_cents for user in users], dtype=numpy.int64)
+            by_user = numpy.argsort(owners, kind="stable")
+            running = numpy.cumsum(totals[by_user])
+            before = running - totals[by_user]
+            first = numpy.ones(count, dtype=bool)
+            first[1:] = owners[by_user][1:] != owners[by_user][:-1]
+            group_start = numpy.maximum.accumulate(numpy.where(first, numpy.arange(count), 0))
+            spent = numpy.empty(count, dtype=numpy.int64)
+            spent[by_user] = running - before[group_start]
+            short_of_money = spent > wallets[owners]
+
+            # Products the chunk wants more of than there is, counting every order in it
+            all_columns = numpy.concatenate([columns, numpy.array(single_columns, dtype=numpy.int64)])
+            all_quantities = numpy.concatenate([quantities, numpy.array(single_quantities, dtype=numpy.int64)])
+            touched = numpy.unique(all_columns)
+            stock = numpy.zeros(len(self.menu), dtype=numpy.int64)
+            stock[touched] = [self.menu[column].units if self.menu[column] in self.products else 0
+                              for column in touched]
+            wanted = numpy.bincount(all_columns, weights=all_quantities, minlength=len(self.menu)).astype(numpy.int64)
+            contested = wanted > stock
+            short_of_stock = numpy.bincount(rows, weights=contested[columns], minlength=count) > 0
+
+            # A user with any order that needs the exact rules has all their orders handled that way
+            held_back = [slots[username] for username in held_back if username in slots]
+            needs_order = numpy.union1d(owners[short_of_money | short_of_stock], held_back)
+            sequential = numpy.isin(owners, needs_order)
+            bulk = ~sequential
+
+            # Settle the bulk orders: stock and wallets change by their sums
+            bulk_lines = bulk[rows]
+            sold = numpy.bincount(columns[bulk_lines], weights=quantities[bulk_lines],
+                                  minlength=len(self.menu)).astype(numpy.int64)
+            for column in numpy.flatnonzero(sold):
+                self.products.decrement(self.menu[column], int(sold[column]))
+            spend = numpy.zeros(len(users), dtype=numpy.int64)
+            numpy.add.at(spend, owners[bulk], totals[bulk])
+            for slot in numpy.flatnonzero(spend):
+                users[slot].wallet_cents -= int(spend[slot])
+                self.changed.add(users[slot].name)
+            remaining = wallets[owners] - spent
+            # Plain ints from here on, indexing arrays one element at a time is slow
+            settled = numpy.flatnonzero(bulk)
+            for row, owner, total, left in zip(settled.tolist(), owners[settled].tolist(),
+                                               totals[settled].tolist(), remaining[settled].tolist()):
+                message = f"Thank you for your purchase, {users[owner].name}! Your remaining balance is {from_cents(left)}"
+                results[candidates[row]] = ("ok", total, message)
+            self.ok += int(bulk.sum())
+            single.extend(candidates[row] for row in numpy.flatnonzero(sequential))
+
+        # The rest, in their original order
+        for position in sorted(single):
+            results[position] = self.process(*chunk[position])
+        return results
+
+    # Method to count a rejected order
+    def reject(self, message):
+        self.rejected += 1
+        return "rejected", 0, message
+
+    # Method to check out every order in a file, writing one result row per order as it goes
+    def run(self, orders_path, results_path=None):
+        output = open(results_path, "w", newline="") if results_path else None
+        try:
+            writer = csv.writer(output) if output else None
+            if writer:
+                writer.writerow(RESULT_HEADER)
+            orders = read_orders(orders_path)
+            number = 0
+            while True:
+                chunk = list(islice(orders, CHUNK_SIZE))
+                if not chunk:
+                    break
+                if self.vectorized:
+                    results = self.process_chunk(chunk)
+                else:
+                    results = [self.process(username, items) for username, items in chunk]
+                if writer:
+                    for (username, items), (status, charged, message) in zip(chunk, results):
+                        number += 1
+                        writer.writerow([number, username, status, format_cents(charged), message])
+        finally:
+            if output:
+                output.close()
+        self.finish()
+
+    # Method to write what was spent and sold to the backend, once for the whole run
+    # Written as amounts to take off, so changes others made to the same wallets and stock meanwhile are kept
+    def finish(self):
+        debits = {}
+        for username in sorted(self.changed):
+            user = self.users[username]
+            debits[username] = self.start_wallets[username] - user.wallet_cents
+            self.start_wallets[username] = user.wallet_cents
+        sold = {}
+        for position, product in enumerate(self.menu):
+            if product.units != self.start_units[position]:
+                sold[product] = self.start_units[position] - product.units
+                self.start_units[position] = product.units
+        self.backend.debit_wallets(debits)
+        self.backend.sell_stock(sold)
+        self.changed = set()
+
+# Function to run a batch from the command line and report the throughput
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Check out a file of orders in one run")
+    parser.add_argument("orders", help="orders as .jsonl or .csv")
+    parser.add_argument("--results", help="CSV file to write one result row per order to")
+    parser.add_argument("--per-order", action="store_true", help="check out orders one by one, without NumPy")
+    options = parser.parse_args(arguments)
+    start = time.perf_counter()
+    batch = BatchCheckout(vectorized=not options.per_order)
+    batch.run(options.orders, options.results)
+    elapsed = time.perf_counter() - start
+    total = batch.ok + batch.rejected
+    print("%d orders in %.2f s: %.0f orders/s (%d ok, %d rejected)"
+          % (total, elapsed, total / elapsed if elapsed else 0, batch.ok, batch.rejected))
+    return batch
+
+if __name__ == "__main__":
+    main()
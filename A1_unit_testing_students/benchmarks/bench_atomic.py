@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from atomic import atomic_write
+
+# Function to overwrite the file in place, the way the data files used to be written
+def write_in_place(path, data):
+    with open(path, "w") as file:
+        file.write(data)
+
+# Function to write the file through atomic_write
+def write_atomic(path, data, **options):
+    with atomic_write(path, **options) as file:
+        file.write(data)
+
+# Ways of writing a file that are compared, as name -> function(path, data)
+WRITERS = {
+    "in place": write_in_place,
+    "atomic, no fsync": lambda path, data: write_atomic(path, data, durable=False),
+    "atomic": write_atomic,
+    "atomic + lock": lambda path, data: write_atomic(path, data, lock=True),
+}
+
+# Function to time repeated writes of data, returns writes per second
+def run(writer, data, seconds):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "users.json")
+        count = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            writer(path, data)
+            count += 1
+        return count / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark writing a data file in place and atomically")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000], help="bytes per write")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time spent on each case")
+    options = parser.parse_args()
+    for size in options.sizes:
+        data = "x" * size
+        for name, writer in WRITERS.items():
+            rate = run(writer, data, options.seconds)
+            print("%9d bytes  %-17s %9.0f writes/s  %8.1f MB/s" % (size, name, rate, rate * size / 1e6))
+
+if __name__ == "__main__":
+    main()
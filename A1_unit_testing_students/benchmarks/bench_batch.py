@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from batch import BatchCheckout
+from snapshot import snapshot_path
+from storage import FileBackend
+from user_store import reset_user_stores
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Function to write the data files and an order file for the benchmark
+def make_files(directory, orders, users):
+    with open(os.path.join(ROOT, "products.csv")) as file:
+        lines = file.read().splitlines()
+    names = [line.split(",")[0] for line in lines[1:]]
+    # Enough stock that most orders go through, few enough that some products sell out
+    with open(os.path.join(directory, "products.csv"), "w") as file:
+        file.write("\n".join([lines[0]] + [line.rsplit(",", 1)[0] + ",%d" % (orders // 20) for line in lines[1:]]) + "\n")
+    with open(os.path.join(directory, "users.json"), "w") as file:
+        json.dump([{"username": "user%d" % i, "password": "Passw0rd!", "wallet": 5000} for i in range(users)], file, indent=4)
+    rng = random.Random(1)
+    orders_path = os.path.join(directory, "orders.jsonl")
+    with open(orders_path, "w") as file:
+        for _ in range(orders):
+            items = {rng.choice(names): rng.randint(1, 3) for _ in range(rng.randint(1, 4))}
+            file.write(json.dumps({"username": "user%d" % rng.randrange(users), "items": items}) + "\n")
+    return orders_path
+
+# Function to run one batch over fresh copies of the data files, returns the BatchCheckout and seconds taken
+def run_batch(directory, orders_path, vectorized):
+    for name in ("products.csv", "users.json"):
+        target = os.path.join(directory, "run-" + name)
+        # The previous run's journal and snapshots would be replayed on top of the fresh copy
+        for leftover in (target + ".journal", snapshot_path(target)):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        shutil.copy(os.path.join(directory, name), target)
+    reset_user_stores()
+    backend = FileBackend(os.path.join(directory, "run-users.json"), os.path.join(directory, "run-products.csv"))
+    start = time.perf_counter()
+    batch = BatchCheckout(backend, vectorized=vectorized)
+    batch.run(orders_path, os.path.join(directory, "results-%s.csv" % ("vectorized" if vectorized else "loop")))
+    return batch, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch checkout, priced per order and a chunk at a time")
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--mode", choices=["loop", "vectorized", "both"], default="both")
+    options = parser.parse_args()
+    modes = {"loop": [False], "vectorized": [True], "both": [False, True]}[options.mode]
+    with tempfile.TemporaryDirectory() as directory:
+        orders_path = make_files(directory, options.orders, options.users)
+        for vectorized in modes:
+            batch, elapsed = run_batch(directory, orders_path, vectorized)
+            total = batch.ok + batch.rejected
+            print("%-10s %d orders in %.1f s: %.0f orders/s (%d ok, %d rejected)"
+                  % ("vectorized" if batch.vectorized else "loop", total, elapsed, total / elapsed, batch.ok, batch.rejected))
+        if len(modes) == 2:
+            with open(os.path.join(directory, "results-loop.csv")) as loop, \
+                    open(os.path.join(directory, "results-vectorized.csv")) as vectorized:
+                print("results identical:", loop.read() == vectorized.read())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_search import make_catalog
+from checkout_and_payment import load_products_from_csv
+from product_table import load_product_columns, numpy
+
+def main():
+    if numpy is None:
+        print("numpy not installed, skipping")
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        path = make_catalog(directory, 200_000)
+        start = time.perf_counter()
+        products = load_products_from_csv(path)
+        objects = time.perf_counter() - start
+
+        start = time.perf_counter()
+        columns = load_product_columns(path)
+        columnar = time.perf_counter() - start
+        print("load %d products: objects %.0f ms, columns %.0f ms" % (len(products), objects * 1000, columnar * 1000))
+
+        start = time.perf_counter()
+        value = sum(product.price_cents * product.units for product in products)
+        loop = time.perf_counter() - start
+        start = time.perf_counter()
+        assert columns.total_value() == value
+        low = columns.low_stock(5)
+        vector = time.perf_counter() - start
+        print("total value + low stock: loop %.1f ms, vectorized %.1f ms (%d low)" % (loop * 1000, vector * 1000, len(low)))
+
+if __name__ == "__main__":
+    main()
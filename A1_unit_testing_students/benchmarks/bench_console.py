@@ -0,0 +1,84 @@
+import io
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from checkout_and_payment import reset_inventories
+from console import ScriptedConsole
+from products import searchAndBuyProduct
+from ratelimit import LoginLimiter, set_login_limiter
+from snapshot import load_product_records
+from storage import set_backend
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SCRIPT = ["Ramanathan", "Notaproblem23*", "apple", "n", "all", "y", "1", "2", "c", "y", "l"]
+
+# Users and products kept in memory, so the timings are of the flow and its I/O, not of fsync
+class MemoryBackend:
+    def __init__(self):
+        self.users = {"Ramanathan": {"username": "Ramanathan", "password": "Notaproblem23*", "wallet": 10 ** 9}}
+
+    def get_user(self, username):
+        return self.users.get(username)
+
+    def add_user(self, username, password, wallet=0):
+        if username in self.users:
+            return None
+        self.users[username] = {"username": username, "password": password, "wallet": wallet}
+        return self.users[username]
+
+    def update_wallet(self, username, wallet):
+        self.users[username]["wallet"] = wallet
+
+    def set_password(self, username, password):
+        self.users[username]["password"] = password
+
+    def products_source(self):
+        return ("memory", id(self))
+
+    def product_records(self):
+        return load_product_records(os.path.join(ROOT, "products.csv"))
+
+    def commit_checkout(self, username, total_cents, sold):
+        return True
+
+# Function to run sessions the old way: input() patched and every line written to a line-buffered stdout
+def run_patched(count):
+    with open(os.devnull, "w") as devnull:
+        terminal = io.TextIOWrapper(devnull.buffer, line_buffering=True)
+        start = time.perf_counter()
+        for _ in range(count):
+            # Every session starts from full stock, as if it were the only shopper
+            reset_inventories()
+            with mock.patch("builtins.input", side_effect=SCRIPT), mock.patch("sys.stdout", terminal):
+                searchAndBuyProduct()
+        elapsed = time.perf_counter() - start
+        terminal.detach()
+    return count / elapsed
+
+# Function to run sessions with a scripted console, keeping each transcript in memory
+def run_scripted(count):
+    start = time.perf_counter()
+    for _ in range(count):
+        reset_inventories()
+        searchAndBuyProduct(ScriptedConsole(SCRIPT))
+    return count / (time.perf_counter() - start)
+
+def main():
+    os.chdir(ROOT)
+    set_backend(MemoryBackend())
+    # Every session logs the same user in, far more often than the default limits allow
+    set_login_limiter(LoginLimiter(user_burst=10 ** 9))
+    try:
+        for label, run in (("patched input()/stdout", run_patched), ("ScriptedConsole", run_scripted)):
+            run(50)
+            print("%-24s %7.0f sessions/s" % (label, max(run(1000) for _ in range(3))))
+    finally:
+        set_backend(None)
+        set_login_limiter(None)
+
+if __name__ == "__main__":
+    main()
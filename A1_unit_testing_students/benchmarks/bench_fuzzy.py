@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_search import make_catalog, regex_scan
+from search_index import build_search_index
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for count in (10_000, 100_000, 1_000_000):
+            file_path = make_catalog(directory, count)
+            # A misspelling of a name in the catalog
+            query = "salmn lamp %d" % (count // 2)
+
+            start = time.perf_counter()
+            regex_scan(file_path, query)
+            scan = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            index = build_search_index(file_path)
+            build = (time.perf_counter() - start) * 1000
+            distinct = len(index.postings)
+
+            repeats = 5
+            start = time.perf_counter()
+            for _ in range(repeats):
+                results = index.fuzzy_search(query, threshold=0.4, limit=5)
+            fuzzy = (time.perf_counter() - start) / repeats * 1000
+
+            print("%8d rows: regex scan %9.1f ms, fuzzy %8.2f ms (build %.0f ms, %d distinct trigrams), best: %s"
+                  % (count, scan, fuzzy, build, distinct, results[0][1][0] if results else None))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_search import make_catalog
+from catalog import _catalogs
+from checkout_and_payment import load_products_from_csv
+
+# Function to load a catalog and read a few products, returning the two times
+def run(file_path, lazy):
+    _catalogs.clear()
+    start = time.perf_counter()
+    products = load_products_from_csv(file_path, lazy=lazy)
+    loaded = time.perf_counter() - start
+    for position in (0, len(products) // 2, len(products) - 1):
+        products[position].get_product()
+    return loaded, time.perf_counter() - start
+
+# Function to time a run, then repeat it to find the memory it allocates
+# (tracemalloc slows the code down, so it is not on while timing)
+def measure(file_path, lazy):
+    loaded, used = run(file_path, lazy)
+    tracemalloc.start()
+    run(file_path, lazy)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return loaded, used, peak
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for count in (10_000, 100_000, 500_000):
+            file_path = make_catalog(directory, count)
+            for lazy in (False, True):
+                loaded, used, peak = measure(file_path, lazy)
+                print("%9d rows %-5s: load %8.2f ms, load + 3 reads %8.1f ms, peak %7.1f MB"
+                      % (count, "lazy" if lazy else "eager", loaded * 1000, used * 1000, peak / 1e6))
+
+if __name__ == "__main__":
+    main()
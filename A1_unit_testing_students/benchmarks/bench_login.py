@@ -0,0 +1,54 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from user_store import UserStore
+
+# Old login lookup: parse the whole file and scan every entry
+def linear_lookup(file_path, username, password):
+    with open(file_path, "r") as file:
+        data = json.load(file)
+        for entry in data:
+            if entry["username"] == username:
+                return entry["password"] == password
+    return None
+
+# Function to write a user file with the given number of users
+def make_users_file(directory, count):
+    file_path = os.path.join(directory, "users_%d.json" % count)
+    with open(file_path, "w") as file:
+        json.dump([{"username": "user%d" % i, "password": "Passw0rd!%d" % i, "wallet": i % 200}
+                   for i in range(count)], file, indent=4)
+    return file_path
+
+# Function to time a lookup function, returning the mean latency in microseconds
+def time_lookups(lookup, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        lookup()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+def main():
+    print("%10s %16s %16s %10s" % ("users", "linear (us)", "UserStore (us)", "speedup"))
+    with tempfile.TemporaryDirectory() as directory:
+        for count in (50, 10_000, 1_000_000):
+            file_path = make_users_file(directory, count)
+            # The last user is the worst case for the linear scan
+            username = "user%d" % (count - 1)
+            password = "Passw0rd!%d" % (count - 1)
+
+            linear_repeats = max(3, 200_000 // count)
+            linear = time_lookups(lambda: linear_lookup(file_path, username, password), linear_repeats)
+
+            store = UserStore(file_path)
+            store.refresh()
+            indexed = time_lookups(lambda: store.get_user(username)["password"] == password, 100_000)
+
+            print("%10d %16.1f %16.2f %9.0fx" % (count, linear, indexed, linear / indexed))
+
+if __name__ == "__main__":
+    main()
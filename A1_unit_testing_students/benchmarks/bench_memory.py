@@ -0,0 +1,52 @@
+import csv
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_search import make_catalog
+from checkout_and_payment import Product
+from money import to_cents
+from product_table import ProductTable
+
+# Product as it was before __slots__: the same fields, kept in a per-instance __dict__
+class DictProduct:
+    def __init__(self, name, price, units, product_id=None):
+        self.name = name
+        self.price_cents = to_cents(price)
+        self.units = int(units)
+        self.product_id = product_id
+
+def load_dict_products(file_path):
+    with open(file_path, newline='') as csvfile:
+        return [DictProduct(row['Product'], row['Price'], row['Units'], i) for i, row in enumerate(csv.DictReader(csvfile))]
+
+def load_slot_products(file_path):
+    with open(file_path, newline='') as csvfile:
+        return [Product(row['Product'], row['Price'], row['Units'], i) for i, row in enumerate(csv.DictReader(csvfile))]
+
+# Function to measure the memory kept alive by the result of a loader, in bytes
+def retained_bytes(loader, file_path):
+    gc.collect()
+    tracemalloc.start()
+    result = loader(file_path)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+def main():
+    count = 200_000
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = make_catalog(directory, count)
+        print("bytes per product for %d products" % count)
+        for label, loader in (("dict Product", load_dict_products),
+                              ("__slots__ Product", load_slot_products),
+                              ("ProductTable", ProductTable.from_csv)):
+            print("  %-18s %6.1f" % (label, retained_bytes(loader, file_path) / count))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import io
+import os
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import money
+from checkout_and_payment import Inventory, Product, ShoppingCart, User, checkout
+
+# The same user, product, cart and checkout logic as checkout_and_payment.py, but with
+# float money as it was before amounts moved to cents
+class FloatUser:
+    def __init__(self, name, wallet):
+        self.name = name
+        self.wallet = float(wallet)
+
+class FloatProduct:
+    def __init__(self, name, price, units):
+        self.name = name
+        self.price = float(price)
+        self.units = int(units)
+
+class FloatCart:
+    def __init__(self):
+        self.quantities = {}
+        self.total_price = 0.0
+        self.unit_count = 0
+
+    def add_item(self, product, quantity=1):
+        if product is None or quantity == 0:
+            return
+        if quantity < 0:
+            raise ValueError("quantity must not be negative")
+        self.quantities[product] = self.quantities.get(product, 0) + quantity
+        self.total_price += product.price * quantity
+        self.unit_count += quantity
+
+    def clear_items(self):
+        self.quantities = {}
+        self.total_price = 0.0
+        self.unit_count = 0
+
+def float_checkout(user, cart, products):
+    if not cart.quantities:
+        print("Your basket is empty. Please add items before checking out.")
+        return
+    total_price = cart.total_price
+    if total_price > user.wallet:
+        print("You don't have enough money to complete the purchase.")
+        return
+    user.wallet -= total_price
+    for item, quantity in cart.quantities.items():
+        item.units -= quantity
+        if item.units <= 0 and item in products:
+            products.remove(item)
+    cart.clear_items()
+    print("\n")
+    print(f"Thank you for your purchase, {user.name}! Your remaining balance is {user.wallet}")
+
+# Functions to run checkouts of the same carts, returning checkouts per second and the final wallet
+def run_float(prices, carts):
+    products = [FloatProduct("P%d" % i, price, 10 ** 9) for i, price in enumerate(prices)]
+    user = FloatUser("bench", 10 ** 9)
+    sink = io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(sink):
+        for cart_items in carts:
+            cart = FloatCart()
+            for i in cart_items:
+                cart.add_item(products[i])
+            float_checkout(user, cart, products)
+            sink.seek(0)
+            sink.truncate()
+    return len(carts) / (time.perf_counter() - start), user.wallet
+
+def run_cents(prices, carts):
+    products = [Product("P%d" % i, price, 10 ** 9, i) for i, price in enumerate(prices)]
+    inventory = Inventory(products)
+    user = User("bench", 10 ** 9)
+    sink = io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(sink):
+        for cart_items in carts:
+            cart = ShoppingCart()
+            for i in cart_items:
+                cart.add_item(products[i])
+            checkout(user, cart, inventory)
+            sink.seek(0)
+            sink.truncate()
+    return len(carts) / (time.perf_counter() - start), user.wallet
+
+def main():
+    rng = random.Random(1)
+    prices = ["%d.%02d" % (rng.randint(0, 50), rng.randint(0, 99)) for _ in range(1000)]
+    carts = [[rng.randrange(1000) for _ in range(rng.randint(1, 20))] for _ in range(50_000)]
+
+    # Alternate the runs and keep the best of three, so warm-up and noise hit both alike
+    float_rate = cents_rate = 0
+    for _ in range(3):
+        rate, float_wallet = run_float(prices, carts)
+        float_rate = max(float_rate, rate)
+        rate, cents_wallet = run_cents(prices, carts)
+        cents_rate = max(cents_rate, rate)
+    print("checkout throughput: float %.0f/s, cents %.0f/s" % (float_rate, cents_rate))
+    print("final wallet: float %r, cents %r" % (float_wallet, cents_wallet))
+
+    # Summing one very large cart
+    line_prices = [rng.randint(1, 10_000) for _ in range(1_000_000)]
+    quantities = [rng.randint(1, 5) for _ in range(1_000_000)]
+    start = time.perf_counter()
+    money.total_cents(line_prices, quantities)
+    print("1M-line cart total: %.1f ms" % ((time.perf_counter() - start) * 1000))
+
+if __name__ == "__main__":
+    main()
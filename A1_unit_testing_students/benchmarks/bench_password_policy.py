@@ -0,0 +1,53 @@
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from password_policy import DEFAULT_POLICY
+
+# Old valid_password: two scans of the password, one per character class
+def old_valid_password(password):
+    if len(password) < 8:
+        return False
+    has_upper = any(char.isupper() for char in password)
+    has_special = any(not char.isalnum() for char in password)
+    return has_upper and has_special
+
+# Function to make candidate passwords, about half of which follow the default policy
+def make_passwords(count):
+    rng = random.Random(1)
+    alphabet = string.ascii_letters + string.digits + "!*/^_-"
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(6, 16))) for _ in range(count)]
+
+# Function to time a check over every password, returns passwords per second
+def time_check(check, passwords):
+    start = time.perf_counter()
+    check(passwords)
+    return len(passwords) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark checking passwords against the password policy")
+    parser.add_argument("--passwords", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000, help="passwords per check_many() call")
+    options = parser.parse_args()
+    passwords = make_passwords(options.passwords)
+    # Build the lookup table before timing
+    DEFAULT_POLICY.check_many(passwords[:1])
+    cases = [
+        ("old valid_password", lambda items: [old_valid_password(password) for password in items]),
+        ("PasswordPolicy.check", lambda items: [DEFAULT_POLICY.check(password) for password in items]),
+        ("PasswordPolicy.check_many", lambda items: [DEFAULT_POLICY.check_many(items[start:start + options.batch])
+                                                      for start in range(0, len(items), options.batch)]),
+    ]
+    baseline = None
+    for name, check in cases:
+        rate = time_check(check, passwords)
+        baseline = baseline or rate
+        print("%-26s %10.0f passwords/s  %5.1fx" % (name, rate, rate / baseline))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from console import ScriptedConsole
+from login import login
+from passwords import ITERATIONS_ENV, hash_password, reset_verification_cache
+from ratelimit import LoginLimiter, set_login_limiter
+from storage import FileBackend, set_backend
+from user_store import reset_user_stores
+
+# Function to write a user file whose passwords are hashed with the given cost
+def make_users(directory, count, iterations):
+    file_path = os.path.join(directory, "users_%d.json" % iterations)
+    with open(file_path, "w") as file:
+        json.dump([{"username": "user%d" % i, "password": hash_password("Passw0rd!%d" % i, iterations), "wallet": 100}
+                   for i in range(count)], file)
+    return file_path
+
+# Function to time logins of every user in turn, returns logins per second
+# cold: forget the cached verifications before each login, like a user seen for the first time
+def run(users, logins, cold):
+    start = time.perf_counter()
+    for i in range(logins):
+        if cold:
+            reset_verification_cache()
+        number = i % users
+        if login(ScriptedConsole(["user%d" % number, "Passw0rd!%d" % number])) is None:
+            raise RuntimeError("login failed")
+    return logins / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark logins with hashed passwords at several costs")
+    parser.add_argument("--iterations", type=int, nargs="+", default=[100_000, 300_000, 600_000])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=20_000, help="logins of returning users")
+    options = parser.parse_args()
+    print("%10s %16s %16s" % ("iterations", "new (logins/s)", "cached (logins/s)"))
+    # Every user logs in over and over, far more often than the default limits allow
+    set_login_limiter(LoginLimiter(user_burst=10 ** 9))
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for iterations in options.iterations:
+                os.environ[ITERATIONS_ENV] = str(iterations)
+                reset_user_stores()
+                reset_verification_cache()
+                set_backend(FileBackend(make_users(directory, options.users, iterations), "products.csv"))
+                try:
+                    cold = run(options.users, options.users, cold=True)
+                    run(options.users, options.users, cold=False)
+                    warm = run(options.users, options.logins, cold=False)
+                finally:
+                    set_backend(None)
+                print("%10d %16.1f %16.0f" % (iterations, cold, warm))
+    finally:
+        set_login_limiter(None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import ratelimit
+from console import ScriptedConsole
+from login import login
+from passwords import hash_password
+from storage import FileBackend, set_backend
+from user_store import reset_user_stores
+
+# Function to time a password guessing storm against one user, returns (seconds, user lookups)
+def storm(backend, attempts, limited):
+    ratelimit.reset_login_limiter()
+    limiter = ratelimit.get_login_limiter()
+    if not limited:
+        limiter.users = ratelimit.RateLimiter(attempts + 1, 1.0)
+    lookups = [0]
+    get_user = backend.get_user
+    def counted(username):
+        lookups[0] += 1
+        return get_user(username)
+    backend.get_user = counted
+    start = time.perf_counter()
+    for i in range(attempts):
+        login(ScriptedConsole(["Ramanathan", "guess%d" % i]))
+    elapsed = time.perf_counter() - start
+    backend.get_user = get_user
+    return elapsed, lookups[0]
+
+# Function to try many different usernames, returns (buckets kept, peak memory in MB)
+def spray(keys):
+    limiter = ratelimit.RateLimiter(ratelimit.USER_BURST, ratelimit.USER_RATE)
+    tracemalloc.start()
+    for i in range(keys):
+        limiter.allow("user%d" % i)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return len(limiter), peak / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login attempts with and without the rate limiter")
+    parser.add_argument("--attempts", type=int, default=100, help="wrong passwords tried for one user")
+    parser.add_argument("--keys", type=int, default=1_000_000, help="distinct usernames tried")
+    options = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        users_file = os.path.join(directory, "users.json")
+        with open(users_file, "w") as file:
+            json.dump([{"username": "Ramanathan", "password": hash_password("Notaproblem23*"), "wallet": 100}], file)
+        reset_user_stores()
+        backend = FileBackend(users_file, "products.csv")
+        set_backend(backend)
+        try:
+            for limited in (False, True):
+                elapsed, lookups = storm(backend, options.attempts, limited)
+                print("%-12s %d wrong passwords in %6.2f s, %d of them reached the user store"
+                      % ("limited" if limited else "not limited", options.attempts, elapsed, lookups))
+        finally:
+            set_backend(None)
+    kept, peak = spray(options.keys)
+    print("%d usernames tried: %d buckets kept, peak %.1f MB" % (options.keys, kept, peak))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import csv
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from search_index import build_search_index
+
+WORDS = ["apple", "banana", "orange", "grape", "straw", "berry", "melon", "carrot", "pepper", "salmon",
+         "bread", "butter", "cheese", "coffee", "juice", "cookie", "cereal", "towel", "soap", "lamp"]
+
+# Function to write a product CSV file with the given number of rows
+def make_catalog(directory, count):
+    file_path = os.path.join(directory, "products_%d.csv" % count)
+    rng = random.Random(count)
+    with open(file_path, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Product", "Price", "Units"])
+        for i in range(count):
+            name = "%s %s %d" % (rng.choice(WORDS).title(), rng.choice(WORDS), i)
+            writer.writerow([name, rng.randint(1, 100), rng.randint(1, 20)])
+    return file_path
+
+# Old display_filtered_table matching: re-read the file and use every name as a pattern
+def regex_scan(csv_filename, search):
+    matches = []
+    with open(csv_filename, "r", newline="") as csvfile:
+        csv_reader = csv.reader(csvfile)
+        header = next(csv_reader)
+        condition_index = header.index("Product")
+        for row in csv_reader:
+            if re.search(row[condition_index], search, re.IGNORECASE):
+                matches.append(row)
+    return matches
+
+# Function to time a call after one warm-up run, returning the mean latency in milliseconds
+def time_call(function, repeats):
+    function()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1000
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for count in (10_000, 1_000_000):
+            file_path = make_catalog(directory, count)
+            query = "Salmon Lamp %d" % (count // 2)
+
+            start = time.perf_counter()
+            regex_scan(file_path, query)
+            scan = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            index = build_search_index(file_path)
+            build = (time.perf_counter() - start) * 1000
+
+            print("%d rows: old regex scan %.1f ms/query, index build %.1f ms (once)" % (count, scan, build))
+            for label, function in (("substring", lambda: index.search("%d" % (count // 2))),
+                                    ("selective substring", lambda: index.search("lamp %d" % (count // 2))),
+                                    ("prefix", lambda: index.prefix_search("salmon lamp %d" % (count // 2))),
+                                    ("regex", lambda: index.regex_search("^salmon lamp %d$" % (count // 2)))):
+                print("    %-20s %10.4f ms/query" % (label, time_call(function, 20)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from passwords import ITERATIONS_ENV
+from ratelimit import LoginLimiter, set_login_limiter
+from server import ShopServer
+from storage import FileBackend
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+WORDS = ["apple", "salmon", "bread", "juice", "cheese", "cofee", "tomato"]
+
+# Function to send one command and wait for its reply, returning the latency in seconds
+# With check=True a reply other than OK stops the benchmark, instead of timing an error
+async def timed_request(reader, writer, line, check=False):
+    start = time.perf_counter()
+    writer.write((line + "\n").encode())
+    await writer.drain()
+    status, count = (await reader.readline()).decode().split()
+    lines = [(await reader.readline()).decode().strip() for _ in range(int(count))]
+    if check and status != "OK":
+        raise RuntimeError("%s failed: %s" % (line.split()[0], " ".join(lines)))
+    return time.perf_counter() - start
+
+# Function for one shopper: log in, browse, fill a cart, check out and log out
+async def shopper(number, connect, latencies, trips):
+    rng = random.Random(number)
+    reader, writer = await connect()
+    await timed_request(reader, writer, "LOGIN shopper%d Passw0rd!" % number, check=True)
+    for _ in range(trips):
+        latencies.append(await timed_request(reader, writer, "SEARCH " + rng.choice(WORDS)))
+        for _ in range(rng.randint(1, 3)):
+            latencies.append(await timed_request(reader, writer, "ADD %d" % rng.randint(1, 71)))
+        latencies.append(await timed_request(reader, writer, "CHECKOUT"))
+    latencies.append(await timed_request(reader, writer, "LOGOUT"))
+    writer.write(b"QUIT\n")
+    await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+
+# Function to run many shoppers at once and report the request rate and latency percentiles
+async def load(connect, sessions, trips):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(shopper(i, connect, latencies, trips) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print("%4d sessions: %6d requests in %.2f s, %7.0f req/s, p50 %6.1f ms, p99 %6.1f ms"
+          % (sessions, len(latencies), elapsed, len(latencies) / elapsed, p50, p99))
+
+# Function to start a server on copies of the data files with a user per shopper
+async def local_server(directory, sessions):
+    users = [{"username": "shopper%d" % i, "password": "Passw0rd!", "wallet": 10 ** 6} for i in range(sessions)]
+    with open(os.path.join(directory, "users.json"), "w") as file:
+        json.dump(users, file, indent=4)
+    shutil.copy(os.path.join(ROOT, "products.csv"), directory)
+    # Plenty of stock, so checkouts succeed instead of running out
+    with open(os.path.join(directory, "products.csv")) as file:
+        lines = file.read().splitlines()
+    with open(os.path.join(directory, "products.csv"), "w") as file:
+        file.write("\n".join([lines[0]] + [line.rsplit(",", 1)[0] + ",1000000" for line in lines[1:]]) + "\n")
+    backend = FileBackend(os.path.join(directory, "users.json"), os.path.join(directory, "products.csv"))
+    # Every shopper connects from this machine, which the default limits would take for one guessing client
+    set_login_limiter(LoginLimiter(client_burst=sessions))
+    server = ShopServer(backend)
+    listener = await server.start()
+    return server, listener.sockets[0].getsockname()[:2]
+
+async def main(arguments):
+    # Logins hash the password, at a cost bench_passwords measures; kept low so requests are timed
+    os.environ[ITERATIONS_ENV] = str(arguments.iterations)
+    for sessions in arguments.sessions:
+        if arguments.port:
+            server, address = None, (arguments.host, arguments.port)
+        else:
+            directory = tempfile.mkdtemp()
+            server, address = await local_server(directory, sessions)
+        try:
+            await load(lambda: asyncio.open_connection(*address), sessions, arguments.trips)
+        finally:
+            if server is not None:
+                await server.close()
+                shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the shop server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="test a running server instead of starting one")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--trips", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=1000, help="PBKDF2 iterations of the local server's passwords")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,62 @@
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from checkout_and_payment import Inventory, Product
+from sessions import SessionManager
+
+# Function to open sessions that each put a few products in their cart
+def open_sessions(manager, products, count):
+    menu = list(products)
+    for i in range(count):
+        session = manager.create({"username": "user%d" % i, "wallet": 100}, products)
+        for product in (menu[i % len(menu)], menu[(i * 7) % len(menu)]):
+            if products.reserve(product, 1, session.cart):
+                session.cart.add_item(product)
+
+def main():
+    products = Inventory(Product("Product %d" % i, 1, 10 ** 6) for i in range(1000))
+    count = 10_000
+
+    # Memory kept per session, carts and reservations included
+    manager = SessionManager()
+    gc.collect()
+    tracemalloc.start()
+    open_sessions(manager, products, count)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print("%d sessions: %.0f bytes per session" % (len(manager), size / count))
+
+    # Looking sessions up from many threads at once
+    ids = list(manager.sessions)
+    def touch(start):
+        for session_id in ids[start::8]:
+            manager.get(session_id)
+    threads = [threading.Thread(target=touch, args=(i,)) for i in range(8)]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print("session lookups from 8 threads: %.0f/s" % (len(ids) / (time.perf_counter() - began)))
+
+    # A cap below the number of shoppers keeps memory bounded, and evicted carts give their stock back
+    capped = SessionManager(max_sessions=1000)
+    other_products = Inventory(Product("Product %d" % i, 1, 10 ** 6) for i in range(1000))
+    open_sessions(capped, other_products, count)
+    reserved = sum(quantity for holders in other_products.reservations.values() for quantity, _ in holders.values())
+    print("cap 1000, %d logins: %d sessions kept, %d units still reserved" % (count, len(capped), reserved))
+
+    # Idle sessions are ended in one sweep
+    manager.clock = lambda: time.monotonic() + manager.idle_timeout
+    began = time.perf_counter()
+    ended = manager.evict_idle()
+    print("evicting %d idle sessions: %.1f ms" % (ended, (time.perf_counter() - began) * 1000))
+
+if __name__ == "__main__":
+    main()
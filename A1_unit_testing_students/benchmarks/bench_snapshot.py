@@ -0,0 +1,63 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_search import make_catalog
+from catalog import _catalogs
+from checkout_and_payment import load_products_from_csv
+import snapshot as snapshot_module
+from snapshot import snapshot_path
+from user_store import UserStore
+
+# Function to time a call, starting each run with no parsed catalog in memory
+def timed(function):
+    best = float("inf")
+    for _ in range(3):
+        _catalogs.clear()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+# Function to write a users.json file like the shipped one, with indent=4
+def make_users(directory, count):
+    file_path = os.path.join(directory, "users_%d.json" % count)
+    data = [{"username": "user%d" % i, "password": "Passw0rd!%d" % i, "wallet": i % 500} for i in range(count)]
+    with open(file_path, "w") as file:
+        json.dump(data, file, indent=4)
+    return file_path
+
+# Function to time loading from the text file only, and again from the snapshot
+def compare(label, source, load):
+    snapshot = snapshot_path(source)
+
+    def text_only():
+        if os.path.exists(snapshot):
+            os.remove(snapshot)
+        # Keep the rebuilt snapshot from being written, so every run parses the text
+        saved = snapshot_module.write_snapshot
+        snapshot_module.write_snapshot = lambda *args: False
+        try:
+            load()
+        finally:
+            snapshot_module.write_snapshot = saved
+
+    text = timed(text_only)
+    load()
+    binary = timed(load)
+    print("%-24s text %8.1f ms, snapshot %8.1f ms" % (label, text, binary))
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for count in (10_000, 200_000):
+            csv_file = make_catalog(directory, count)
+            compare("%d products" % count, csv_file, lambda: load_products_from_csv(csv_file))
+            users_file = make_users(directory, count)
+            compare("%d users" % count, users_file, lambda: UserStore(users_file).get_user("user1"))
+
+if __name__ == "__main__":
+    main()
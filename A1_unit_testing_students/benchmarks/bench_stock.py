@@ -0,0 +1,55 @@
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from checkout_and_payment import Inventory, Product, ShoppingCart, User, checkout
+
+# Function to let many shoppers buy a few products until they sell out
+# Returns checkouts per second, units sold, units that were in stock and the lowest stock seen
+def run(thread_count, skus=5, units=20_000):
+    products = Inventory([Product("SKU%d" % i, 1, units) for i in range(skus)])
+    menu = list(products)
+    users = [User("User%d" % i, 10 ** 7) for i in range(thread_count)]
+    counts = [0] * thread_count
+    start = threading.Barrier(thread_count + 1)
+
+    def shop(number):
+        rng = random.Random(number)
+        user = users[number]
+        start.wait()
+        while len(products):
+            cart = ShoppingCart()
+            for product in rng.sample(menu, 2):
+                quantity = rng.randint(1, 3)
+                if products.reserve(product, quantity, cart):
+                    cart.add_item(product, quantity)
+            if len(cart):
+                checkout(user, cart, products)
+                counts[number] += 1
+
+    threads = [threading.Thread(target=shop, args=(i,)) for i in range(thread_count)]
+    with open(os.devnull, "w") as sink, redirect_stdout(sink):
+        for thread in threads:
+            thread.start()
+        start.wait()
+        began = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+    sold = sum(10 ** 9 - user.wallet_cents for user in users) // 100
+    return sum(counts) / elapsed, sold, skus * units, min(product.units for product in menu)
+
+def main():
+    for thread_count in (1, 4, 16, 64):
+        rate, sold, stock, lowest = run(thread_count)
+        status = "ok" if sold == stock and lowest == 0 else "OVERSOLD"
+        print("%3d threads: %8.0f checkouts/s, sold %d of %d units, lowest stock %d (%s)"
+              % (thread_count, rate, sold, stock, lowest, status))
+
+if __name__ == "__main__":
+    main()
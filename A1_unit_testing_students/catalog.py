@@ -0,0 +1,96 @@
+import csv
+import os
+import threading
+from search_index import ProductSearchIndex
+
+#Product catalog parsed once from a CSV file and reused until the file changes
+#Shared between threads, so the parsed state is only replaced and read under the lock
+class Catalog:
+    def __init__(self, csv_filename):
+        self.csv_filename = csv_filename
+        self.signature = None
+        self.header = None
+        self.rows = []
+        self.index = None
+        # Reentrant, since search_index refreshes while holding it
+        self.lock = threading.RLock()
+
+    # Method to get the inode, modification time and size of the CSV file
+    def file_signature(self):
+        stat = os.stat(self.csv_filename)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    # Method to tell whether the file was parsed and has not changed since
+    def is_current(self):
+        return self.signature is not None and self.signature == self.file_signature()
+
+    # Method to re-parse the CSV file, only if it changed since the last parse
+    def refresh(self):
+        with self.lock:
+            signature = self.file_signature()
+            if signature == self.signature:
+                return
+            rows = read_csv_rows(self.csv_filename)
+            # None for an empty file, which has no header and no products
+            header = next(rows, None)
+            rows = list(rows)
+            # The search index is rebuilt from the new rows on the next search
+            self.header, self.rows, self.index, self.signature = header, rows, None, signature
+
+    # Method to get the header and the rows of the CSV file, both from the same parse
+    def get_table(self):
+        with self.lock:
+            self.refresh()
+            return self.header, self.rows
+
+    # Method to get the search index over the product names
+    # Its header is None for an empty file, which has no products to find
+    def search_index(self):
+        with self.lock:
+            self.refresh()
+            if self.index is None:
+                index = ProductSearchIndex(self.header)
+                for row in self.rows:
+                    index.add_row(row)
+                self.index = index
+            return self.index
+
+    # Method to get the products as (id, name, price, units) rows, id being the row position
+    def product_rows(self):
+        header, rows = self.get_table()
+        if header is None or not rows:
+            return []
+        name = header.index('Product')
+        price = header.index('Price')
+        units = header.index('Units')
+        return [(product_id, row[name], row[price], row[units]) for product_id, row in enumerate(rows)]
+
+# Function to stream the rows of a CSV file, header first, skipping blank lines
+# Every reader of product CSV files goes through this one
+def read_csv_rows(csv_filename):
+    with open(csv_filename, 'r', newline='') as csvfile:
+        for row in csv.reader(csvfile):
+            # Blank lines come back as empty rows, they are not products
+            if row:
+                yield row
+
+# One catalog per CSV file, shared by display, search and checkout
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+# Function to reject a CSV file name that is not a path
+# open() would take an int as a file descriptor, so this cannot be left to it
+def check_path(csv_filename):
+    if not isinstance(csv_filename, (str, bytes, os.PathLike)):
+        raise TypeError("expected a file path, not %s" % type(csv_filename).__name__)
+
+# Function to get the shared catalog for a CSV file
+def get_catalog(csv_filename):
+    check_path(csv_filename)
+    key = os.path.abspath(csv_filename)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = Catalog(csv_filename)
+            _catalogs[key] = catalog
+        return catalog
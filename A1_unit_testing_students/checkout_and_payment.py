@@ -1,153 +1,363 @@
-import csv
-from logout import logout
-import json
-
-#User class to represent user information
-class User:
-    def __init__(self, name, wallet):
-        self.name = name
-        self.wallet = float(wallet)
-
-#Product class to represent product information
-class Product:
-    def __init__(self, name, price, units):
-        self.name = name
-        self.price = float(price)
-        self.units = int(units)
-
-#A method to get product details as a list
-    def get_product(self):
-        return [self.name, self.price, self.units]
-
-#ShoppingCart class to represent the user's shopping cart
-class ShoppingCart:
-    def __init__(self):
-        self.items = []
-
-    # Method to add a product to the cart
-    def add_item(self, product):
-        self.items.append(product)
-
-    # Method to remove a product from the cart
-    def remove_item(self, product):
-        self.items.remove(product)
-
-    # Method to retrieve the items in the cart
-    def retrieve_item(self):
-        return self.items
-
-    # Method to clear all items from the cart
-    def clear_items(self):
-        self.items = []
-
-    # Method to calculate the total price of items in the cart
-    def get_total_price(self):
-        return sum(item.price for item in self.items)
-
-# Function to load products from a CSV file
-def load_products_from_csv(file_path):
-    products = []
-    with open(file_path, newline='') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            products.append(Product(row['Product'], row['Price'], row['Units']))
-    return products
-
-# Load products from the CSV file
-# products= load_products_from_csv("products.csv")
-cart = ShoppingCart()
-
-# Function to complete the checkout process
-def checkout(user, cart, products):
-    if not cart.items:
-        print("\nYour basket is empty. Please add items before checking out.")
-        return
-
-    total_price = cart.get_total_price()
-
-    if total_price > user.wallet:
-        print("\n")
-        print(f"You don't have enough money to complete the purchase.")
-        print("Please try again!")
-        return
-
-    # Deduct the total price from the user's wallet
-    user.wallet -= total_price
-    # Update product units and remove products with zero units
-    for item in cart.items:
-        item.units -= 1
-        if item.units == 0:
-            products.remove(item)
-    # Clear the cart
-    cart.items = []
-
-    # Print a thank you message with the remaining balance
-    print("\n")
-    print(f"Thank you for your purchase, {user.name}! Your remaining balance is {user.wallet}")
-    
-# Function to check the cart and proceed to checkout if requested
-def check_cart(user, cart, test_products):
-    # Print products in the cart
-    for i in cart.retrieve_item():
-        print(i.get_product())
-    # Ask the user if they want to checkout
-    question = input("Do you want to checkout (Y/N)?")
-    if question.lower()  == "y":
-        return checkout(user, cart, test_products)
-    else:
-        return False
-
-# Main function for the shopping and checkout process
-def checkoutAndPayment(login_info):
-    # Create/retrieve a user using login information
-    user = User(login_info["username"], login_info["wallet"])
-    # Display available products
-    for i, product in enumerate(products):
-        print(f"{i+1}. {product.name} - ${product.price} - Units: {product.units}")
-    
-    while True:
-        
-        # Get user input for product selection in numbers
-        choice = input("\nEnter the product number you want to add to your cart (c to check cart, l to logout): ")
-        
-        if choice == 'c':
-             # Check the cart and proceed to checkout if requested
-            check = check_cart(user, cart)
-            if check is False:
-                continue
-        elif choice == 'l':
-            # Logout the user
-            ask_logout = logout(cart)
-            if ask_logout is True:
-
-                # Below is added code for updating wallet information in the user file
-
-                # Read the JSON file
-                with open('uses.json', 'r') as file:
-                    data = json.load(file)
-
-                # Update the wallet of the user
-                for user in data:
-                    if user["username"] == user.name:
-                        user["wallet"] = user.wallet
-                        break
-
-                # Write the updated data back to the file
-                with open('uses.json', 'w') as file:
-                    json.dump(data, file, indent=2)
-
-                print("You have been logged out")
-                break
-            else:
-                continue
-        elif choice.isdigit() and 1 <= int(choice) <= len(products):
-            # Add the selected product to the cart
-            selected_product = products[int(choice) - 1]
-            if selected_product.units > 0:
-                cart.add_item(selected_product)
-                print(f"{selected_product.name} added to your cart.")
-            else:
-                print(f"Sorry, {selected_product.name} is out of stock.")
-        else:
-            print("\nInvalid input. Please try again.")
-
+import threading
+from logout import logout
+from money import from_cents, to_cents, total_cents
+from storage import get_backend
+from catalog import check_path
+from snapshot import load_product_records
+from stock import StockControl
+from sessions import get_session_manager
+from console import Console
+
+#User class to represent user information
+#Money is kept in whole cents; wallet reads and writes it as an amount
+class User:
+    # No per-instance __dict__, these are the only attributes
+    __slots__ = ("name", "wallet_cents")
+
+    def __init__(self, name, wallet):
+        self.name = name
+        self.wallet = wallet
+
+    @property
+    def wallet(self):
+        return from_cents(self.wallet_cents)
+
+    @wallet.setter
+    def wallet(self, amount):
+        self.wallet_cents = to_cents(amount)
+
+#Product class to represent product information
+class Product:
+    # No per-instance __dict__, these are the only attributes
+    __slots__ = ("name", "price_cents", "units", "product_id")
+
+    def __init__(self, name, price, units, product_id=None):
+        self.name = name
+        self.price = price
+        self.units = int(units)
+        # Position of the product in the store's inventory, None for ad-hoc products
+        self.product_id = product_id
+
+    @property
+    def price(self):
+        return from_cents(self.price_cents)
+
+    @price.setter
+    def price(self, amount):
+        self.price_cents = to_cents(amount)
+
+#A method to get product details as a list
+    def get_product(self):
+        return [self.name, self.price, self.units]
+
+#Inventory class to hold the products for sale, keyed by id and name, in display order
+#Stock changes and cart reservations are thread-safe, see StockControl
+class Inventory(StockControl):
+    def __init__(self, products=()):
+        StockControl.__init__(self)
+        # Guards the indexes below against concurrent adds and removes
+        self.index_lock = threading.Lock()
+        # Insertion-ordered, so iterating gives the display order
+        self.by_id = {}
+        # Name -> products with that name (names are not unique in products.csv)
+        self.by_name = {}
+        self.next_id = 0
+        # Products as a list for positional access, rebuilt after a change
+        self.ordered = None
+        for product in products:
+            self.add(product)
+
+    # Method to add a product, giving it an id if it has none
+    def add(self, product):
+        with self.index_lock:
+            if product.product_id is None or product.product_id in self.by_id:
+                product.product_id = self.next_id
+            self.next_id = max(self.next_id, product.product_id + 1)
+            self.by_id[product.product_id] = product
+            self.by_name.setdefault(product.name, []).append(product)
+            self.ordered = None
+
+    # Method to remove a product, raises ValueError if it is not in the inventory
+    def remove(self, product):
+        with self.index_lock:
+            if self.by_id.get(product.product_id) is not product:
+                raise ValueError("product not in inventory")
+            del self.by_id[product.product_id]
+            same_name = self.by_name[product.name]
+            same_name.remove(product)
+            if not same_name:
+                del self.by_name[product.name]
+            self.ordered = None
+
+    # Method to get the first product with a name, or None
+    def get(self, name):
+        same_name = self.by_name.get(name)
+        return same_name[0] if same_name else None
+
+    # Method to get a product by id, or None
+    def get_by_id(self, product_id):
+        return self.by_id.get(product_id)
+
+    def __contains__(self, product):
+        return self.by_id.get(product.product_id) is product
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def __len__(self):
+        return len(self.by_id)
+
+    # Products can be read by position, like the list this class replaces
+    def __getitem__(self, position):
+        if self.ordered is None:
+            self.ordered = list(self.by_id.values())
+        return self.ordered[position]
+
+#ShoppingCart class to represent the user's shopping cart
+class ShoppingCart:
+    def __init__(self):
+        # Product -> number of units in the cart, in the order products were first added
+        self.quantities = {}
+        # Running totals, updated on every add and remove
+        self.total_cents = 0
+        self.unit_count = 0
+
+    # The units in the cart as a list with one entry per unit
+    @property
+    def items(self):
+        return [product for product, quantity in self.quantities.items() for _ in range(quantity)]
+
+    @items.setter
+    def items(self, products):
+        self.clear_items()
+        for product in products:
+            self.add_item(product)
+
+    # Method to add units of a product to the cart
+    def add_item(self, product, quantity=1):
+        # Nothing to add, e.g. a product lookup that found no product
+        if product is None or quantity == 0:
+            return
+        if quantity < 0:
+            raise ValueError("quantity must not be negative")
+        self.quantities[product] = self.quantities.get(product, 0) + quantity
+        self.total_cents += product.price_cents * quantity
+        self.unit_count += quantity
+
+    # Method to remove units of a product from the cart
+    def remove_item(self, product, quantity=1):
+        in_cart = self.quantities.get(product, 0)
+        if quantity > in_cart:
+            raise ValueError("product not in cart")
+        if quantity == in_cart:
+            del self.quantities[product]
+        else:
+            self.quantities[product] = in_cart - quantity
+        self.unit_count -= quantity
+        self.total_cents -= product.price_cents * quantity
+
+    # Method to get the number of units of a product in the cart
+    def quantity(self, product):
+        return self.quantities.get(product, 0)
+
+    # Method to retrieve the items in the cart
+    def retrieve_item(self):
+        return self.items
+
+    # Method to clear all items from the cart
+    def clear_items(self):
+        self.quantities = {}
+        self.total_cents = 0
+        self.unit_count = 0
+
+    # Method to recompute the running total from the current product prices
+    def reprice(self):
+        self.total_cents = total_cents([product.price_cents for product in self.quantities],
+                                       list(self.quantities.values()))
+        return self.total_cents
+
+    # Method to calculate the total price of items in the cart
+    def get_total_price(self):
+        return from_cents(self.total_cents)
+
+    # Number of units in the cart
+    def __len__(self):
+        return self.unit_count
+
+# Function to load products from a CSV file
+# Rows come from the binary snapshot of the file (see snapshot.py), each call gets its own Product objects
+# With lazy=True the file is memory-mapped and a Product is only built for a row that is used
+def load_products_from_csv(file_path, lazy=False):
+    check_path(file_path)
+    if lazy:
+        # Imported here, lazy_catalog imports Product from this module
+        from lazy_catalog import LazyInventory
+        return LazyInventory(file_path)
+    return inventory_from_records(load_product_records(file_path))
+
+# Function to build an inventory from (id, name, price_cents, units) rows
+def inventory_from_records(records):
+    products = Inventory()
+    for product_id, name, price_cents, units in records:
+        product = Product(name, 0, units, product_id)
+        # Set directly, the rows already hold the price in cents
+        product.price_cents = price_cents
+        products.add(product)
+    return products
+
+# Function to load products from the configured storage backend
+def load_products(backend=None):
+    if backend is None:
+        backend = get_backend()
+    return inventory_from_records(backend.product_records())
+
+# Inventories shared by every session in the process, one per product source (see products_source)
+_inventories = {}
+_inventories_lock = threading.Lock()
+
+# Function to get the inventory all sessions on a backend buy from, loading it on first use
+# Sharing it is what makes stock locks and reservations hold between shoppers
+def get_inventory(backend=None):
+    if backend is None:
+        backend = get_backend()
+    key = backend.products_source()
+    with _inventories_lock:
+        products = _inventories.get(key)
+        if products is None:
+            products = load_products(backend)
+            _inventories[key] = products
+        return products
+
+# Function to drop the shared inventories, so the next session loads the stock again (used by tests)
+def reset_inventories():
+    with _inventories_lock:
+        _inventories.clear()
+
+# Function to complete the checkout process
+# When a storage backend is given, the payment and stock change are committed to it first
+# Returns True when the purchase went through, False when nothing was bought
+def checkout(user, cart, products, backend=None, console=None):
+    if console is None:
+        console = Console()
+    if not cart.quantities:
+        console.print("\nYour basket is empty. Please add items before checking out.")
+        return False
+
+    # Stock is checked and taken while the cart's products are locked, so two shoppers
+    # can never both buy the last unit
+    with products.locked(cart.quantities):
+        # Only the units still in stock (and not reserved by other carts) are sold
+        available_units = products.available_all(cart.quantities, cart)
+        sold = {}
+        for item, quantity in cart.quantities.items():
+            available = available_units[item]
+            if available == 0:
+                console.print(f"Sorry, {item.name} is out of stock.")
+            elif available < quantity:
+                console.print(f"Sorry, only {available} units of {item.name} are left.")
+            if available > 0:
+                sold[item] = min(quantity, available)
+        if not sold:
+            return False
+
+        if sold == cart.quantities:
+            total_price = cart.total_cents
+        else:
+            total_price = total_cents([item.price_cents for item in sold], list(sold.values()))
+
+        if total_price > user.wallet_cents:
+            console.print("\n")
+            console.print(f"You don't have enough money to complete the purchase.")
+            console.print("Please try again!")
+            return False
+
+        if backend is not None and not backend.commit_checkout(user.name, total_price, sold):
+            console.print("\n")
+            console.print("Some items are no longer in stock or your balance has changed.")
+            console.print("Please try again!")
+            return False
+
+        # Deduct the total price from the user's wallet
+        user.wallet_cents -= total_price
+        # Update product units and remove products with zero units
+        products.take_all(sold, cart)
+    # Give back anything else the cart had reserved, and clear it
+    products.release(cart)
+    cart.clear_items()
+
+    # Print a thank you message with the remaining balance
+    console.print("\n")
+    console.print(f"Thank you for your purchase, {user.name}! Your remaining balance is {user.wallet}")
+    return True
+    
+# Function to check the cart and proceed to checkout if requested
+def check_cart(user, cart, test_products, backend=None, console=None):
+    if console is None:
+        console = Console()
+    # Print products in the cart
+    for i in cart.retrieve_item():
+        console.print(i.get_product())
+    # Ask the user if they want to checkout
+    question = console.input("Do you want to checkout (Y/N)?")
+    if question.lower()  == "y":
+        return checkout(user, cart, test_products, backend, console)
+    else:
+        return False
+
+# Main function for the shopping and checkout process
+def checkoutAndPayment(login_info, console=None):
+    if console is None:
+        console = Console()
+    # Buy from the inventory shared with every other session on the storage backend
+    backend = get_backend()
+    products = get_inventory(backend)
+    # Start a session holding the user and their own cart
+    sessions = get_session_manager()
+    session = sessions.create(login_info, products)
+    user = session.user
+    cart = session.cart
+    # Display available products, the menu numbers keep pointing at the same product
+    # even after sold-out products leave the inventory
+    menu = list(products)
+    for i, product in enumerate(menu):
+        console.print(f"{i+1}. {product.name} - ${product.price} - Units: {product.units}")
+    
+    while True:
+        
+        # Get user input for product selection in numbers
+        choice = console.input("\nEnter the product number you want to add to your cart (c to check cart, l to logout): ")
+
+        # A session left idle for too long has been ended and its cart emptied
+        if sessions.get(session.session_id) is None:
+            console.print("Your session has expired. Please log in again.")
+            break
+
+        if choice == 'c':
+             # Check the cart and proceed to checkout if requested
+            check = check_cart(user, cart, products, backend, console)
+            if check is False:
+                continue
+        elif choice == 'l':
+            # Logout the user
+            ask_logout = logout(cart, console)
+            if ask_logout is True:
+                # Nothing to store: every purchase was debited from the stored wallet at checkout,
+                # and writing this session's balance back would undo other sessions' debits
+                sessions.end(session.session_id)
+
+                console.print("You have been logged out")
+                break
+            else:
+                continue
+        elif choice.isdigit() and 1 <= int(choice) <= len(menu):
+            # Add the selected product to the cart
+            selected_product = menu[int(choice) - 1]
+            # The unit is reserved for this cart until checkout, logout or RESERVATION_TTL
+            if products.reserve(selected_product, 1, cart):
+                cart.add_item(selected_product)
+                console.print(f"{selected_product.name} added to your cart.")
+            else:
+                console.print(f"Sorry, {selected_product.name} is out of stock.")
+        else:
+            console.print("\nInvalid input. Please try again.")
+
@@ -0,0 +1,65 @@
+from checkout_and_payment import reset_inventories
+from ratelimit import reset_login_limiter
+from sessions import reset_session_manager
+from storage import FileBackend, SQLiteBackend, set_backend
+from user_store import reset_user_stores
+import pytest
+import json
+import shutil
+
+# Function to register the markers the fixtures below read
+def pytest_configure(config):
+    config.addinivalue_line("markers", "users(**changes): change fields of the users in users_file, "
+                                       "e.g. users(Samantha={'wallet': 150.25})")
+
+# Fixture to create a small user file in a temporary directory
+# A users marker on the test or its module changes fields of these users
+@pytest.fixture
+def users_file(request, tmp_path):
+    file_path = tmp_path / "users.json"
+    data = [
+        {"username": "Ramanathan", "password": "Notaproblem23*", "wallet": 100},
+        {"username": "Samantha", "password": "SecurePass123/^", "wallet": 150},
+    ]
+    marker = request.node.get_closest_marker("users")
+    if marker is not None:
+        for entry in data:
+            entry.update(marker.kwargs.get(entry["username"], {}))
+    file_path.write_text(json.dumps(data, indent=4))
+    return str(file_path)
+
+# Fixture to give a test a fresh set of cached stores
+@pytest.fixture
+def fresh_user_store():
+    reset_user_stores()
+    yield
+    reset_user_stores()
+
+# Function to drop everything the shop keeps per process
+def reset_shop():
+    reset_user_stores()
+    reset_session_manager()
+    reset_login_limiter()
+    reset_inventories()
+
+# Fixture to give a test a shop on copies of users.json and products.csv, set as the process's backend
+# It is a FileBackend on the copies; parametrize it with "sqlite" (indirect=True) for an
+# SQLiteBackend filled from them. Tests may rewrite the copies before the shop is first used
+@pytest.fixture
+def shop_backend(request, tmp_path):
+    users_file = str(tmp_path / "users.json")
+    products_file = str(tmp_path / "products.csv")
+    shutil.copy("users.json", users_file)
+    shutil.copy("products.csv", products_file)
+    reset_shop()
+    if getattr(request, "param", "file") == "sqlite":
+        backend = SQLiteBackend(str(tmp_path / "shop.db"))
+        backend.import_files(users_file, products_file)
+    else:
+        backend = FileBackend(users_file, products_file)
+    set_backend(backend)
+    yield backend
+    set_backend(None)
+    if isinstance(backend, SQLiteBackend):
+        backend.close()
+    reset_shop()
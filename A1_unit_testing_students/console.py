@@ -0,0 +1,54 @@
+import sys
+
+#Console the shopping flow talks to the user through, reading from input() and writing to stdout
+#Other consoles replace where the answers come from and where the output goes
+class Console:
+    # Method to ask the user something and return the answer
+    def input(self, prompt=""):
+        return input(prompt)
+
+    # Method to write text as it is
+    def write(self, text):
+        sys.stdout.write(text)
+
+    # Method to write values like the print() builtin does
+    def print(self, *values, sep=" ", end="\n"):
+        self.write(sep.join(str(value) for value in values) + end)
+
+#Console that keeps the output in memory instead of writing every line to stdout
+#Answers are still read with input(), after writing out what is pending so the prompt makes sense
+class BufferedConsole(Console):
+    def __init__(self):
+        self.parts = []
+
+    def input(self, prompt=""):
+        self.flush()
+        return input(prompt)
+
+    def write(self, text):
+        self.parts.append(text)
+
+    # Method to get everything written so far
+    def getvalue(self):
+        return "".join(self.parts)
+
+    # Method to write out the pending output in one write and forget it
+    def flush(self, stream=None):
+        if self.parts:
+            (stream or sys.stdout).write(self.getvalue())
+            self.parts = []
+
+#Console that answers from a list of lines, for tests and scripted sessions
+#The prompts and the output are kept in memory, like a transcript of the session
+class ScriptedConsole(BufferedConsole):
+    def __init__(self, answers):
+        BufferedConsole.__init__(self)
+        self.answers = iter(answers)
+
+    # Method to answer with the next scripted line, raises EOFError when there are none left like input()
+    def input(self, prompt=""):
+        self.parts.append(prompt)
+        try:
+            return next(self.answers)
+        except StopIteration:
+            raise EOFError("no more scripted answers")
@@ -0,0 +1,153 @@
+import csv
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_right, insort
+from stock import StockControl
+
+#Product inventory read straight from a memory-mapped CSV file
+#Only the start offset of each line is kept; a Product is built the first time its row is used
+#Rows are split on newlines, so quoted fields must not contain line breaks
+#Stock changes and cart reservations are thread-safe, see StockControl
+class LazyInventory(StockControl):
+    def __init__(self, file_path):
+        StockControl.__init__(self)
+        # Guards loading, the cache of built products and the removed rows
+        self.index_lock = threading.RLock()
+        self.file_path = os.path.abspath(file_path)
+        self.data = None
+        self.header = None
+        # Start offset of every data row, built on first use
+        self.offsets = None
+        # Row number -> Product, for the rows that were used
+        self.products = {}
+        # Sorted row numbers of removed products
+        self.removed = []
+
+    # Method to map the file and index the line offsets, only the first time
+    def load(self):
+        if self.offsets is not None:
+            return
+        with self.index_lock:
+            if self.offsets is None:
+                self.load_offsets()
+
+    # Method to map the file and record where each row starts
+    def load_offsets(self):
+        with open(self.file_path, 'rb') as csvfile:
+            size = os.fstat(csvfile.fileno()).st_size
+            # An empty file cannot be mapped
+            data = mmap.mmap(csvfile.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        offsets = array('q')
+        end = data.find(b'\n')
+        if end < 0:
+            end = len(data)
+        self.header = next(csv.reader([data[:end].decode()]), [])
+        position = end + 1
+        while position < len(data):
+            end = data.find(b'\n', position)
+            if end < 0:
+                end = len(data)
+            # Blank lines are not rows
+            if data[position:end].strip():
+                offsets.append(position)
+            position = end + 1
+        self.data = data
+        self.offsets = offsets
+
+    # Method to parse one row of the file into its fields
+    def read_row(self, row):
+        start = self.offsets[row]
+        end = self.data.find(b'\n', start)
+        if end < 0:
+            end = len(self.data)
+        return next(csv.reader([self.data[start:end].decode()]))
+
+    # Method to get the Product for a row, building it the first time
+    def product_at(self, row):
+        product = self.products.get(row)
+        if product is None:
+            from checkout_and_payment import Product
+            fields = dict(zip(self.header, self.read_row(row)))
+            with self.index_lock:
+                # Another thread may have built it meanwhile, everyone must share one object
+                product = self.products.get(row)
+                if product is None:
+                    product = Product(fields['Product'], fields['Price'], fields['Units'], row)
+                    self.products[row] = product
+        return product
+
+    # Method to get the row number of the product at a position, skipping removed rows
+    def row_at(self, position):
+        # Each pass adds the removed rows up to the current guess, until the guess stops moving
+        row = position
+        while True:
+            shifted = position + bisect_right(self.removed, row)
+            if shifted == row:
+                return row
+            row = shifted
+
+    # Method to check whether a row is still in the inventory
+    def is_present(self, row):
+        index = bisect_right(self.removed, row)
+        return 0 <= row < len(self.offsets) and not (index and self.removed[index - 1] == row)
+
+    # Method to remove a product, raises ValueError if it is not in the inventory
+    def remove(self, product):
+        with self.index_lock:
+            if product not in self:
+                raise ValueError("product not in inventory")
+            insort(self.removed, product.product_id)
+            del self.products[product.product_id]
+
+    # Method to get the first product with a name, or None
+    def get(self, name):
+        self.load()
+        column = self.header.index('Product')
+        encoded = name.encode()
+        for row in range(len(self.offsets)):
+            # Only rows whose bytes contain the name are parsed
+            start = self.offsets[row]
+            end = self.data.find(b'\n', start)
+            if self.data.find(encoded, start, end if end >= 0 else len(self.data)) < 0:
+                continue
+            if self.is_present(row) and self.read_row(row)[column] == name:
+                return self.product_at(row)
+        return None
+
+    # Method to get a product by id, or None
+    def get_by_id(self, product_id):
+        self.load()
+        if not self.is_present(product_id):
+            return None
+        return self.product_at(product_id)
+
+    # Method to release the memory map
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __contains__(self, product):
+        if product.product_id is None:
+            return False
+        return self.products.get(product.product_id) is product
+
+    def __iter__(self):
+        self.load()
+        for row in range(len(self.offsets)):
+            if self.is_present(row):
+                yield self.product_at(row)
+
+    def __len__(self):
+        self.load()
+        return len(self.offsets) - len(self.removed)
+
+    # Products can be read by position, like Inventory
+    def __getitem__(self, position):
+        length = len(self)
+        if position < 0:
+            position += length
+        if not 0 <= position < length:
+            raise IndexError("inventory index out of range")
+        return self.product_at(self.row_at(position))
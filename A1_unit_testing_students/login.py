@@ -1,42 +1,52 @@
-import json
+from storage import get_backend
+from console import Console
+from password_policy import DEFAULT_POLICY
+from passwords import check_password, hash_password, needs_rehash
+from ratelimit import get_login_limiter
 
 #Login as a user
-def login():
-    username = input("Enter your username:")
-    password = input("Enter your password:")
+def login(console=None):
+    if console is None:
+        console = Console()
+    username = console.input("Enter your username:")
+    password = console.input("Enter your password:")
+    #Too many attempts are refused before the user database is looked at
+    wait = get_login_limiter().attempt(username)
+    if wait:
+        console.print(f"Too many login attempts. Please try again in {wait} seconds.")
+        return None
     #Look for user in database
-    data = None
-    found_user = False
-    with open('users.json', "r") as file:
-        data = json.load(file)
-        for entry in data:
-            if entry["username"] == username:
-                found_user = True
-                if entry["password"] == password:
-                    print("Successfully logged in")
-                    return {"username": entry["username"], "wallet": entry["wallet"] }
-        if found_user:
-            print("Either username or password were incorrect")
-            return None
-    
-    if not data == None:
-        with open('users.json', "w") as file:
-            if not found_user:
-                answer = input("Do you want to create a new user with the username \"" + username + "\"?[Yes/No]")
-                if answer == "Yes":
-                    new_password = input("Enter the password you want to use:")
-                    if valid_password(new_password):
-                        new_user = {"username": username, "password": new_password, "wallet": 0}
-                        data.append(new_user)
-                        file.write(json.dumps(data, indent=4))
-                        
-                        print("New user was created!")
-                        return {"username": username, "wallet": 0}
+    backend = get_backend()
+    entry = backend.get_user(username)
+    if entry is not None:
+        if authenticate(backend, entry, password):
+            console.print("Successfully logged in")
+            return {"username": entry["username"], "wallet": entry["wallet"] }
+        console.print("Either username or password were incorrect")
+        return None
+
+    answer = console.input("Do you want to create a new user with the username \"" + username + "\"?[Yes/No]")
+    if answer == "Yes":
+        new_password = console.input("Enter the password you want to use:")
+        if valid_password(new_password):
+            # Someone else may have taken the name while the questions were answered
+            if backend.add_user(username, hash_password(new_password), 0) is None:
+                console.print("That username is not available")
+                return None
+
+            console.print("New user was created!")
+            return {"username": username, "wallet": 0}
     return None
 
-def valid_password(password):
-    if len(password) < 8:
+#Check the password of a user entry from the backend
+#A password still stored in plaintext, or hashed with another cost, is hashed again once it is known
+def authenticate(backend, entry, password):
+    if not check_password(password, entry["password"]):
         return False
-    has_upper = any(char.isupper() for char in password)
-    has_special = any(not char.isalnum() for char in password)
-    return has_upper and has_special
+    if needs_rehash(entry["password"]):
+        backend.set_password(entry["username"], hash_password(password))
+    return True
+
+#At least 8 characters, with an uppercase letter and a special character (see PasswordPolicy)
+def valid_password(password):
+    return DEFAULT_POLICY.check(password) is None
@@ -0,0 +1,27 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# Function to convert an amount (str, int, float or Decimal) to a whole number of cents
+def to_cents(amount):
+    if isinstance(amount, int) and not isinstance(amount, bool):
+        return amount * 100
+    try:
+        # Going through str() makes 0.1 mean ten cents rather than the nearest binary fraction
+        value = Decimal(str(amount)).scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ValueError("invalid amount: %r" % (amount,))
+    return int(value)
+
+# Function to convert cents back to an amount for display
+def from_cents(cents):
+    return cents / 100
+
+# Function to write cents as the shortest amount, the way prices appear in products.csv
+def format_cents(cents):
+    if cents % 100 == 0:
+        return str(cents // 100)
+    return str(from_cents(cents))
+
+# Function to add up price * quantity over many lines, all in cents
+# Converting the lists to arrays costs more than NumPy saves on the sum, so this stays plain Python
+def total_cents(prices, quantities):
+    return sum(price * quantity for price, quantity in zip(prices, quantities))
@@ -0,0 +1,126 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Character classes a policy can require, in the order failures are reported
+UPPERCASE = "uppercase"
+LOWERCASE = "lowercase"
+DIGIT = "digit"
+SPECIAL = "special"
+CLASSES = (UPPERCASE, LOWERCASE, DIGIT, SPECIAL)
+# Rule broken by a password that is too short
+LENGTH = "length"
+BITS = {UPPERCASE: 1, LOWERCASE: 2, DIGIT: 4, SPECIAL: 8}
+# Characters above this are left to the per-string check in check_many()
+TABLE_SIZE = 0x10000
+# Passwords longer than this are left to the per-string check in check_many()
+MAX_WIDTH = 64
+
+# Function to get the class bits of one character, with the same str methods valid_password used
+def classify(char):
+    bits = 0
+    if char.isupper():
+        bits |= BITS[UPPERCASE]
+    if char.islower():
+        bits |= BITS[LOWERCASE]
+    if char.isdigit():
+        bits |= BITS[DIGIT]
+    if not char.isalnum():
+        bits |= BITS[SPECIAL]
+    return bits
+
+# Class bits of the ASCII characters, the ones nearly every password is made of
+ASCII_BITS = {chr(code): classify(chr(code)) for code in range(128)}
+# Class bits of the first TABLE_SIZE code points, built the first time check_many() needs it
+_table = None
+
+# Function to get the lookup table of class bits by code point
+def class_table():
+    global _table
+    if _table is None:
+        _table = numpy.array([classify(chr(code)) for code in range(TABLE_SIZE)], dtype=numpy.uint8)
+    return _table
+
+#Rules a new password must follow: a minimum length and the character classes it must contain
+#check() looks at each character once and stops as soon as every class was seen;
+#check_many() checks a whole batch at once with NumPy
+class PasswordPolicy:
+    def __init__(self, min_length=8, required=(UPPERCASE, SPECIAL)):
+        unknown = set(required) - set(CLASSES)
+        if unknown:
+            raise ValueError("unknown character classes: %s" % ", ".join(sorted(unknown)))
+        self.min_length = min_length
+        # Kept in reporting order, whatever order they were given in
+        self.required = [name for name in CLASSES if name in required]
+        self.required_bits = sum(BITS[name] for name in self.required)
+        # Result for every combination of missing class bits, then for a password that is too short
+        self.results = [self.first_missing(missing) for missing in range(16)] + [LENGTH]
+
+    # Method to get the first rule from missing class bits
+    def first_missing(self, missing):
+        for name in self.required:
+            if missing & BITS[name]:
+                return name
+        return None
+
+    # Method to check one password, returns None if it is valid or else the first rule it breaks
+    def check(self, password):
+        if len(password) < self.min_length:
+            return LENGTH
+        missing = self.required_bits
+        for char in password:
+            bits = ASCII_BITS.get(char)
+            if bits is None:
+                bits = classify(char)
+            missing &= ~bits
+            if not missing:
+                return None
+        return self.first_missing(missing)
+
+    # Method to check a list of passwords, returns the result of check() for each
+    def check_many(self, passwords):
+        if numpy is None or not passwords:
+            return [self.check(password) for password in passwords]
+        lengths = numpy.fromiter(map(len, passwords), dtype=numpy.int64, count=len(passwords))
+        # A long password would make every row as wide as itself, those are checked one by one
+        long_rows = lengths > MAX_WIDTH
+        if not long_rows.any():
+            return self.check_table(passwords, lengths)
+        failures = [self.check(password) if len(password) > MAX_WIDTH else None for password in passwords]
+        rows = numpy.flatnonzero(~long_rows).tolist()
+        if rows:
+            for row, failure in zip(rows, self.check_table([passwords[row] for row in rows], lengths[rows])):
+                failures[row] = failure
+        return failures
+
+    # Method to check passwords of at most MAX_WIDTH characters with the lookup table
+    def check_table(self, passwords, lengths):
+        # Fixed-width UTF-32, so each row is the code points of one password padded with zeros
+        codes = numpy.array(passwords, dtype=str)
+        width = codes.dtype.itemsize // 4
+        if width == 0:
+            return [self.check(password) for password in passwords]
+        codes = codes.view(numpy.uint32).reshape(len(passwords), width)
+        # The padding must not count as a character
+        inside = numpy.arange(width) < lengths[:, None]
+        bits = class_table()[numpy.minimum(codes, TABLE_SIZE - 1)]
+        bits[~inside] = 0
+        missing = self.required_bits & ~numpy.bitwise_or.reduce(bits, axis=1).astype(numpy.int64)
+        outcome = numpy.where(lengths < self.min_length, len(self.results) - 1, missing)
+        failures = list(map(self.results.__getitem__, outcome.tolist()))
+        # Characters outside the table get the exact per-string check
+        for row in numpy.flatnonzero(((codes >= TABLE_SIZE) & inside).any(axis=1)).tolist():
+            failures[row] = self.check(passwords[row])
+        return failures
+
+    # Method to describe a broken rule for people
+    def describe(self, rule):
+        if rule == LENGTH:
+            return "shorter than %d characters" % self.min_length
+        if rule == SPECIAL:
+            return "no special character"
+        return "no %s character" % rule
+
+# The policy new accounts are held to
+DEFAULT_POLICY = PasswordPolicy()
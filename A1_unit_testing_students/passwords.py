@@ -0,0 +1,122 @@
+import argparse
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from collections import OrderedDict
+
+# Name stored in front of every hash, the only scheme so far
+ALGORITHM = "pbkdf2_sha256"
+# PBKDF2 iterations for new hashes; higher is slower to log in and slower to crack
+PASSWORD_ITERATIONS = 600_000
+# Set this to use another number of iterations, e.g. a low one for tests and benchmarks
+ITERATIONS_ENV = "SHOP_PASSWORD_ITERATIONS"
+SALT_BYTES = 16
+# Successful verifications remembered, so returning users do not pay for PBKDF2 every time
+VERIFY_CACHE_SIZE = 1024
+
+# Function to get the number of iterations new hashes use
+def password_iterations():
+    return int(os.environ.get(ITERATIONS_ENV, PASSWORD_ITERATIONS))
+
+# Function to hash a password with a fresh salt, as "pbkdf2_sha256$<iterations>$<salt>$<hash>"
+def hash_password(password, iterations=None):
+    if iterations is None:
+        iterations = password_iterations()
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return "%s$%d$%s$%s" % (ALGORITHM, iterations, base64.b64encode(salt).decode(), base64.b64encode(digest).decode())
+
+# Function to split a stored hash into (iterations, salt, hash), None if it is a plaintext password
+def split_hash(stored):
+    parts = stored.split("$")
+    if len(parts) != 4 or parts[0] != ALGORITHM or not parts[1].isdigit():
+        return None
+    try:
+        return int(parts[1]), base64.b64decode(parts[2], validate=True), base64.b64decode(parts[3], validate=True)
+    except ValueError:
+        return None
+
+# Function to check a password against what is stored for the user, a hash or (before migration) plaintext
+def verify_password(password, stored):
+    parts = split_hash(stored)
+    if parts is None:
+        return hmac.compare_digest(stored.encode(), password.encode())
+    iterations, salt, digest = parts
+    return hmac.compare_digest(hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations), digest)
+
+# Function to tell whether a stored password should be hashed again: plaintext, or another cost
+def needs_rehash(stored):
+    parts = split_hash(stored)
+    return parts is None or parts[0] != password_iterations()
+
+#Bounded LRU of recent successful verifications
+#Entries are a keyed HMAC of the stored hash and the password, never the password itself,
+#and the key only lives in this process; a new stored hash never matches an old entry
+class VerificationCache:
+    def __init__(self, size=VERIFY_CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.key = secrets.token_bytes(32)
+
+    # Method to get the cache key of a password and stored hash
+    def token(self, password, stored):
+        return hmac.new(self.key, stored.encode() + b"\0" + password.encode(), hashlib.sha256).digest()
+
+    # Method to verify a password, skipping PBKDF2 when the same pair was verified recently
+    def verify(self, password, stored):
+        token = self.token(password, stored)
+        with self.lock:
+            if token in self.entries:
+                self.entries.move_to_end(token)
+                return True
+        # Hashed outside the lock, so logins do not wait for each other
+        if not verify_password(password, stored):
+            return False
+        with self.lock:
+            self.entries[token] = True
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return True
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+# The cache shared by every login in the process
+_cache = VerificationCache()
+
+# Function to verify a login password through the shared cache
+def check_password(password, stored):
+    return _cache.verify(password, stored)
+
+# Function to forget every cached verification (used by tests and benchmarks)
+def reset_verification_cache():
+    _cache.clear()
+
+# Function to hash every plaintext password in a user file, returns how many were hashed
+def migrate_user_file(file_path, iterations=None):
+    # Imported here, user_store is not needed to hash and check passwords
+    from user_store import get_user_store
+    store = get_user_store(file_path)
+    with store.lock:
+        store.refresh()
+        hashes = {username: hash_password(entry["password"], iterations)
+                  for username, entry in store.users.items() if split_hash(entry["password"]) is None}
+        if hashes:
+            store.set_passwords(hashes)
+            store.compact()
+    return len(hashes)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hash the plaintext passwords left in a user file")
+    parser.add_argument("users_file", nargs="?", default="users.json")
+    parser.add_argument("--iterations", type=int, help="PBKDF2 iterations (default: %d)" % PASSWORD_ITERATIONS)
+    arguments = parser.parse_args()
+    print("%d passwords hashed" % migrate_user_file(arguments.users_file, arguments.iterations))
@@ -0,0 +1,102 @@
+import sys
+from array import array
+from catalog import read_csv_rows
+from checkout_and_payment import Product
+from money import from_cents, to_cents
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+#Columnar product table: one column per field instead of one object per product
+#Prices (in cents) and units live in compact typed arrays, names in a plain list
+class ProductTable:
+    def __init__(self):
+        self.names = []
+        self.prices = array('q')
+        self.units = array('q')
+
+    # Method to add a product row at the end of the table
+    def append(self, name, price, units):
+        self.names.append(name)
+        self.prices.append(to_cents(price))
+        self.units.append(int(units))
+
+    # Method to get product details as a list, like Product.get_product
+    def get_product(self, position):
+        return [self.names[position], from_cents(self.prices[position]), self.units[position]]
+
+    # Method to build a Product object for one row, for code that needs a real product
+    def to_product(self, position):
+        return Product(self.names[position], from_cents(self.prices[position]), self.units[position], position)
+
+    # Method to get NumPy views of the price and unit columns, without copying them
+    def as_numpy(self):
+        if numpy is None:
+            raise ImportError("NumPy is needed for as_numpy()")
+        return numpy.frombuffer(self.prices, dtype=numpy.int64), numpy.frombuffer(self.units, dtype=numpy.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+    # Method to load a table from a product CSV file, streaming the rows
+    # Not through the shared Catalog, which would keep every row as a list of strings
+    @classmethod
+    def from_csv(cls, file_path):
+        table = cls()
+        rows = read_csv_rows(file_path)
+        header = next(rows, None)
+        # An empty file has no header and no products
+        if header is None:
+            return table
+        name, price, units = header.index('Product'), header.index('Price'), header.index('Units')
+        for row in rows:
+            table.append(row[name], row[price], row[units])
+        return table
+
+#Product catalog held as NumPy arrays, for bulk queries that never build per-row objects
+#Prices are int64 cents, units int32, names an object array of interned strings
+class ProductColumns:
+    def __init__(self, names, prices, units):
+        self.names = names
+        self.prices = prices
+        self.units = units
+
+    # Method to get product details as a list, like Product.get_product
+    def get_product(self, position):
+        return [self.names[position], from_cents(int(self.prices[position])), int(self.units[position])]
+
+    # Method to get the value of all stock, in cents
+    def total_value(self):
+        return int(numpy.dot(self.prices, self.units.astype(numpy.int64)))
+
+    # Method to get the positions of products with fewer than threshold units
+    def low_stock(self, threshold):
+        return numpy.flatnonzero(self.units < threshold)
+
+    # Method to get the positions of products priced between low and high (inclusive)
+    def price_range(self, low, high):
+        return numpy.flatnonzero((self.prices >= to_cents(low)) & (self.prices <= to_cents(high)))
+
+    def __len__(self):
+        return len(self.names)
+
+# Function to load a product CSV file into NumPy columns in one bulk pass
+def load_product_columns(file_path):
+    if numpy is None:
+        raise ImportError("NumPy is needed for load_product_columns()")
+    rows = read_csv_rows(file_path)
+    header = next(rows, None)
+    rows = list(rows)
+    # An empty file has no header and no products
+    if header is None or not rows:
+        return ProductColumns(numpy.array([], dtype=object), numpy.array([], dtype=numpy.int64),
+                              numpy.array([], dtype=numpy.int32))
+    name, price, units = header.index('Product'), header.index('Price'), header.index('Units')
+    columns = list(zip(*rows))
+    names = numpy.array([sys.intern(value) for value in columns[name]], dtype=object)
+    # Through to_cents, so a price like 1.005 rounds the way it does everywhere else
+    prices = numpy.array([to_cents(value) for value in columns[price]], dtype=numpy.int64)
+    units_column = numpy.array(columns[units], dtype=numpy.int32)
+    return ProductColumns(names, prices, units_column)
@@ -1,49 +1,100 @@
 from login import login
-import re
 from checkout_and_payment import checkoutAndPayment
-import csv
-
-#Display all the products
-def display_csv_as_table(csv_filename):
-    with open(csv_filename, 'r', newline='') as csvfile:
-        csv_reader = csv.reader(csvfile)
-        header = next(csv_reader)
-        print(header)
-        # Print each row
-        for row in csv_reader:
-            print(row)
-
-#Display products filtered by name
-def display_filtered_table(csv_filename, search):
-    with open(csv_filename, 'r', newline='') as csvfile:
-        csv_reader = csv.reader(csvfile)
-        header = next(csv_reader)
-        print(header)
-
-        condition_index = header.index("Product")
-        # Print each row
-        for i, row in enumerate(csv_reader):
-            if re.search(row[condition_index],search,re.IGNORECASE):
-                print(row)
+from catalog import get_catalog, read_csv_rows
+from console import Console
+from itertools import islice
+
+# Function to write the header and rows to the console (stdout by default) with a single write
+def write_table(header, rows, console=None):
+    if console is None:
+        console = Console()
+    lines = [str(header)]
+    lines.extend(str(row) for row in rows)
+    console.write("\n".join(lines) + "\n")
+
+# Function to take one page from an iterator of rows
+# Returns the page and the offset of the next page (None when this is the last page)
+def take_page(rows, page_size, offset):
+    if page_size is None:
+        return list(islice(rows, offset, None)), None
+    # Read one row past the page to know whether there is a next page
+    page = list(islice(rows, offset, offset + page_size + 1))
+    if len(page) > page_size:
+        return page[:page_size], offset + page_size
+    return page, None
+
+#Display all the products, or the page of page_size rows starting at offset
+#Returns the offset of the next page, or None when there are no more rows
+#A page is streamed from the file, up to the row after it, until the catalog has parsed the file
+def display_csv_as_table(csv_filename, page_size=None, offset=0, console=None):
+    catalog = get_catalog(csv_filename)
+    if page_size is not None and not catalog.is_current():
+        rows = read_csv_rows(csv_filename)
+        try:
+            header = next(rows, None)
+            page, next_offset = take_page(rows, page_size, offset)
+        finally:
+            rows.close()
+    else:
+        header, rows = catalog.get_table()
+        page, next_offset = take_page(iter(rows), page_size, offset)
+    if header is None:
+        raise ValueError("%s is empty, it has no header" % csv_filename)
+    write_table(header, page, console)
+    return next_offset
+
+#Display products whose name contains the search text, optionally one page at a time
+#Returns the total number of matches
+def display_filtered_table(csv_filename, search, page_size=None, offset=0, console=None):
+    index = get_catalog(csv_filename).search_index()
+    if index.header is None:
+        raise ValueError("%s is empty, it has no header" % csv_filename)
+    return display_matches(index, search, page_size, offset, console)
+
+#Display the rows of a search index whose name contains the search text, optionally one page at a time
+#Returns the total number of matches
+def display_matches(index, search, page_size=None, offset=0, console=None):
+    matches = index.search(search)
+    page, next_offset = take_page(iter(matches), page_size, offset)
+    write_table(index.header, page, console)
+    return len(matches)
+
+#Display the products with names closest to a misspelled search
+def display_suggestions(csv_filename, search, limit=5, console=None):
+    display_index_suggestions(get_catalog(csv_filename).search_index(), search, limit, console)
+
+#Display the rows of a search index with names closest to a misspelled search
+def display_index_suggestions(index, search, limit=5, console=None):
+    if console is None:
+        console = Console()
+    suggestions = index.fuzzy_search(search, limit=limit)
+    if suggestions:
+        console.print("Did you mean:")
+        for similarity, row in suggestions:
+            console.print(row)
 
 #Search for a product and buy it
-def searchAndBuyProduct():
+#All questions and output go through the console, the terminal unless another one is given
+def searchAndBuyProduct(console=None):
+    if console is None:
+        console = Console()
     login_info = None
     marker = True
     #Login as a user
     while marker:
-        login_info = login()
+        login_info = login(console)
         if login_info is not None:
             marker = False
             break
     #Search for products then begin to shop
     while True:
-        search = input("Search for products in inventory (type all for whole inventory):")
+        search = console.input("Search for products in inventory (type all for whole inventory):")
         if search.lower() == "all":
-            display_csv_as_table("products.csv")
+            display_csv_as_table("products.csv", console=console)
         else:
-            display_filtered_table("products.csv", search)
-        check = input("Ready to shop? (Y/N)")
+            if display_filtered_table("products.csv", search, console=console) == 0:
+                display_suggestions("products.csv", search, console=console)
+        check = console.input("Ready to shop? (Y/N)")
         if check.lower() == "y":
             break
-    checkoutAndPayment(login_info)
\ No newline at end of file
+    checkoutAndPayment(login_info, console)
\ No newline at end of file
@@ -0,0 +1,106 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+# Login attempts allowed in a burst for one username, and how many per second come back
+USER_BURST = 5
+USER_RATE = 0.1
+# The same for one client address, which may try many usernames
+CLIENT_BURST = 20
+CLIENT_RATE = 1.0
+# Most keys remembered at once; beyond that the least recently used are forgotten
+MAX_KEYS = 100_000
+
+#Token bucket rate limiter for many keys in bounded memory
+#Each key holds [tokens, time of last refill]; an attempt takes one token and tokens come back at
+#rate per second up to burst. Keys are kept in least recently used order: a key idle long enough
+#to be full again is the same as a missing one and is dropped, and at most max_keys are kept
+class RateLimiter:
+    def __init__(self, burst, rate, max_keys=MAX_KEYS):
+        self.burst = burst
+        self.rate = rate
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+        self.clock = time.monotonic
+        # Seconds after which an unused bucket is full again
+        self.idle = burst / rate
+
+    # Method to drop the buckets that are full again, and the oldest ones above the cap
+    # (call with the lock held)
+    def evict(self, now):
+        while self.buckets:
+            key, (tokens, last) = next(iter(self.buckets.items()))
+            if now - last < self.idle and len(self.buckets) <= self.max_keys:
+                break
+            del self.buckets[key]
+
+    # Method to get the tokens a key has now (call with the lock held)
+    def tokens(self, key, now):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return self.burst
+        return min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+
+    # Method to take a token for a key, returns False if it has none left
+    def allow(self, key):
+        with self.lock:
+            now = self.clock()
+            tokens = self.tokens(key, now)
+            if tokens < 1:
+                return False
+            self.buckets[key] = [tokens - 1, now]
+            self.buckets.move_to_end(key)
+            self.evict(now)
+            return True
+
+    # Method to get the seconds until a key has a token again (0 if it has one)
+    def retry_after(self, key):
+        with self.lock:
+            tokens = self.tokens(key, self.clock())
+        return 0 if tokens >= 1 else math.ceil((1 - tokens) / self.rate)
+
+    def __len__(self):
+        return len(self.buckets)
+
+#Limits login attempts per username and per client, before the user database is looked at
+class LoginLimiter:
+    def __init__(self, max_keys=MAX_KEYS, user_burst=USER_BURST, user_rate=USER_RATE,
+                 client_burst=CLIENT_BURST, client_rate=CLIENT_RATE):
+        self.users = RateLimiter(user_burst, user_rate, max_keys)
+        self.clients = RateLimiter(client_burst, client_rate, max_keys)
+
+    # Method to record a login attempt, returns 0 if it may go ahead, else seconds to wait
+    # client is the address the attempt comes from, None for the terminal
+    def attempt(self, username, client=None):
+        # A client that is refused does not use up the username's attempts
+        # (a token may come back between the two calls, the wait is still at least a second)
+        if client is not None and not self.clients.allow(client):
+            return self.clients.retry_after(client) or 1
+        if not self.users.allow(username):
+            return self.users.retry_after(username) or 1
+        return 0
+
+# The limiter shared by every login in the process
+_limiter = None
+_limiter_lock = threading.Lock()
+
+# Function to get the shared login limiter, creating it on first use
+def get_login_limiter():
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = LoginLimiter()
+        return _limiter
+
+# Function to choose the login limiter for the whole process, e.g. a looser one for load tests
+def set_login_limiter(limiter):
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
+
+# Function to drop the shared login limiter (used by tests)
+def reset_login_limiter():
+    global _limiter
+    _limiter = None
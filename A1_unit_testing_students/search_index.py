@@ -0,0 +1,114 @@
+import csv
+import heapq
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+# Function to get the distinct three-letter substrings of a (lowercased) string
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+# Function to get the trigrams of a whole name padded with spaces, so short names and
+# the first and last letters also get trigrams
+def padded_trigrams(text):
+    return trigrams("  " + text + " ")
+
+# Function to compile a search pattern once and reuse it for later queries
+@lru_cache(maxsize=128)
+def compile_pattern(pattern):
+    return re.compile(pattern, re.IGNORECASE)
+
+#In-memory search index over the rows of a product CSV file
+class ProductSearchIndex:
+    def __init__(self, header, column="Product"):
+        self.header = header
+        # No header means an empty file, which has no rows to add
+        self.column = header.index(column) if header is not None else None
+        self.rows = []
+        # Lowercased product names, one per row
+        self.names = []
+        # Padded trigram -> ascending row numbers of the names containing it
+        self.postings = {}
+        # Number of distinct padded trigrams of each name
+        self.gram_counts = []
+        # (name, row number) pairs sorted by name, built on the first prefix search
+        self.sorted_names = None
+
+    # Method to add a CSV row to the index
+    def add_row(self, row):
+        number = len(self.rows)
+        name = row[self.column].lower()
+        self.rows.append(row)
+        self.names.append(name)
+        grams = padded_trigrams(name)
+        self.gram_counts.append(len(grams))
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(number)
+        self.sorted_names = None
+
+    # Method to find the rows whose name contains the search text (case-insensitive)
+    def search(self, text):
+        text = text.lower()
+        if not text:
+            return []
+        names = self.names
+        if len(text) < 3:
+            # Too short for the trigram index, scan the names instead
+            return [self.rows[i] for i, name in enumerate(names) if text in name]
+        # Only names holding every trigram of the text can match, so checking the
+        # rarest trigram's rows is enough (a padded name holds all its plain trigrams)
+        candidates = None
+        for gram in trigrams(text):
+            posting = self.postings.get(gram)
+            if posting is None:
+                return []
+            if candidates is None or len(posting) < len(candidates):
+                candidates = posting
+        return [self.rows[i] for i in candidates if text in names[i]]
+
+    # Method to find the rows whose name starts with the prefix (case-insensitive)
+    def prefix_search(self, prefix):
+        prefix = prefix.lower()
+        if self.sorted_names is None:
+            self.sorted_names = sorted(zip(self.names, range(len(self.names))))
+        sorted_names = self.sorted_names
+        matches = []
+        position = bisect_left(sorted_names, (prefix, -1))
+        while position < len(sorted_names) and sorted_names[position][0].startswith(prefix):
+            matches.append(sorted_names[position][1])
+            position += 1
+        return [self.rows[i] for i in sorted(matches)]
+
+    # Method to rank rows by how similar their name is to the (possibly misspelled) text
+    # Returns up to limit (similarity, row) pairs, best first, with similarity >= threshold
+    def fuzzy_search(self, text, threshold=0.3, limit=10):
+        grams = padded_trigrams(text.lower())
+        if not grams:
+            return []
+        # Count the trigrams each name shares with the text
+        shared = {}
+        for gram in grams:
+            for number in self.postings.get(gram, ()):
+                shared[number] = shared.get(number, 0) + 1
+        scored = []
+        for number, count in shared.items():
+            # Jaccard similarity of the two trigram sets
+            similarity = count / (len(grams) + self.gram_counts[number] - count)
+            if similarity >= threshold:
+                scored.append((similarity, -number))
+        best = heapq.nlargest(limit, scored)
+        return [(similarity, self.rows[-negated]) for similarity, negated in best]
+
+    # Method to find the rows whose name matches a regular expression (case-insensitive)
+    def regex_search(self, pattern):
+        search = compile_pattern(pattern).search
+        return [self.rows[i] for i, name in enumerate(self.names) if search(name)]
+
+# Function to build a search index from a CSV file
+def build_search_index(csv_filename, column="Product"):
+    with open(csv_filename, 'r', newline='') as csvfile:
+        csv_reader = csv.reader(csvfile)
+        index = ProductSearchIndex(next(csv_reader), column)
+        for row in csv_reader:
+            index.add_row(row)
+    return index
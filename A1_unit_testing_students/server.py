@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from checkout_and_payment import checkout, get_inventory
+from console import BufferedConsole
+from login import authenticate, valid_password
+from passwords import hash_password
+from ratelimit import get_login_limiter
+from money import format_cents
+from products import (display_csv_as_table, display_filtered_table, display_index_suggestions,
+                      display_matches, display_suggestions, write_table)
+from search_index import ProductSearchIndex
+from sessions import get_session_manager
+from storage import get_backend
+
+# Threads that run the commands, which read and write the data files
+WORKERS = 8
+# Longest request line accepted from a client
+MAX_LINE = 4096
+
+#What the server knows about one connection
+class ClientState:
+    def __init__(self, client=None):
+        self.session = None
+        # Address the connection comes from, None on a Unix socket
+        self.client = client
+
+#Shop server speaking a line protocol: one command per line, answered by
+#"OK <n>" or "ERR <n>" followed by n lines of output
+class ShopServer:
+    def __init__(self, backend=None, products_file=None, workers=WORKERS):
+        self.backend = backend if backend is not None else get_backend()
+        # LIST and SEARCH show the backend's product file; a backend without one (SQLite) is shown from the inventory
+        self.products_file = products_file if products_file is not None else getattr(self.backend, "products_file", None)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.sessions = get_session_manager()
+        self.products = None
+        self.menu = None
+        self.server = None
+        # Open connections, as handler task -> writer, so close() can end them
+        self.connections = {}
+        self.commands = {
+            "LOGIN": self.login,
+            "REGISTER": self.register,
+            "LIST": self.list_products,
+            "SEARCH": self.search,
+            "MENU": self.show_menu,
+            "ADD": self.add,
+            "CART": self.show_cart,
+            "CHECKOUT": self.checkout,
+            "LOGOUT": self.logout,
+        }
+
+    # Method to load the shared inventory and start listening, on TCP or on a Unix socket
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        loop = asyncio.get_running_loop()
+        # Every shopper buys from the same inventory, so reservations and stock are shared,
+        # also with checkoutAndPayment sessions in the same process
+        self.products = await loop.run_in_executor(self.pool, get_inventory, self.backend)
+        self.menu = list(self.products)
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle, path=path, limit=MAX_LINE)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        return self.server
+
+    # Method to stop listening, disconnect the clients still connected and end their sessions
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+        for writer in list(self.connections.values()):
+            writer.close()
+        if self.connections:
+            await asyncio.gather(*self.connections, return_exceptions=True)
+        if self.server is not None:
+            await self.server.wait_closed()
+        self.pool.shutdown(wait=True)
+
+    # Method to serve one connection until it sends QUIT or disconnects
+    async def handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        peer = writer.get_extra_info("peername")
+        state = ClientState(peer[0] if isinstance(peer, tuple) else None)
+        task = asyncio.current_task()
+        self.connections[task] = writer
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break
+                if not line:
+                    break
+                name, _, argument = line.decode(errors="replace").strip().partition(" ")
+                name = name.upper()
+                if name == "QUIT":
+                    writer.write(b"OK 0\n")
+                    break
+                command = self.commands.get(name)
+                # Each command writes to its own console, which becomes the reply
+                console = BufferedConsole()
+                if command is None:
+                    ok = False
+                    console.print("Unknown command %s" % name)
+                else:
+                    # Commands touch the data files, so they run in the pool, never on the event loop
+                    ok = await loop.run_in_executor(self.pool, command, state, argument.strip(), console)
+                lines = console.getvalue().splitlines()
+                writer.write(("%s %d\n" % ("OK" if ok else "ERR", len(lines))).encode())
+                writer.write("".join(line + "\n" for line in lines).encode())
+                await writer.drain()
+        finally:
+            del self.connections[task]
+            if state.session is not None:
+                self.sessions.end(state.session.session_id)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    # Method to get the session of a connection, printing why if there is none
+    def active_session(self, state, console):
+        if state.session is None:
+            console.print("Please log in first.")
+            return None
+        if self.sessions.get(state.session.session_id) is None:
+            state.session = None
+            console.print("Your session has expired. Please log in again.")
+            return None
+        return state.session
+
+    # Command LOGIN <username> <password>
+    def login(self, state, argument, console):
+        username, _, password = argument.partition(" ")
+        wait = get_login_limiter().attempt(username, state.client)
+        if wait:
+            console.print(f"Too many login attempts. Please try again in {wait} seconds.")
+            return False
+        entry = self.backend.get_user(username)
+        if entry is None or not authenticate(self.backend, entry, password):
+            console.print("Either username or password were incorrect")
+            return False
+        if state.session is not None:
+            self.sessions.end(state.session.session_id)
+        state.session = self.sessions.create({"username": entry["username"], "wallet": entry["wallet"]}, self.products)
+        console.print("Successfully logged in")
+        return True
+
+    # Command REGISTER <username> <password>
+    def register(self, state, argument, console):
+        username, _, password = argument.partition(" ")
+        if not username or self.backend.get_user(username) is not None:
+            console.print("That username is not available")
+            return False
+        if not valid_password(password):
+            console.print("The password is not valid")
+            return False
+        # Another client may have taken the name since the check above
+        if self.backend.add_user(username, hash_password(password), 0) is None:
+            console.print("That username is not available")
+            return False
+        console.print("New user was created!")
+        return self.login(state, argument, console)
+
+    # Method to index the products in the inventory, as rows written like the product CSV file
+    def inventory_index(self):
+        index = ProductSearchIndex(["Product", "Price", "Units"])
+        for product in self.products:
+            index.add_row([product.name, format_cents(product.price_cents), str(product.units)])
+        return index
+
+    # Command LIST: the whole product table
+    def list_products(self, state, argument, console):
+        if self.products_file is None:
+            index = self.inventory_index()
+            write_table(index.header, index.rows, console)
+        else:
+            display_csv_as_table(self.products_file, console=console)
+        return True
+
+    # Command SEARCH <text>: products whose name contains the text, or suggestions
+    def search(self, state, argument, console):
+        if self.products_file is None:
+            index = self.inventory_index()
+            if display_matches(index, argument, console=console) == 0:
+                display_index_suggestions(index, argument, console=console)
+        elif display_filtered_table(self.products_file, argument, console=console) == 0:
+            display_suggestions(self.products_file, argument, console=console)
+        return True
+
+    # Command MENU: the numbered products that ADD takes
+    def show_menu(self, state, argument, console):
+        for i, product in enumerate(self.menu):
+            console.print(f"{i+1}. {product.name} - ${product.price} - Units: {product.units}")
+        return True
+
+    # Command ADD <number> [quantity]: reserve units of a menu product and put them in the cart
+    def add(self, state, argument, console):
+        session = self.active_session(state, console)
+        if session is None:
+            return False
+        choice, _, quantity = argument.partition(" ")
+        quantity = quantity.strip() or "1"
+        if not (choice.isdigit() and 1 <= int(choice) <= len(self.menu) and quantity.isdigit() and int(quantity) > 0):
+            console.print("Invalid input. Please try again.")
+            return False
+        product = self.menu[int(choice) - 1]
+        if not self.products.reserve(product, int(quantity), session.cart):
+            console.print(f"Sorry, {product.name} is out of stock.")
+            return False
+        session.cart.add_item(product, int(quantity))
+        console.print(f"{product.name} added to your cart.")
+        return True
+
+    # Command CART: the products in the cart
+    def show_cart(self, state, argument, console):
+        session = self.active_session(state, console)
+        if session is None:
+            return False
+        for product in session.cart.retrieve_item():
+            console.print(product.get_product())
+        return True
+
+    # Command CHECKOUT: pay for the cart
+    def checkout(self, state, argument, console):
+        session = self.active_session(state, console)
+        if session is None:
+            return False
+        return checkout(session.user, session.cart, self.products, self.backend, console)
+
+    # Command LOGOUT: end the session, giving back the cart's reservations
+    # The wallet is not stored, CHECKOUT already debited it in the backend
+    def logout(self, state, argument, console):
+        session = self.active_session(state, console)
+        if session is None:
+            return False
+        self.sessions.end(session.session_id)
+        state.session = None
+        console.print("You have been logged out")
+        return True
+
+# Function to run the server until interrupted
+async def serve(host, port, path):
+    server = ShopServer()
+    listener = await server.start(host, port, path)
+    where = path if path is not None else "%s:%d" % listener.sockets[0].getsockname()[:2]
+    print("Serving the shop on %s" % where)
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the shop as a line-protocol server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    arguments = parser.parse_args()
+    try:
+        asyncio.run(serve(arguments.host, arguments.port, arguments.unix))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,111 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds without activity after which a session is ended
+SESSION_IDLE_TIMEOUT = 30 * 60
+# Most sessions kept at once; creating one more ends the least recently used
+MAX_SESSIONS = 10000
+
+#One logged-in shopper: the user, their cart and the inventory their cart reserves stock in
+class Session:
+    # No per-instance __dict__, thousands of these can be alive at once
+    __slots__ = ("session_id", "user", "cart", "inventory", "last_seen")
+
+    def __init__(self, session_id, user, cart, inventory, last_seen):
+        self.session_id = session_id
+        self.user = user
+        self.cart = cart
+        self.inventory = inventory
+        self.last_seen = last_seen
+
+    # Method to give back the cart's reserved stock and empty it
+    def close(self):
+        if self.inventory is not None:
+            self.inventory.release(self.cart)
+        self.cart.clear_items()
+
+#Sessions keyed by session id, kept in least recently used order
+#Idle sessions are ended when the manager is next used, and the number of sessions is capped
+class SessionManager:
+    def __init__(self, idle_timeout=SESSION_IDLE_TIMEOUT, max_sessions=MAX_SESSIONS):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+        self.clock = time.monotonic
+
+    # Method to take the idle sessions, and the oldest ones above the cap, out of the manager
+    # (call with the lock held; the caller closes them after letting go of the lock)
+    def take_expired(self, now, room=0):
+        expired = []
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if session.last_seen + self.idle_timeout > now and len(self.sessions) + room <= self.max_sessions:
+                break
+            expired.append(self.sessions.popitem(last=False)[1])
+        return expired
+
+    # Method to start a session for a logged-in user, returns the new Session
+    def create(self, login_info, inventory=None):
+        # Imported here, checkout_and_payment creates its sessions through this module
+        from checkout_and_payment import ShoppingCart, User
+        user = User(login_info["username"], login_info["wallet"])
+        with self.lock:
+            now = self.clock()
+            expired = self.take_expired(now, room=1)
+            session_id = secrets.token_hex(16)
+            session = Session(session_id, user, ShoppingCart(), inventory, now)
+            self.sessions[session_id] = session
+        for old in expired:
+            old.close()
+        return session
+
+    # Method to get a session and mark it as active, returns None if it ended or never existed
+    def get(self, session_id):
+        with self.lock:
+            now = self.clock()
+            expired = self.take_expired(now)
+            session = self.sessions.get(session_id)
+            if session is not None:
+                session.last_seen = now
+                self.sessions.move_to_end(session_id)
+        for old in expired:
+            old.close()
+        return session
+
+    # Method to end a session, giving back whatever its cart reserved
+    def end(self, session_id):
+        with self.lock:
+            session = self.sessions.pop(session_id, None)
+        if session is not None:
+            session.close()
+
+    # Method to end every idle session now
+    def evict_idle(self):
+        with self.lock:
+            expired = self.take_expired(self.clock())
+        for old in expired:
+            old.close()
+        return len(expired)
+
+    def __len__(self):
+        return len(self.sessions)
+
+# The session manager shared by every shopper in the process
+_manager = None
+_manager_lock = threading.Lock()
+
+# Function to get the shared session manager, creating it on first use
+def get_session_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = SessionManager()
+        return _manager
+
+# Function to drop the shared session manager (used by tests)
+def reset_session_manager():
+    global _manager
+    _manager = None
@@ -0,0 +1,133 @@
+import os
+import struct
+import sys
+from array import array
+from atomic import atomic_write
+from catalog import get_catalog
+from money import from_cents, to_cents
+
+# Binary snapshots of the text data files, rebuilt whenever the source file changes
+# Layout: header, then each int64 column as a packed array, then a string table of
+# NUL-separated UTF-8 strings. Everything is loaded with one read and no per-row parsing.
+MAGIC = b"SHOP"
+VERSION = 2
+PRODUCTS = 1
+USERS = 2
+# magic, version, kind, byte order, source mtime_ns, source size, rows, columns, string table bytes
+HEADER = struct.Struct("<4sBBBxqqIIQ")
+BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+# Function to get the path of the snapshot kept next to a source file
+def snapshot_path(source_path):
+    return source_path + ".snap"
+
+# Function to get the modification time and size of a source file
+def source_signature(source_path):
+    stat = os.stat(source_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+# Function to write a snapshot, returns False if the data cannot be stored or the file cannot be written
+def write_snapshot(path, kind, signature, columns, strings):
+    if any("\0" in string for string in strings):
+        return False
+    table = "\0".join(strings).encode()
+    rows = len(columns[0]) if columns else 0
+    try:
+        packed = [array('q', column).tobytes() for column in columns]
+    except (TypeError, OverflowError):
+        return False
+    header = HEADER.pack(MAGIC, VERSION, kind, BYTE_ORDER, signature[0], signature[1], rows, len(columns), len(table))
+    try:
+        # No fsync, a snapshot lost in a crash is rebuilt from its source file
+        with atomic_write(path, "wb", durable=False) as file:
+            file.write(header + b"".join(packed) + table)
+    except OSError:
+        return False
+    return True
+
+# Function to read a snapshot, returns (columns, strings) or None if it is missing, stale or damaged
+def read_snapshot(path, kind, signature):
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, stored_kind, byte_order, mtime_ns, size, rows, column_count, table_size = HEADER.unpack_from(data)
+    if (magic, version, stored_kind, byte_order) != (MAGIC, VERSION, kind, BYTE_ORDER):
+        return None
+    if (mtime_ns, size) != tuple(signature):
+        return None
+    position = HEADER.size
+    if len(data) != position + rows * 8 * column_count + table_size:
+        return None
+    columns = []
+    for _ in range(column_count):
+        column = array('q')
+        column.frombytes(data[position:position + rows * 8])
+        columns.append(column)
+        position += rows * 8
+    text = data[position:].decode()
+    strings = text.split("\0") if text or rows else []
+    return columns, strings
+
+# Function to get the products of a CSV file as (id, name, price_cents, units) rows
+# The rows come from the snapshot when it is current, otherwise from the CSV file, which is then snapshotted
+def load_product_records(csv_filename):
+    path = os.path.abspath(csv_filename)
+    # Taken before parsing, so a change made meanwhile leaves a snapshot that is already stale
+    signature = source_signature(path)
+    snapshot = read_snapshot(snapshot_path(path), PRODUCTS, signature)
+    if snapshot is not None:
+        (prices, units), names = snapshot
+        return list(zip(range(len(names)), names, prices, units))
+    records = [(product_id, name, to_cents(price), int(units))
+               for product_id, name, price, units in get_catalog(csv_filename).product_rows()]
+    write_snapshot(snapshot_path(path), PRODUCTS, signature,
+                   [[record[2] for record in records], [record[3] for record in records]],
+                   [record[1] for record in records])
+    return records
+
+# Function to read the users snapshot of a JSON file, as a username -> entry dict, or None
+def read_user_snapshot(json_path, signature):
+    snapshot = read_snapshot(snapshot_path(json_path), USERS, signature)
+    if snapshot is None:
+        return None
+    (wallets, whole), strings = snapshot
+    users = {}
+    for username, password, wallet_cents, is_int in zip(strings[0::2], strings[1::2], wallets, whole):
+        wallet = wallet_cents // 100 if is_int else from_cents(wallet_cents)
+        users[username] = {"username": username, "password": password, "wallet": wallet}
+    return users
+
+# Function to snapshot the users of a JSON file, skipped if an entry has fields the snapshot cannot hold
+# Wallets are kept as cents plus whether they were an int, and must read back exactly as the JSON
+# file has them: a float with sub-cent digits or a wallet stored as a string is not snapshotted
+def write_user_snapshot(json_path, signature, users):
+    strings = []
+    wallets = []
+    whole = []
+    for entry in users.values():
+        if set(entry) != {"username", "password", "wallet"}:
+            return False
+        if not isinstance(entry["username"], str) or not isinstance(entry["password"], str):
+            return False
+        wallet = entry["wallet"]
+        if type(wallet) is int:
+            wallets.append(wallet * 100)
+            whole.append(1)
+        elif type(wallet) is float:
+            try:
+                wallet_cents = to_cents(wallet)
+            except ValueError:
+                return False
+            if from_cents(wallet_cents) != wallet:
+                return False
+            wallets.append(wallet_cents)
+            whole.append(0)
+        else:
+            return False
+        strings.append(entry["username"])
+        strings.append(entry["password"])
+    return write_snapshot(snapshot_path(json_path), USERS, signature, [wallets, whole], strings)
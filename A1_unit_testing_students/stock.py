@@ -0,0 +1,174 @@
+import threading
+import time
+
+# Seconds a cart keeps its reserved units without being touched
+RESERVATION_TTL = 15 * 60
+# Number of locks shared out between the products; a product always uses the same one
+LOCK_STRIPES = 64
+
+#Thread-safe stock keeping shared by Inventory and LazyInventory
+#Stock changes happen while holding the locks of the products involved, and units can be
+#reserved for a cart (the holder) so other carts cannot buy them until they expire
+#The inventory class provides __contains__ and remove()
+class StockControl:
+    def __init__(self):
+        self.locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        # Product -> {holder: [quantity, expiry time]}
+        self.reservations = {}
+        # Holder -> products it has reserved, to release them all at once
+        self.held = {}
+        # Guards self.held, which is shared by all the product locks
+        self.held_lock = threading.Lock()
+        self.clock = time.monotonic
+
+    # Method to lock the given products for the duration of a with block
+    # All the locks a cart needs are taken together when the block starts
+    def locked(self, products):
+        return StripeLocks(self.locks, products)
+
+    # Method to drop the reservations of a product that have expired
+    def expire_product(self, product, now):
+        holders = self.reservations.get(product)
+        if not holders:
+            return
+        for holder, (quantity, expires) in list(holders.items()):
+            if expires <= now:
+                self.drop(product, holder)
+
+    # Method to remove one holder's reservation of a product
+    def drop(self, product, holder):
+        holders = self.reservations.get(product)
+        if holders is None or holders.pop(holder, None) is None:
+            return
+        if not holders:
+            del self.reservations[product]
+        with self.held_lock:
+            products = self.held.get(holder)
+            if products is not None:
+                products.discard(product)
+                if not products:
+                    del self.held[holder]
+
+    # Method to get the units of a product that a holder can buy (call with the product locked)
+    # Callers checking many products can read the clock once and pass it as now
+    def available(self, product, holder=None, now=None):
+        if product not in self:
+            return 0
+        holders = self.reservations.get(product)
+        # Nobody holds any units of the product, which is the common case
+        if not holders:
+            return max(0, product.units)
+        self.expire_product(product, self.clock() if now is None else now)
+        reserved = sum(quantity for other, (quantity, _) in holders.items() if other != holder)
+        return max(0, product.units - reserved)
+
+    # Method to get the units of many products that a holder can buy, as a dict (call with them locked)
+    # The clock is read at most once, and only for products someone holds a reservation of
+    def available_all(self, products, holder=None):
+        reservations = self.reservations
+        now = None
+        units = {}
+        for product in products:
+            if product not in self:
+                units[product] = 0
+            elif product not in reservations:
+                units[product] = product.units if product.units > 0 else 0
+            else:
+                if now is None:
+                    now = self.clock()
+                units[product] = self.available(product, holder, now)
+        return units
+
+    # Method to get the units of a product a holder has reserved
+    def reserved_by(self, product, holder):
+        with self.locked([product]):
+            self.expire_product(product, self.clock())
+            entry = self.reservations.get(product, {}).get(holder)
+            return entry[0] if entry else 0
+
+    # Method to reserve more units of a product for a holder, returns False if there are not enough
+    # Every reservation of the holder is renewed for another ttl seconds
+    def reserve(self, product, quantity, holder, ttl=RESERVATION_TTL):
+        with self.locked([product]):
+            entry = self.reservations.get(product, {}).get(holder)
+            held = entry[0] if entry else 0
+            if self.available(product, holder) < held + quantity:
+                return False
+            expires = self.clock() + ttl
+            self.reservations.setdefault(product, {})[holder] = [held + quantity, expires]
+            with self.held_lock:
+                self.held.setdefault(holder, set()).add(product)
+                others = list(self.held[holder])
+        for other in others:
+            with self.locked([other]):
+                entry = self.reservations.get(other, {}).get(holder)
+                if entry is not None:
+                    entry[1] = expires
+        return True
+
+    # Method to give back a holder's reservation of one product, or of every product
+    def release(self, holder, product=None):
+        if product is not None:
+            products = [product]
+        else:
+            with self.held_lock:
+                products = list(self.held.get(holder, ()))
+        for product in products:
+            with self.locked([product]):
+                self.drop(product, holder)
+
+    # Method to take sold units out of stock (call with the product locked)
+    # The holder's reservation is used up first and the product leaves the inventory when it runs out
+    def take(self, product, quantity, holder=None):
+        holders = self.reservations.get(product)
+        entry = holders.get(holder) if holders else None
+        if entry is not None:
+            if entry[0] <= quantity:
+                self.drop(product, holder)
+            else:
+                entry[0] -= quantity
+        product.units -= quantity
+        if product.units <= 0 and product in self:
+            self.remove(product)
+
+    # Method to take the sold units of many products out of stock (call with them locked)
+    def take_all(self, quantities, holder=None):
+        reservations = self.reservations
+        for product, quantity in quantities.items():
+            if product in reservations:
+                self.take(product, quantity, holder)
+                continue
+            product.units -= quantity
+            if product.units <= 0 and product in self:
+                self.remove(product)
+
+    # Method to take units of a product out of stock, removing it when it runs out
+    def decrement(self, product, quantity=1):
+        with self.locked([product]):
+            self.take(product, quantity)
+
+    # Method to drop every expired reservation, for callers that want to bound memory
+    def expire(self):
+        now = self.clock()
+        for product in list(self.reservations):
+            with self.locked([product]):
+                self.expire_product(product, now)
+
+#Context manager holding the stripe locks of a set of products
+class StripeLocks:
+    __slots__ = ("held",)
+
+    def __init__(self, locks, products):
+        count = len(locks)
+        # Always taken in the same order, so two carts with the same products cannot deadlock
+        self.held = [locks[stripe] for stripe in sorted({hash(product) % count for product in products})]
+
+    def __enter__(self):
+        for lock in self.held:
+            lock.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        for lock in reversed(self.held):
+            lock.release()
+        return False
@@ -0,0 +1,274 @@
+import csv
+import json
+import os
+import sqlite3
+import threading
+from atomic import atomic_write
+from catalog import get_catalog
+from snapshot import load_product_records
+from money import format_cents, from_cents, to_cents
+from user_store import get_user_store
+
+# Default data files used by the file backend
+USERS_FILE = 'users.json'
+PRODUCTS_FILE = 'products.csv'
+
+# Set this to a database path to run the shop on the SQLite backend
+DATABASE_ENV = 'SHOP_DATABASE'
+
+#Storage backend that keeps users in a JSON file and products in a CSV file
+class FileBackend:
+    def __init__(self, users_file=USERS_FILE, products_file=PRODUCTS_FILE):
+        self.users_file = users_file
+        self.products_file = products_file
+
+    # Method to look up a user record by username
+    def get_user(self, username):
+        return get_user_store(self.users_file).get_user(username)
+
+    # Method to create a new user, returns None if the username is taken
+    def add_user(self, username, password, wallet=0):
+        return get_user_store(self.users_file).add_user(username, password, wallet)
+
+    # Method to create many users at once, from entries with username, password and wallet
+    # Taken usernames are skipped
+    def add_users(self, entries):
+        if entries:
+            get_user_store(self.users_file).add_users(entries)
+
+    # Method to replace the stored password (hash) of a user
+    def set_password(self, username, password):
+        get_user_store(self.users_file).set_password(username, password)
+
+    # Method to store a new wallet balance for a user
+    def update_wallet(self, username, wallet):
+        get_user_store(self.users_file).update_wallet(username, wallet)
+
+    # Method to take amounts off many wallets at once, as username -> cents
+    # Each balance is read again under the store's lock, so money spent meanwhile by others is kept
+    def debit_wallets(self, debits):
+        if not debits:
+            return
+        store = get_user_store(self.users_file)
+        with store.lock:
+            wallets = {}
+            for username, cents in debits.items():
+                entry = store.get_user(username)
+                if entry is not None:
+                    wallets[username] = from_cents(to_cents(entry["wallet"]) - cents)
+            store.update_wallets(wallets)
+
+    # Method to name where the products come from, sessions on the same source share one inventory
+    def products_source(self):
+        return ("file", os.path.abspath(self.products_file))
+
+    # Method to get all products as (id, name, price_cents, units) rows, from the snapshot when it is current
+    def product_records(self):
+        return load_product_records(self.products_file)
+
+    # Method to take sold units (product -> units) off the stock in the CSV file, leaving out sold-out products
+    # The file is read again while its lock is held, so units sold meanwhile by others are kept;
+    # products are matched by name, since row positions shift when a product sells out
+    # The file is replaced in one step, so readers see either the old or the new stock
+    def sell_stock(self, sold):
+        if not sold:
+            return
+        by_name = {}
+        for product, quantity in sold.items():
+            by_name[product.name] = by_name.get(product.name, 0) + quantity
+        with atomic_write(self.products_file, newline="", lock=True) as file:
+            writer = csv.writer(file)
+            writer.writerow(["Product", "Price", "Units"])
+            for product_id, name, price, units in get_catalog(self.products_file).product_rows():
+                units = int(units) - by_name.pop(name, 0)
+                if units > 0:
+                    writer.writerow([name, price, units])
+
+    # Method to debit the wallet for a purchase of total_cents, returns False if it cannot be paid
+    # or if a product in sold (product -> units bought) has fewer units left
+    # The CSV inventory is never written back, so stock only lives in the shared inventory's products
+    def commit_checkout(self, username, total_cents, sold):
+        if any(product.units < quantity for product, quantity in sold.items()):
+            return False
+        store = get_user_store(self.users_file)
+        # Held across the read and the write, so two checkouts cannot both spend the same money
+        with store.lock:
+            entry = store.get_user(username)
+            if entry is None:
+                return False
+            wallet_cents = to_cents(entry["wallet"])
+            if wallet_cents < total_cents:
+                return False
+            store.update_wallet(username, from_cents(wallet_cents - total_cents))
+            return True
+
+#Storage backend that keeps users and products in an SQLite database
+class SQLiteBackend:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.local = threading.local()
+        conn = self.connection()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS users (
+                username TEXT PRIMARY KEY,
+                password TEXT NOT NULL,
+                wallet_cents INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS products (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                price_cents INTEGER NOT NULL,
+                units INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS products_name ON products (name);
+        """)
+
+    # Method to get this thread's connection, opening it on first use
+    def connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            # Autocommit mode, transactions are started explicitly
+            conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    # Method to close this thread's connection
+    def close(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    # Method to copy users and products from the JSON and CSV files into the database
+    # With only_if_empty, nothing is copied into a database that already has users or products
+    # Returns True if the files were copied
+    def import_files(self, users_file=USERS_FILE, products_file=PRODUCTS_FILE, only_if_empty=False):
+        with open(users_file, "r") as file:
+            users = json.load(file)
+        records = load_product_records(products_file)
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Checked inside the transaction, so two processes opening a new database import once
+            if only_if_empty and (conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is not None or
+                                  conn.execute("SELECT 1 FROM products LIMIT 1").fetchone() is not None):
+                conn.execute("ROLLBACK")
+                return False
+            conn.executemany("INSERT OR IGNORE INTO users (username, password, wallet_cents) VALUES (?, ?, ?)",
+                             [(entry["username"], entry["password"], to_cents(entry["wallet"])) for entry in users])
+            conn.execute("DELETE FROM products")
+            conn.executemany("INSERT INTO products (id, name, price_cents, units) VALUES (?, ?, ?, ?)", records)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return True
+
+    # Method to look up a user record by username
+    def get_user(self, username):
+        row = self.connection().execute(
+            "SELECT username, password, wallet_cents FROM users WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            return None
+        return {"username": row[0], "password": row[1], "wallet": from_cents(row[2])}
+
+    # Method to create a new user, returns None if the username is taken
+    def add_user(self, username, password, wallet=0):
+        try:
+            self.connection().execute(
+                "INSERT INTO users (username, password, wallet_cents) VALUES (?, ?, ?)", (username, password, to_cents(wallet)))
+        except sqlite3.IntegrityError:
+            return None
+        return {"username": username, "password": password, "wallet": wallet}
+
+    # Method to create many users at once, in one transaction; taken usernames are skipped
+    def add_users(self, entries):
+        self.run_transaction("INSERT OR IGNORE INTO users (username, password, wallet_cents) VALUES (?, ?, ?)",
+                             [(entry["username"], entry["password"], to_cents(entry["wallet"])) for entry in entries])
+
+    # Method to replace the stored password (hash) of a user
+    def set_password(self, username, password):
+        self.connection().execute("UPDATE users SET password = ? WHERE username = ?", (password, username))
+
+    # Method to store a new wallet balance for a user
+    def update_wallet(self, username, wallet):
+        self.connection().execute("UPDATE users SET wallet_cents = ? WHERE username = ?", (to_cents(wallet), username))
+
+    # Method to take amounts off many wallets at once, as username -> cents, in one transaction
+    def debit_wallets(self, debits):
+        self.run_transaction("UPDATE users SET wallet_cents = wallet_cents - ? WHERE username = ?",
+                             [(cents, username) for username, cents in debits.items()])
+
+    # Method to take sold units (product -> units) off the stock, in one transaction
+    def sell_stock(self, sold):
+        self.run_transaction("UPDATE products SET units = MAX(units - ?, 0) WHERE id = ?",
+                             [(quantity, product.product_id) for product, quantity in sold.items()])
+
+    # Method to run one statement for many rows in a single transaction
+    def run_transaction(self, statement, rows):
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(statement, rows)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # Method to name where the products come from, sessions on the same source share one inventory
+    def products_source(self):
+        return ("sqlite", os.path.abspath(self.db_path))
+
+    # Method to get the products in stock as (id, name, price_cents, units) rows
+    # Sold-out products keep their row with 0 units, they are left out like the file backend does
+    def product_records(self):
+        return self.connection().execute(
+            "SELECT id, name, price_cents, units FROM products WHERE units > 0 ORDER BY id").fetchall()
+
+    # Method to debit total_cents from the wallet and decrement stock in one transaction
+    # sold maps products to the number of units bought; returns False and changes nothing
+    # if the wallet or any product's stock is too low
+    def commit_checkout(self, username, total_cents, sold):
+        quantities = {}
+        for product, quantity in sold.items():
+            quantities[product.product_id] = quantities.get(product.product_id, 0) + quantity
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute("UPDATE users SET wallet_cents = wallet_cents - ? WHERE username = ? AND wallet_cents >= ?",
+                                  (total_cents, username, total_cents))
+            ok = cursor.rowcount == 1
+            for product_id, quantity in quantities.items():
+                if not ok:
+                    break
+                cursor = conn.execute("UPDATE products SET units = units - ? WHERE id = ? AND units >= ?",
+                                      (quantity, product_id, quantity))
+                ok = cursor.rowcount == 1
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT" if ok else "ROLLBACK")
+        return ok
+
+# Backend chosen with set_backend, None means "pick from the environment"
+_backend = None
+
+# Function to choose the storage backend for the whole process
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+# Function to get the storage backend in use
+# A new database named by SHOP_DATABASE starts with the users and products of the data files
+def get_backend():
+    if _backend is not None:
+        return _backend
+    db_path = os.environ.get(DATABASE_ENV)
+    if db_path:
+        backend = SQLiteBackend(db_path)
+        backend.import_files(USERS_FILE, PRODUCTS_FILE, only_if_empty=True)
+        set_backend(backend)
+        return _backend
+    return FileBackend(USERS_FILE, PRODUCTS_FILE)
@@ -0,0 +1,68 @@
+from accounts import *
+from passwords import ITERATIONS_ENV, verify_password
+from user_store import reset_user_stores
+import pytest
+
+# Fixture to make hashing cheap
+@pytest.fixture(autouse=True)
+def cheap_hashes(monkeypatch):
+    monkeypatch.setenv(ITERATIONS_ENV, "1000")
+
+# Fixture to write an accounts file with one account for every outcome
+@pytest.fixture
+def accounts_file(tmp_path):
+    path = tmp_path / "accounts.csv"
+    path.write_text("username,password,wallet\n"
+                    "Alice,Wonderland!,25\n"
+                    "Bob,short!,\n"
+                    "Carol,nouppercase!,\n"
+                    "Dave,NoSpecial123,\n"
+                    "Ramanathan,Notaproblem23*,\n"
+                    "Alice,Another1!,\n"
+                    ",Nameless!!,\n"
+                    "Erin,Rich$Enough,lots\n"
+                    "Frank,Fine&Dandy,3.5\n")
+    return str(path)
+
+# Test importing a file: good accounts are stored hashed, the others are counted and reported
+def test_import_accounts(shop_backend, accounts_file, tmp_path):
+    report = str(tmp_path / "report.csv")
+    counts = AccountImport(shop_backend).run(accounts_file, report)
+    assert counts == {"ok": 2, "length": 1, "uppercase": 1, "special": 1, "taken": 2, "malformed": 2}
+
+    reset_user_stores()
+    alice = shop_backend.get_user("Alice")
+    assert alice["wallet"] == 25.0 and verify_password("Wonderland!", alice["password"])
+    assert shop_backend.get_user("Frank")["wallet"] == 3.5
+    assert shop_backend.get_user("Bob") is None
+    assert shop_backend.get_user("Ramanathan")["password"] == "Notaproblem23*"
+
+    with open(report, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [(row["line"], row["username"], row["rule"]) for row in rows] == [
+        ("3", "Bob", "length"), ("4", "Carol", "uppercase"), ("5", "Dave", "special"),
+        ("6", "Ramanathan", "taken"), ("7", "Alice", "taken"), ("8", "", "malformed"), ("9", "Erin", "malformed")]
+    assert rows[0]["reason"] == "password shorter than 8 characters"
+
+# Test checking a file against another policy without storing anything
+def test_check_only(shop_backend, accounts_file):
+    # main() imports into the process's backend, which shop_backend sets
+    importer = main([accounts_file, "--check-only", "--min-length", "6", "--require", "digit"])
+    assert importer.counts["ok"] == 2
+    assert importer.counts["digit"] == 4
+    reset_user_stores()
+    assert shop_backend.get_user("Alice") is None
+
+# Test that wallets User() could not hold are malformed, and wallets are kept to the cent
+def test_wallet_amounts(shop_backend, tmp_path):
+    path = tmp_path / "accounts.csv"
+    path.write_text("username,password,wallet\n"
+                    "Nanny,GoodPass1!,nan\n"
+                    "Infy,GoodPass1!,inf\n"
+                    "Minus,GoodPass1!,-5\n"
+                    "Cents,GoodPass1!,0.105\n")
+    counts = AccountImport(shop_backend).run(str(path))
+    assert counts == {"ok": 1, "malformed": 3}
+    reset_user_stores()
+    assert shop_backend.get_user("Nanny") is None and shop_backend.get_user("Infy") is None
+    assert shop_backend.get_user("Cents")["wallet"] == 0.11
@@ -0,0 +1,88 @@
+from atomic import *
+from user_store import UserStore
+import json
+import os
+import pytest
+import signal
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Function to run a Python script in a child process that can import the shop modules
+def run_child(script):
+    return subprocess.run([sys.executable, "-c", script], cwd=HERE, capture_output=True, text=True, timeout=60)
+
+# Function to list the temporary files left next to a file
+def leftovers(path):
+    directory, name = os.path.split(path)
+    return [entry for entry in os.listdir(directory) if entry.startswith(name + ".") and entry.endswith(".tmp")]
+
+# Test that the file is replaced with the new contents, keeping its permissions
+def test_atomic_write_replaces(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("old")
+    os.chmod(path, 0o640)
+    with atomic_write(str(path)) as file:
+        file.write("new")
+        # Nothing changes until the block ends
+        assert path.read_text() == "old"
+    assert path.read_text() == "new"
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert leftovers(str(path)) == []
+
+# Test writing a file that does not exist yet, in binary mode and with a lock
+def test_atomic_write_new_file(tmp_path):
+    path = tmp_path / "data.bin"
+    with atomic_write(str(path), "wb", durable=False, lock=True) as file:
+        file.write(b"\0\1")
+    assert path.read_bytes() == b"\0\1"
+    assert os.path.exists(str(path) + ".lock")
+
+# Test that an error inside the block leaves the old file and no temporary file
+def test_atomic_write_error_keeps_old(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as file:
+            file.write("half")
+            raise RuntimeError("failed")
+    assert path.read_text() == "old"
+    assert leftovers(str(path)) == []
+
+# Test a writer killed in the middle of writing: the file keeps its old contents
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_killed_writer_keeps_old(tmp_path):
+    path = tmp_path / "users.json"
+    path.write_text('[{"username": "Ramanathan"}]')
+    result = run_child(f"""
+import os, signal
+from atomic import atomic_write
+with atomic_write({str(path)!r}) as file:
+    file.write("[" + "x" * 1000000)
+    file.flush()
+    os.kill(os.getpid(), signal.SIGKILL)
+""")
+    assert result.returncode == -signal.SIGKILL
+    assert json.loads(path.read_text()) == [{"username": "Ramanathan"}]
+
+# Test compaction killed while the new user file is being flushed: nothing written to the journal is lost
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_killed_compact_keeps_users(tmp_path):
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps([{"username": "Ramanathan", "password": "Notaproblem23*", "wallet": 100}]))
+    result = run_child(f"""
+import os, signal
+from user_store import UserStore
+store = UserStore({str(path)!r})
+store.add_user("NewUser", "Password1!", 5)
+store.update_wallet("Ramanathan", 42)
+# Die at the fsync of the new user file, after its data was written
+os.fsync = lambda fd: os.kill(os.getpid(), signal.SIGKILL)
+store.compact()
+""")
+    assert result.returncode == -signal.SIGKILL
+    json.loads(path.read_text())
+    store = UserStore(str(path))
+    assert store.get_user("Ramanathan")["wallet"] == 42
+    assert store.get_user("NewUser")["wallet"] == 5
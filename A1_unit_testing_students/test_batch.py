@@ -0,0 +1,127 @@
+from batch import *
+from user_store import reset_user_stores
+import catalog
+import json
+import pytest
+import random
+
+# Function to write orders as JSON lines
+def write_jsonl(path, orders):
+    path.write_text("".join(json.dumps(order) + "\n" for order in orders))
+    return str(path)
+
+# Test reading items written like "Apple:2;Banana"
+def test_parse_items():
+    assert parse_items("Apple:2;Banana; Apple") == {"Apple": 3, "Banana": 1}
+    with pytest.raises(ValueError):
+        parse_items("Apple:many")
+
+# Test reading CSV and JSON lines orders, including broken ones
+def test_read_orders(tmp_path):
+    csv_path = tmp_path / "orders.csv"
+    csv_path.write_text("username,items\nAria,Apple:2;Banana\nAria,Apple:x\n")
+    assert list(read_orders(str(csv_path))) == [("Aria", {"Apple": 2, "Banana": 1}), ("Aria", None)]
+    jsonl_path = tmp_path / "orders.jsonl"
+    jsonl_path.write_text('{"username": "Aria", "items": ["Apple", "Apple"]}\n\n{"username": "Aria"}\nnot json\n')
+    assert list(read_orders(str(jsonl_path))) == [("Aria", {"Apple": 2}), (None, None), (None, None)]
+
+# Test a batch with good orders, a poor user, a sell-out and orders that cannot be checked out
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_batch_run(shop_backend, tmp_path, vectorized):
+    orders = write_jsonl(tmp_path / "orders.jsonl", [
+        {"username": "Ramanathan", "items": {"Salmon": 1, "Apple": 2}},
+        {"username": "Rover", "items": {"Eggs": 24, "Salmon": 1}},
+        {"username": "Samantha", "items": {"Salmon": 1}},
+        {"username": "Samantha", "items": {"Salmon": 1}},
+        {"username": "Nobody", "items": {"Apple": 1}},
+        {"username": "Samantha", "items": {"Dragonfruit": 1}},
+    ])
+    results = str(tmp_path / "results.csv")
+    batch = BatchCheckout(shop_backend, vectorized=vectorized)
+    batch.run(orders, results)
+    assert (batch.ok, batch.rejected) == (2, 4)
+
+    with open(results, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [(row["status"], row["charged"]) for row in rows] == [
+        ("ok", "14"), ("rejected", "0"), ("ok", "10"), ("rejected", "0"), ("rejected", "0"), ("rejected", "0")]
+    assert "enough money" in rows[1]["message"]
+    assert "Salmon is out of stock" in rows[3]["message"]
+    assert [row["message"] for row in rows[4:]] == ["unknown user", "unknown product Dragonfruit"]
+
+    # Wallets and stock are written back once at the end
+    reset_user_stores()
+    catalog._catalogs.clear()
+    assert shop_backend.get_user("Ramanathan")["wallet"] == 86.0
+    assert shop_backend.get_user("Samantha")["wallet"] == 140.0
+    names = [row[1] for row in shop_backend.product_records()]
+    assert "Salmon" not in names
+    assert shop_backend.product_records()[0] == (0, "Apple", 200, 8)
+
+# Test that finish() takes what the run spent and sold off the stored values, keeping another run's changes
+@pytest.mark.parametrize("shop_backend", ["file", "sqlite"], indirect=True)
+def test_finish_writes_deltas(shop_backend):
+    batch = BatchCheckout(shop_backend, vectorized=False)
+    assert batch.process("Ramanathan", {"Apple": 2})[0] == "ok"
+
+    # Another run checks out and writes back before this one finishes
+    other = BatchCheckout(shop_backend, vectorized=False)
+    assert other.process("Ramanathan", {"Apple": 3})[0] == "ok"
+    other.finish()
+    batch.finish()
+
+    reset_user_stores()
+    assert shop_backend.get_user("Ramanathan")["wallet"] == 90
+    assert shop_backend.product_records()[0] == (0, "Apple", 200, 5)
+    # Nothing was sold since, so finishing again changes nothing
+    batch.finish()
+    assert shop_backend.get_user("Ramanathan")["wallet"] == 90
+
+# Test that pricing orders a chunk at a time gives the same results as checking them out one by one
+@pytest.mark.skipif(numpy is None, reason="needs numpy")
+def test_process_chunk_matches_process(shop_backend):
+    rng = random.Random(7)
+    names = [product.name for product in BatchCheckout(shop_backend, vectorized=False).menu]
+    users = ["Ramanathan", "Samantha", "Rover", "Maximus"]
+    chunk = []
+    for _ in range(400):
+        # Now and then one of the first products, which sell out, or a line for zero units
+        items = {rng.choice(names): rng.choice([0, 1, 2, 3, 4, 1, 2, 3, 4, 1]) for _ in range(rng.randint(1, 3))}
+        chunk.append((rng.choice(users), items))
+    chunk += [("Nobody", {"Apple": 1}), ("Rover", {"Dragonfruit": 1}), ("Rover", {"Apple": 0}),
+              ("Ramanathan", {"Apple": 1}), ("Samantha", None)]
+
+    vectorized = BatchCheckout(shop_backend)
+    one_by_one = BatchCheckout(shop_backend, vectorized=False)
+    # Rich users and plenty of stock, so orders can be settled in bulk next to ones that cannot
+    for batch in (vectorized, one_by_one):
+        batch.user("Ramanathan").wallet_cents = 10 ** 6
+        batch.user("Rover").wallet_cents = 10 ** 6
+        for product in batch.menu[5:]:
+            product.units = 1000
+    # Small chunks, so both kinds of orders are found in one
+    expected = [one_by_one.process(username, items) for username, items in chunk]
+    found = []
+    process = vectorized.process
+    single = []
+    vectorized.process = lambda username, items: single.append(username) or process(username, items)
+    for start in range(0, len(chunk), 50):
+        found.extend(vectorized.process_chunk(chunk[start:start + 50]))
+    assert found == expected
+    assert 0 < len(single) < len(chunk)
+    assert (vectorized.ok, vectorized.rejected) == (one_by_one.ok, one_by_one.rejected)
+    assert vectorized.changed == one_by_one.changed
+    assert [(product.name, product.units) for product in vectorized.products] == \
+        [(product.name, product.units) for product in one_by_one.products]
+    assert {name: user and user.wallet_cents for name, user in vectorized.users.items()} == \
+        {name: user and user.wallet_cents for name, user in one_by_one.users.items()}
+
+# Test that an order settled one by one still counts towards the stock a chunk wants, even with a zero line
+@pytest.mark.skipif(numpy is None, reason="needs numpy")
+def test_process_chunk_zero_quantity_line(shop_backend):
+    chunk = [("Ramanathan", {"Apple": 10, "Banana": 0}), ("Samantha", {"Apple": 1})]
+    expected = BatchCheckout(shop_backend, vectorized=False)
+    found = BatchCheckout(shop_backend)
+    assert [status for status, _, _ in found.process_chunk(chunk)] == \
+        [status for status, _, _ in (expected.process(username, items) for username, items in chunk)] == \
+        ["ok", "rejected"]
@@ -0,0 +1,139 @@
+from catalog import *
+from checkout_and_payment import load_products, load_products_from_csv
+from storage import FileBackend
+from products import display_csv_as_table, display_filtered_table
+import catalog
+import pytest
+import os
+import threading
+
+# Fixture to create a small product CSV file
+@pytest.fixture
+def csv_file(tmp_path):
+    file_path = tmp_path / "products.csv"
+    file_path.write_text("Product,Price,Units\nApple,2,10\nBanana,1,15\n")
+    return str(file_path)
+
+# Function to change a file and make sure its modification time moves forward
+def rewrite(file_path, content):
+    stat = os.stat(file_path)
+    with open(file_path, "w") as file:
+        file.write(content)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+# Test that the catalog exposes the header and rows
+def test_get_table(csv_file):
+    header, rows = Catalog(csv_file).get_table()
+    assert header == ["Product", "Price", "Units"]
+    assert rows == [["Apple", "2", "10"], ["Banana", "1", "15"]]
+
+# Test that product rows carry their position as id
+def test_product_rows(csv_file):
+    assert Catalog(csv_file).product_rows() == [(0, "Apple", "2", "10"), (1, "Banana", "1", "15")]
+
+# Test that display, search and product loading parse the file only once
+def test_parsed_once(csv_file, mocker, capsys):
+    spy = mocker.spy(catalog.csv, "reader")
+    display_csv_as_table(csv_file)
+    display_filtered_table(csv_file, "apple")
+    display_filtered_table(csv_file, "banana")
+    load_products_from_csv(csv_file)
+    assert spy.call_count == 1
+
+# Test that blank lines in the file are skipped, like csv.DictReader did
+def test_blank_lines(tmp_path):
+    file_path = tmp_path / "products.csv"
+    file_path.write_text("Product,Price,Units\nApple,2,10\n\nBanana,1,15\n\n")
+    assert Catalog(str(file_path)).product_rows() == [(0, "Apple", "2", "10"), (1, "Banana", "1", "15")]
+    assert [product.name for product in load_products_from_csv(str(file_path))] == ["Apple", "Banana"]
+
+# Test that a page is streamed until the catalog has parsed the file, then taken from the catalog
+def test_page_streamed_until_parsed(csv_file, capsys):
+    shared = get_catalog(csv_file)
+    assert display_csv_as_table(csv_file, page_size=1) == 1
+    assert not shared.is_current()
+    shared.get_table()
+    assert shared.is_current()
+    assert display_csv_as_table(csv_file, page_size=1, offset=1) is None
+    assert capsys.readouterr().out.splitlines()[1::2] == ["['Apple', '2', '10']", "['Banana', '1', '15']"]
+
+# Test that every load gets its own product objects
+def test_fresh_products(csv_file):
+    first = load_products_from_csv(csv_file)
+    first[0].units = 0
+    assert load_products_from_csv(csv_file)[0].units == 10
+
+# Test that the catalog and its search index are rebuilt when the file changes
+def test_invalidated_on_change(csv_file):
+    shared = get_catalog(csv_file)
+    index = shared.search_index()
+    assert shared.search_index() is index
+
+    rewrite(csv_file, "Product,Price,Units\nMango,2,3\n")
+
+    assert shared.get_table()[1] == [["Mango", "2", "3"]]
+    assert shared.search_index() is not index
+    assert shared.search_index().search("mango") == [["Mango", "2", "3"]]
+
+# Test that the same catalog is shared for the same file
+def test_get_catalog_shared(csv_file):
+    assert get_catalog(csv_file) is get_catalog(csv_file)
+
+# Test that threads sharing a catalog while the file changes always see one parse, header and rows together
+def test_threads_see_one_parse(tmp_path):
+    file_path = str(tmp_path / "products.csv")
+
+    # Replace the file whole, so a parse never sees it half written
+    def replace(content):
+        (tmp_path / "next.csv").write_text(content)
+        os.replace(tmp_path / "next.csv", file_path)
+
+    replace("Product,Price,Units\nApple,2,10\n")
+    shared = get_catalog(file_path)
+    catalogs = []
+    errors = []
+
+    def read():
+        catalogs.append(get_catalog(file_path))
+        for _ in range(200):
+            header, rows = shared.get_table()
+            index = shared.search_index()
+            if rows and rows[0][header.index('Product')] not in ("Apple", "Pear"):
+                errors.append(rows)
+            if len(index.search("apple")) + len(index.search("pear")) != 1:
+                errors.append(index)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for turn in range(20):
+        # The columns swap places, so a header from one parse and rows from another would not match
+        if turn % 2:
+            replace("Product,Price,Units\nApple,2,10\n")
+        else:
+            replace("Units,Price,Product\n3,1,Pear\n")
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert all(catalog is shared for catalog in catalogs)
+
+# Test that something that is not a path is rejected
+def test_not_a_path():
+    with pytest.raises(TypeError):
+        get_catalog(15)
+
+# Test that an empty file is a catalog without products, and the tables refuse to display it
+def test_empty_file(tmp_path):
+    file_path = str(tmp_path / "products.csv")
+    open(file_path, "w").close()
+    # Streamed, before the shared catalog has parsed the file
+    with pytest.raises(ValueError):
+        display_csv_as_table(file_path, page_size=5)
+    assert Catalog(file_path).product_rows() == []
+    assert len(Catalog(file_path).search_index().search("apple")) == 0
+    assert len(load_products_from_csv(file_path)) == 0
+    assert len(load_products(FileBackend("users.json", file_path))) == 0
+    with pytest.raises(ValueError):
+        display_csv_as_table(file_path)
+    with pytest.raises(ValueError):
+        display_filtered_table(file_path, "apple")
@@ -0,0 +1,47 @@
+from console import *
+from products import searchAndBuyProduct
+import pytest
+
+# Test that the default console prints like print() does
+def test_console_print(capsys):
+    Console().print("a", 1, [2], sep="-", end="!\n")
+    print("a", 1, [2], sep="-", end="!\n")
+    first, second = capsys.readouterr().out.splitlines()
+    assert first == second
+
+# Test that the default console reads answers with input()
+def test_console_input(mocker):
+    mocker.patch("builtins.input", return_value="yes")
+    assert Console().input("Sure?") == "yes"
+
+# Test that buffered output is written in one go, and before any question
+def test_buffered_console(mocker):
+    stream = mocker.Mock()
+    console = BufferedConsole()
+    console.print("one")
+    console.print("two")
+    assert console.getvalue() == "one\ntwo\n"
+    console.flush(stream)
+    stream.write.assert_called_once_with("one\ntwo\n")
+    assert console.getvalue() == ""
+
+# Test that scripted answers run out like input() at end of file
+def test_scripted_console():
+    console = ScriptedConsole(["a"])
+    assert console.input("First?") == "a"
+    with pytest.raises(EOFError):
+        console.input("Second?")
+    assert console.getvalue() == "First?Second?"
+
+# Test a whole shopping session driven by a script, without patching input() or stdout
+def test_scripted_session(shop_backend, tmp_path, monkeypatch, capsys):
+    # searchAndBuyProduct shows the products.csv of the working directory
+    monkeypatch.chdir(tmp_path)
+    console = ScriptedConsole(["Ramanathan", "Notaproblem23*", "salmon", "y", "20", "c", "y", "l"])
+    searchAndBuyProduct(console)
+    transcript = console.getvalue()
+    assert "Successfully logged in" in transcript
+    assert "['Salmon', '10', '2']" in transcript
+    assert "Thank you for your purchase, Ramanathan! Your remaining balance is 90.0" in transcript
+    assert transcript.endswith("You have been logged out\n")
+    assert capsys.readouterr().out == ""
@@ -113,3 +113,38 @@ def test_list_input():
     temp_file = create_temporary_file(csv_content, '.csv')
     with pytest.raises(Exception):
         display_csv_as_table([temp_file.name, "hello.csv", "products.csv", "login.py"])
+
+def test_first_page():
+    csv_content = 'header1,header2\nvalue1,value2\nvalue3,value4\nvalue5,value6\n'
+    temp_file = create_temporary_file(csv_content, '.csv')
+    with patch('sys.stdout', new_callable=tempfile.SpooledTemporaryFile, mode='w+t', create=True) as mock_stdout:
+        next_offset = display_csv_as_table(temp_file.name, page_size=2)
+        mock_stdout.seek(0)
+        captured_output = mock_stdout.read()
+    expected_output = "['header1', 'header2']\n['value1', 'value2']\n['value3', 'value4']\n"
+    assert captured_output == expected_output
+    assert next_offset == 2
+
+def test_last_page():
+    csv_content = 'header1,header2\nvalue1,value2\nvalue3,value4\nvalue5,value6\n'
+    temp_file = create_temporary_file(csv_content, '.csv')
+    with patch('sys.stdout', new_callable=tempfile.SpooledTemporaryFile, mode='w+t', create=True) as mock_stdout:
+        next_offset = display_csv_as_table(temp_file.name, page_size=2, offset=2)
+        mock_stdout.seek(0)
+        captured_output = mock_stdout.read()
+    expected_output = "['header1', 'header2']\n['value5', 'value6']\n"
+    assert captured_output == expected_output
+    assert next_offset is None
+
+def test_page_exactly_filled():
+    csv_content = 'header1,header2\nvalue1,value2\nvalue3,value4\n'
+    temp_file = create_temporary_file(csv_content, '.csv')
+    with patch('sys.stdout', new_callable=tempfile.SpooledTemporaryFile, mode='w+t', create=True):
+        assert display_csv_as_table(temp_file.name, page_size=2) is None
+
+def test_page_written_once():
+    csv_content = 'header1,header2\nvalue1,value2\nvalue3,value4\nvalue5,value6\n'
+    temp_file = create_temporary_file(csv_content, '.csv')
+    with patch('sys.stdout') as mock_stdout:
+        display_csv_as_table(temp_file.name)
+    assert mock_stdout.write.call_count == 1
@@ -127,3 +127,17 @@ def test_successful_search_all_rows_2():
         captured_output = mock_stdout.read()
     expected_output = "['Product', 'Price', 'Units']\n['cart', '13', '6']\n"
     assert captured_output == expected_output
+
+# Test showing one page of the matches
+def test_search_page():
+    csv_content = 'Product,Price,Units\nApple,5,25\nPineapple,13,6\nApple Juice,3,8\n'
+    # Create a temporary CSV file
+    temp_file = create_temporary_file(csv_content, '.csv')
+    # Test function with mock stdout
+    with patch('sys.stdout', new_callable=tempfile.SpooledTemporaryFile, mode='w+t', create=True) as mock_stdout:
+        matches = display_filtered_table(temp_file.name, "apple", page_size=2, offset=1)
+        mock_stdout.seek(0)
+        captured_output = mock_stdout.read()
+    expected_output = "['Product', 'Price', 'Units']\n['Pineapple', '13', '6']\n['Apple Juice', '3', '8']\n"
+    assert captured_output == expected_output
+    assert matches == 3
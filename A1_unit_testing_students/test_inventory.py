@@ -0,0 +1,56 @@
+from checkout_and_payment import *
+import pytest
+
+@pytest.fixture
+def test_products():
+    testproducts = load_products_from_csv("products.csv")
+    return testproducts
+
+# Test that loading keeps the order of the CSV file
+def test_display_order(test_products):
+    assert len(test_products) == 71
+    assert test_products[0].name == "Apple"
+    assert [product.name for product in test_products][:3] == ["Apple", "Banana", "Orange"]
+
+# Test looking up products by name and id
+def test_lookup(test_products):
+    salmon = test_products.get("Salmon")
+    assert salmon.get_product() == ["Salmon", 10.0, 2]
+    assert test_products.get_by_id(salmon.product_id) is salmon
+    assert test_products.get("Caviar") is None
+
+# Test that a duplicated name resolves to the first product and then the next one
+def test_duplicate_names(test_products):
+    first = test_products.get("Backpack")
+    assert first.price == 25.0
+    test_products.remove(first)
+    assert test_products.get("Backpack").price == 15.0
+
+# Test that removing a product keeps the order of the others
+def test_remove(test_products):
+    banana = test_products.get("Banana")
+    test_products.remove(banana)
+    assert banana not in test_products
+    assert len(test_products) == 70
+    assert [test_products[0].name, test_products[1].name] == ["Apple", "Orange"]
+
+# Test removing a product that is not in the inventory
+def test_remove_missing(test_products):
+    with pytest.raises(ValueError):
+        test_products.remove(Product("Product", 10.0, 5))
+
+# Test that decrementing the last unit removes the product
+def test_decrement(test_products):
+    salmon = test_products.get("Salmon")
+    test_products.decrement(salmon)
+    assert salmon.units == 1
+    assert salmon in test_products
+    test_products.decrement(salmon)
+    assert salmon.units == 0
+    assert test_products.get("Salmon") is None
+
+# Test adding products without an id
+def test_add_without_id():
+    inventory = Inventory([Product("Car", 500, 2), Product("Bike", 100, 3)])
+    assert [product.product_id for product in inventory] == [0, 1]
+    assert inventory.get("Bike").units == 3
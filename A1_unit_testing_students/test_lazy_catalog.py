@@ -0,0 +1,78 @@
+from checkout_and_payment import *
+import pytest
+
+@pytest.fixture
+def lazy():
+    products = load_products_from_csv("products.csv", lazy=True)
+    yield products
+    products.close()
+
+# Function to get a product's details from the eagerly loaded file
+def eager_row(position):
+    return load_products_from_csv("products.csv")[position].get_product()
+
+# Test that nothing is read until the inventory is used
+def test_nothing_loaded(lazy):
+    assert lazy.offsets is None
+    assert not lazy.products
+
+# Test that the lazy inventory holds the same products as the eager one
+def test_same_products(lazy):
+    eager = load_products_from_csv("products.csv")
+    assert len(lazy) == len(eager) == 71
+    assert [p.get_product() for p in lazy] == [p.get_product() for p in eager]
+    assert [p.product_id for p in lazy] == [p.product_id for p in eager]
+
+# Test that only the rows used are turned into products
+def test_only_used_rows(lazy):
+    assert lazy[19].get_product() == ["Salmon", 10.0, 2]
+    assert lazy[-1] is lazy[70]
+    assert set(lazy.products) == {19, 70}
+    with pytest.raises(IndexError):
+        lazy[71]
+
+# Test finding products by name and id
+def test_get(lazy):
+    assert lazy.get("Orange").get_product() == ["Orange", 1.5, 8]
+    assert lazy.get("Dragonfruit") is None
+    assert lazy.get_by_id(0).name == "Apple"
+    assert lazy.get_by_id(500) is None
+
+# Test that removing products shifts the positions after them
+def test_remove(lazy):
+    banana = lazy[1]
+    lazy.remove(banana)
+    lazy.remove(lazy[1])
+    assert len(lazy) == 69
+    assert banana not in lazy
+    assert lazy[0].name == "Apple"
+    assert lazy[1].get_product() == eager_row(3)
+    assert lazy.get_by_id(1) is None
+    with pytest.raises(ValueError):
+        lazy.remove(banana)
+    assert len(list(lazy)) == 69
+
+# Test that a checkout with a lazy inventory removes products that sell out
+def test_checkout_lazy(lazy, capfd):
+    salmon = lazy[19]
+    cart = ShoppingCart()
+    cart.add_item(salmon, 2)
+    user = User("TestUser", 100)
+    checkout(user, cart, lazy)
+    assert user.wallet == 80.0
+    assert salmon not in lazy
+    assert len(lazy) == 70
+
+# Test a file with a header only and an empty file
+@pytest.mark.parametrize("content", ["Product,Price,Units\n", ""])
+def test_empty_file(tmp_path, content):
+    path = tmp_path / "products.csv"
+    path.write_text(content)
+    products = load_products_from_csv(str(path), lazy=True)
+    assert len(products) == 0
+    assert list(products) == []
+
+# Test that a non-path argument is rejected like the eager loader does
+def test_lazy_int_input():
+    with pytest.raises(TypeError):
+        load_products_from_csv(1, lazy=True)
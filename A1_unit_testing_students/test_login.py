@@ -1,6 +1,17 @@
 from login import *
 import pytest
 import shutil
+from ratelimit import reset_login_limiter
+from user_store import reset_user_stores
+
+# Fixture to give every test a fresh user store and login limiter, since both are kept per process
+@pytest.fixture(autouse=True)
+def fresh_user_store():
+    reset_user_stores()
+    reset_login_limiter()
+    yield
+    reset_user_stores()
+    reset_login_limiter()
 
 # Fixture to create a temporary directory for the test
 @pytest.fixture
@@ -28,13 +39,14 @@ def copied_users_json(temp_dir, original_users_json):
 def mock_input(mocker):
     return mocker.patch('builtins.input')
 
-# Fixture to mock the open function to use the copied users.json file
+# Fixture to point login at the copied users.json file, so new users are journaled next to the copy
 @pytest.fixture
-def mock_open(copied_users_json, mocker):
-    return mocker.patch('builtins.open', mocker.mock_open(read_data=open(copied_users_json).read()))
+def users_file(copied_users_json, mocker):
+    mocker.patch('storage.USERS_FILE', str(copied_users_json))
+    return copied_users_json
 
 # Test case for successful login
-def test_login_successful(mock_input, mock_open):
+def test_login_successful(mock_input, users_file):
     # Set the expected user input
     mock_input.side_effect = ["Ramanathan", "Notaproblem23*"]
 
@@ -45,7 +57,7 @@ def test_login_successful(mock_input, mock_open):
     assert result == {"username": "Ramanathan", "wallet": 100}
 
 # Test case for unsuccessful login for existing user
-def test_login_unsuccessful(mock_input, mock_open):
+def test_login_unsuccessful(mock_input, users_file):
     # Set the expected user input
     mock_input.side_effect = ["Ramanathan", "wrongpassword"]
 
@@ -55,7 +67,7 @@ def test_login_unsuccessful(mock_input, mock_open):
     # Assert that the login was unsuccessful and returned None
     assert result is None
 #Login as a new user but dont create a new
-def test_login_new_dont_create(mock_input, mock_open):
+def test_login_new_dont_create(mock_input, users_file):
     # Set the expected user input
     mock_input.side_effect = ["NewUser", "doesntmatter", "No"]
 
@@ -64,7 +76,7 @@ def test_login_new_dont_create(mock_input, mock_open):
     # Assert that a new user was not created
     assert result is None
 #Login as new user and create a new, with a password that is acceptable
-def test_login_new_create(mock_input, mock_open):
+def test_login_new_create(mock_input, users_file):
     # Set the expected user input
     mock_input.side_effect = ["NewUser", "new", "Yes", "CorrectPassword!"]
 
@@ -73,7 +85,7 @@ def test_login_new_create(mock_input, mock_open):
     # Assert that new user was created succesfully
     assert result == {"username": "NewUser", "wallet": 0}
 #Login as new user and create a new, with a password with less than 8 characters
-def test_login_new_short_password(mock_input, mock_open):
+def test_login_new_short_password(mock_input, users_file):
     # Set the expected user input
     mock_input.side_effect = ["NewUser", "new", "Yes", "Cool12!"]
 
@@ -82,7 +94,7 @@ def test_login_new_short_password(mock_input, mock_open):
     # Assert that the creation was unsuccessful and returned None
     assert result == None
 #Login as new user and create a new, with a password with more than 8 characters
-def test_login_new_long_password(mock_input, mock_open):
+def test_login_new_long_password(mock_input, users_file):
     # Set the expected user input
     mock_input.side_effect = ["NewUser", "new", "Yes", "CoolGuys123!"]
 
@@ -91,7 +103,7 @@ def test_login_new_long_password(mock_input, mock_open):
     # Assert that new user was created succesfully
     assert result == {"username": "NewUser", "wallet": 0}
 #Login as new user and create a new, with a password with 8 characters
-def test_login_new_just_enough_password(mock_input, mock_open):
+def test_login_new_just_enough_password(mock_input, users_file):
     # Set the expected user input
     mock_input.side_effect = ["NewUser", "new", "Yes", "Cool123!"]
 
@@ -100,7 +112,7 @@ def test_login_new_just_enough_password(mock_input, mock_open):
     # Assert that new user was created succesfully
     assert result == {"username": "NewUser", "wallet": 0}
 #Login as new user and create a new, with a password with special characters but no uppercase characters
-def test_login_new_no_uppercase(mock_input, mock_open):
+def test_login_new_no_uppercase(mock_input, users_file):
     # Set the expected user input
     mock_input.side_effect = ["NewUser", "new", "Yes", "cool123!"]
 
@@ -109,7 +121,7 @@ def test_login_new_no_uppercase(mock_input, mock_open):
     # Assert that new user was not created because of the incorrect password
     assert result == None
 #Login as new user and create a new, with a password with uppercase characters but no special characters
-def test_login_new_no_special(mock_input, mock_open):
+def test_login_new_no_special(mock_input, users_file):
     # Set the expected user input
     mock_input.side_effect = ["NewUser", "new", "Yes", "Cool1234"]
 
@@ -118,7 +130,7 @@ def test_login_new_no_special(mock_input, mock_open):
     # Assert that new user was not created because of the incorrect password
     assert result == None
 #Login as new user and create a new, with a password with no uppercase characters or special characters
-def test_login_new_no_uppercase_special(mock_input, mock_open):
+def test_login_new_no_uppercase_special(mock_input, users_file):
     # Set the expected user input
     mock_input.side_effect = ["NewUser", "new", "Yes", "cool1234"]
 
@@ -126,5 +138,36 @@ def test_login_new_no_uppercase_special(mock_input, mock_open):
 
     # Assert that new user was not created because of the incorrect password
     assert result == None
-    
-    #one more test needed
+
+#Login as a newly created user, after the cached store is dropped, to check the user was persisted
+def test_login_new_user_persisted(mock_input, users_file):
+    # Set the expected user input
+    mock_input.side_effect = ["NewUser", "new", "Yes", "CorrectPassword!", "NewUser", "CorrectPassword!"]
+
+    login()
+    reset_user_stores()
+    result = login()
+
+    # Assert that the new user could log in again
+    assert result == {"username": "NewUser", "wallet": 0}
+
+#Create a user whose name another session takes while the questions are answered
+def test_login_new_user_taken_meanwhile(mock_input, users_file, capsys):
+    # Set the expected user input
+    answers = iter(["NewUser", "new", "Yes"])
+
+    def answer(prompt=""):
+        try:
+            return next(answers)
+        except StopIteration:
+            # The other session registers the name just before the password is given
+            get_backend().add_user("NewUser", "OtherPassword!", 5)
+            return "CorrectPassword!"
+    mock_input.side_effect = answer
+
+    result = login()
+
+    # Assert that the other session's account was kept
+    assert result == None
+    assert "That username is not available" in capsys.readouterr().out
+    assert get_backend().get_user("NewUser")["password"] == "OtherPassword!"
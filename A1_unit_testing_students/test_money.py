@@ -0,0 +1,65 @@
+from money import *
+from checkout_and_payment import *
+import pytest
+
+# Test converting amounts of different types to cents
+@pytest.mark.parametrize("amount, cents", [
+    (2, 200), ("1.5", 150), (0.75, 75), ("0.1", 10), (0.29, 29), (-10, -1000), ("1.005", 101),
+])
+def test_to_cents(amount, cents):
+    assert to_cents(amount) == cents
+
+# Test that an amount that is not a number is rejected like float() would
+@pytest.mark.parametrize("amount", ["abc", "", "nan"])
+def test_to_cents_invalid(amount):
+    with pytest.raises(ValueError):
+        to_cents(amount)
+
+# Test converting cents back to an amount
+def test_from_cents():
+    assert from_cents(999) == 9.99
+    assert from_cents(100) == 1.0
+
+# Test adding up lines
+def test_total_cents():
+    prices = list(range(1000))
+    quantities = [2] * 1000
+    assert total_cents(prices, quantities) == 999000
+
+# Test that prices that are not exact binary fractions add up exactly
+def test_cart_total_exact():
+    cart = ShoppingCart()
+    cart.add_item(Product("Gum", "0.1", 5))
+    cart.add_item(Product("Mint", "0.2", 5))
+    assert cart.get_total_price() == 0.3
+
+# Test that a wallet holding exactly the total can pay it
+def test_exact_wallet_pays(capfd):
+    gum = Product("Gum", "0.1", 5)
+    mint = Product("Mint", "0.2", 5)
+    cart = ShoppingCart()
+    cart.add_item(gum)
+    cart.add_item(mint)
+    user = User("TestUser", 0.3)
+    checkout(user, cart, Inventory([gum, mint]))
+    assert user.wallet == 0.0
+
+# Test that many small purchases leave no rounding error behind
+def test_many_transactions(capfd):
+    gum = Product("Gum", "0.1", 10000)
+    products = Inventory([gum])
+    user = User("TestUser", 100)
+    for _ in range(999):
+        cart = ShoppingCart()
+        cart.add_item(gum)
+        checkout(user, cart, products)
+    assert user.wallet_cents == 10
+    assert user.wallet == 0.1
+
+# Test that repricing the cart gives the same total as the running total
+def test_reprice():
+    cart = ShoppingCart()
+    for i in range(300):
+        cart.add_item(Product("Item %d" % i, "0.35", 10), 3)
+    running = cart.total_cents
+    assert cart.reprice() == running == 31500
@@ -0,0 +1,58 @@
+from password_policy import *
+import password_policy
+import pytest
+import random
+
+# Function with the rules valid_password had before PasswordPolicy, to compare against
+def old_valid_password(password):
+    if len(password) < 8:
+        return False
+    has_upper = any(char.isupper() for char in password)
+    has_special = any(not char.isalnum() for char in password)
+    return has_upper and has_special
+
+# Function to make passwords of random length from ASCII and other characters
+def random_passwords(count, seed=3):
+    rng = random.Random(seed)
+    alphabet = "aZ09!* \0éÅß٣ǅϒ\U0001d400\U0001f600"
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 14))) for _ in range(count)]
+
+# Test the default policy on the passwords the login tests use
+@pytest.mark.parametrize("password, rule", [
+    ("CorrectPassword!", None), ("Cool123!", None), ("Cool12!", LENGTH),
+    ("cool123!", UPPERCASE), ("CoolGuys123", SPECIAL), ("", LENGTH),
+])
+def test_default_policy(password, rule):
+    assert DEFAULT_POLICY.check(password) == rule
+
+# Test that the default policy accepts exactly what valid_password used to
+def test_default_policy_matches_old_rules():
+    passwords = random_passwords(5000)
+    assert [DEFAULT_POLICY.check(password) is None for password in passwords] == \
+        [old_valid_password(password) for password in passwords]
+
+# Test a stricter policy, reporting the first missing class in a fixed order
+def test_configured_policy():
+    policy = PasswordPolicy(min_length=10, required=[SPECIAL, DIGIT, LOWERCASE])
+    assert policy.required == [LOWERCASE, DIGIT, SPECIAL]
+    assert policy.check("Short1!") == LENGTH
+    assert policy.check("NOLOWERCASE1!") == LOWERCASE
+    assert policy.check("nodigitshere!") == DIGIT
+    assert policy.check("nospecial123") == SPECIAL
+    assert policy.check("all good 123") is None
+    assert PasswordPolicy(min_length=0, required=()).check("") is None
+    with pytest.raises(ValueError):
+        PasswordPolicy(required=["emoji"])
+
+# Test that checking a batch gives the same answers as checking one at a time, with and without NumPy
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_check_many(use_numpy, monkeypatch):
+    if not use_numpy:
+        monkeypatch.setattr(password_policy, "numpy", None)
+    elif password_policy.numpy is None:
+        pytest.skip("needs numpy")
+    passwords = random_passwords(3000) + ["A!" * 50, "a" * 70, "\0" * 9]
+    for policy in (DEFAULT_POLICY, PasswordPolicy(12, CLASSES), PasswordPolicy(0, ())):
+        assert policy.check_many(passwords) == [policy.check(password) for password in passwords]
+    assert DEFAULT_POLICY.check_many([]) == []
+    assert DEFAULT_POLICY.check_many(["", ""]) == [LENGTH, LENGTH]
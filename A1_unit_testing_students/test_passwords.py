@@ -0,0 +1,102 @@
+from passwords import *
+from console import ScriptedConsole
+from login import login
+from ratelimit import reset_login_limiter
+from storage import FileBackend, set_backend
+from user_store import UserStore, reset_user_stores
+import hashlib
+import json
+import pytest
+
+# Samantha's password in users_file is stored hashed, Ramanathan's is still plaintext
+pytestmark = pytest.mark.users(Samantha={"password": hash_password("SecurePass123/^", 1000)})
+
+# Fixture to make hashing cheap and start every test with an empty cache and fresh stores
+@pytest.fixture(autouse=True)
+def cheap_hashes(monkeypatch):
+    monkeypatch.setenv(ITERATIONS_ENV, "1000")
+    reset_verification_cache()
+    reset_user_stores()
+    reset_login_limiter()
+    yield
+    reset_user_stores()
+    reset_verification_cache()
+    reset_login_limiter()
+
+# Test the format of a hash and checking passwords against it
+def test_hash_and_verify():
+    stored = hash_password("Notaproblem23*", 1000)
+    algorithm, iterations, salt, digest = stored.split("$")
+    assert (algorithm, iterations) == ("pbkdf2_sha256", "1000")
+    assert verify_password("Notaproblem23*", stored)
+    assert not verify_password("notaproblem23*", stored)
+    # Every hash has its own salt
+    assert hash_password("Notaproblem23*", 1000) != stored
+
+# Test that passwords stored before hashing still work, and are marked for hashing
+def test_plaintext_passwords():
+    assert verify_password("Notaproblem23*", "Notaproblem23*")
+    assert not verify_password("Notaproblem23", "Notaproblem23*")
+    assert needs_rehash("Notaproblem23*")
+    # Broken hashes are treated as plaintext, so they never match a typed password by accident
+    assert split_hash("pbkdf2_sha256$1000$not base64$x") is None
+
+# Test that a hash with another cost is marked for hashing again
+def test_needs_rehash(monkeypatch):
+    stored = hash_password("Notaproblem23*")
+    assert not needs_rehash(stored)
+    monkeypatch.setenv(ITERATIONS_ENV, "2000")
+    assert needs_rehash(stored)
+
+# Test that a cached verification skips PBKDF2, and that failures are never cached
+def test_cache_skips_hashing(mocker):
+    stored = hash_password("Notaproblem23*")
+    spy = mocker.spy(hashlib, "pbkdf2_hmac")
+    cache = VerificationCache()
+    assert not cache.verify("wrong", stored)
+    assert not cache.verify("wrong", stored)
+    assert spy.call_count == 2
+    assert cache.verify("Notaproblem23*", stored)
+    assert cache.verify("Notaproblem23*", stored)
+    assert spy.call_count == 3
+    # A new hash for the same password is verified again
+    assert cache.verify("Notaproblem23*", hash_password("Notaproblem23*"))
+    assert spy.call_count == 5
+
+# Test that the cache keeps only the most recently used verifications
+def test_cache_is_bounded():
+    cache = VerificationCache(size=2)
+    stored = [hash_password("Password%d!" % i) for i in range(3)]
+    cache.verify("Password0!", stored[0])
+    cache.verify("Password1!", stored[1])
+    cache.verify("Password0!", stored[0])
+    cache.verify("Password2!", stored[2])
+    assert len(cache) == 2
+    assert cache.token("Password1!", stored[1]) not in cache.entries
+    assert cache.token("Password0!", stored[0]) in cache.entries
+
+# Test that logging in hashes a plaintext password, and that the hash is used from then on
+def test_login_migrates_plaintext(users_file):
+    set_backend(FileBackend(users_file, "products.csv"))
+    try:
+        assert login(ScriptedConsole(["Ramanathan", "Notaproblem23*"])) == {"username": "Ramanathan", "wallet": 100}
+        stored = UserStore(users_file).get_user("Ramanathan")["password"]
+        assert split_hash(stored) is not None and verify_password("Notaproblem23*", stored)
+        assert login(ScriptedConsole(["Ramanathan", "Notaproblem23*"])) is not None
+        assert login(ScriptedConsole(["Ramanathan", "Notaproblem23"])) is None
+        # New users are stored hashed
+        assert login(ScriptedConsole(["Newbie", "x", "Yes", "LongEnough!"])) == {"username": "Newbie", "wallet": 0}
+        assert verify_password("LongEnough!", UserStore(users_file).get_user("Newbie")["password"])
+    finally:
+        set_backend(None)
+
+# Test hashing every plaintext password of a file at once
+def test_migrate_user_file(users_file):
+    samantha = UserStore(users_file).get_user("Samantha")["password"]
+    assert migrate_user_file(users_file) == 1
+    with open(users_file) as file:
+        entries = {entry["username"]: entry["password"] for entry in json.load(file)}
+    assert verify_password("Notaproblem23*", entries["Ramanathan"])
+    assert entries["Ramanathan"] != "Notaproblem23*"
+    assert entries["Samantha"] == samantha
+    assert migrate_user_file(users_file) == 0
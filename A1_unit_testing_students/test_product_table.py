@@ -0,0 +1,99 @@
+from product_table import *
+from checkout_and_payment import User
+import pytest
+
+@pytest.fixture
+def table():
+    return ProductTable.from_csv("products.csv")
+
+# Test that every row of the CSV file is loaded in order
+def test_from_csv(table):
+    assert len(table) == 71
+    assert table.names[:2] == ["Apple", "Banana"]
+
+# Test that get_product returns the same details as Product.get_product
+def test_get_product(table):
+    assert table.get_product(0) == ["Apple", 2.0, 10]
+    assert table.get_product(19) == ["Salmon", 10.0, 2]
+
+# Test building a real Product from a row
+def test_to_product(table):
+    product = table.to_product(2)
+    assert product.get_product() == ["Orange", 1.5, 8]
+    assert product.product_id == 2
+
+# Test that the columns are compact arrays
+def test_columns(table):
+    assert table.prices.typecode == 'q'
+    assert table.prices[2] == 150
+    assert table.units[2] == 8
+
+# Test the NumPy views share memory with the columns
+def test_as_numpy(table):
+    pytest.importorskip("numpy")
+    prices, units = table.as_numpy()
+    assert prices[2] == 150
+    table.units[2] = 7
+    assert units[2] == 7
+
+# Test that products and users no longer carry a per-instance dict
+def test_slots():
+    product = Product("Apple", 2, 10)
+    user = User("TestUser", 10)
+    assert not hasattr(product, "__dict__")
+    assert not hasattr(user, "__dict__")
+    with pytest.raises(AttributeError):
+        product.colour = "red"
+
+@pytest.fixture
+def columns():
+    pytest.importorskip("numpy")
+    return load_product_columns("products.csv")
+
+# Test that the columnar loader reads every row with the right types
+def test_load_product_columns(columns):
+    assert len(columns) == 71
+    assert columns.prices.dtype.name == "int64"
+    assert columns.units.dtype.name == "int32"
+    assert columns.get_product(0) == ["Apple", 2.0, 10]
+    assert columns.get_product(19) == ["Salmon", 10.0, 2]
+
+# Test the vectorized queries against the same answers computed row by row
+def test_column_queries(columns, table):
+    rows = [table.get_product(i) for i in range(len(table))]
+    assert columns.total_value() == sum(table.prices[i] * table.units[i] for i in range(len(table)))
+    assert list(columns.low_stock(3)) == [i for i, row in enumerate(rows) if row[2] < 3]
+    assert list(columns.price_range(1, "2.5")) == [i for i, row in enumerate(rows) if 1 <= row[1] <= 2.5]
+
+# Test that prices with more than two decimals round like to_cents, not like the scaled float
+def test_load_product_columns_rounding(tmp_path):
+    pytest.importorskip("numpy")
+    path = tmp_path / "products.csv"
+    path.write_text("Product,Price,Units\nApple,1.005,1\nBanana,0.125,1\n")
+    assert list(load_product_columns(str(path)).prices) == [to_cents("1.005"), to_cents("0.125")] == [101, 13]
+    assert list(ProductTable.from_csv(str(path)).prices) == [101, 13]
+
+# Test loading a file with a header only
+def test_load_product_columns_empty(tmp_path):
+    pytest.importorskip("numpy")
+    path = tmp_path / "products.csv"
+    path.write_text("Product,Price,Units\n")
+    columns = load_product_columns(str(path))
+    assert len(columns) == 0
+    assert columns.total_value() == 0
+
+# Test that blank lines in the file are skipped by both loaders
+def test_blank_lines(tmp_path):
+    path = tmp_path / "products.csv"
+    path.write_text("Product,Price,Units\nApple,2,10\n\nBanana,1,15\n")
+    assert ProductTable.from_csv(str(path)).names == ["Apple", "Banana"]
+    if numpy is not None:
+        assert list(load_product_columns(str(path)).names) == ["Apple", "Banana"]
+
+# Test that an empty file loads as an empty table in both loaders
+def test_empty_file(tmp_path):
+    path = tmp_path / "products.csv"
+    path.write_text("")
+    assert len(ProductTable.from_csv(str(path))) == 0
+    if numpy is not None:
+        assert len(load_product_columns(str(path))) == 0
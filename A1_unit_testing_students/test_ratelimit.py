@@ -0,0 +1,91 @@
+from ratelimit import *
+from console import ScriptedConsole
+from login import login
+from storage import FileBackend, set_backend
+from user_store import reset_user_stores
+import pytest
+import shutil
+
+# Fixture to start every test with a fresh login limiter and user stores
+@pytest.fixture(autouse=True)
+def fresh_limiter():
+    reset_login_limiter()
+    reset_user_stores()
+    yield
+    reset_login_limiter()
+    reset_user_stores()
+
+# Function to make a limiter whose clock the test moves by hand
+def limiter_at(burst, rate, max_keys=MAX_KEYS):
+    limiter = RateLimiter(burst, rate, max_keys)
+    now = [0.0]
+    limiter.clock = lambda: now[0]
+    return limiter, now
+
+# Test that a key gets its burst, then one attempt per 1/rate seconds
+def test_burst_and_refill():
+    limiter, now = limiter_at(burst=3, rate=0.5)
+    assert [limiter.allow("Ramanathan") for _ in range(4)] == [True, True, True, False]
+    assert limiter.retry_after("Ramanathan") == 2
+    # Other keys have their own bucket
+    assert limiter.allow("Samantha")
+    now[0] = 1.0
+    assert not limiter.allow("Ramanathan")
+    now[0] = 2.0
+    assert limiter.allow("Ramanathan")
+    assert not limiter.allow("Ramanathan")
+    # The bucket never holds more than the burst
+    now[0] = 100.0
+    assert [limiter.allow("Ramanathan") for _ in range(4)] == [True, True, True, False]
+
+# Test that buckets which are full again are forgotten
+def test_idle_keys_evicted():
+    limiter, now = limiter_at(burst=2, rate=1)
+    for i in range(100):
+        limiter.allow("user%d" % i)
+    assert len(limiter) == 100
+    now[0] = 10.0
+    limiter.allow("Ramanathan")
+    assert len(limiter) == 1
+
+# Test that no more than max_keys buckets are kept, however many keys are tried
+def test_memory_is_bounded():
+    limiter, now = limiter_at(burst=2, rate=0.001, max_keys=50)
+    for i in range(10_000):
+        assert limiter.allow("user%d" % i)
+    assert len(limiter) == 50
+
+# Test that a client trying many usernames is stopped, and a refused client does not use up a username
+def test_login_limiter_clients():
+    limiter = LoginLimiter()
+    waits = [limiter.attempt("user%d" % i, "10.0.0.1") for i in range(CLIENT_BURST + 1)]
+    assert waits[:-1] == [0] * CLIENT_BURST
+    assert waits[-1] >= 1
+    assert limiter.users.tokens("user%d" % CLIENT_BURST, limiter.users.clock()) == USER_BURST
+    # Another client can still log in as the same users
+    assert limiter.attempt("user0", "10.0.0.2") == 0
+
+# Test choosing looser limits for the whole process
+def test_set_login_limiter():
+    limiter = LoginLimiter(user_burst=100, client_burst=100)
+    set_login_limiter(limiter)
+    assert get_login_limiter() is limiter
+    assert all(limiter.attempt("Ramanathan", "127.0.0.1") == 0 for _ in range(100))
+    assert limiter.attempt("Ramanathan", "127.0.0.1") >= 1
+
+# Test that login() refuses too many attempts without looking at the user file
+def test_login_refused_before_store(tmp_path, mocker):
+    shutil.copy("users.json", tmp_path / "users.json")
+    backend = FileBackend(str(tmp_path / "users.json"), "products.csv")
+    set_backend(backend)
+    try:
+        get_user = mocker.spy(backend, "get_user")
+        for _ in range(USER_BURST):
+            assert login(ScriptedConsole(["Ramanathan", "wrong"])) is None
+        assert get_user.call_count == USER_BURST
+        console = ScriptedConsole(["Ramanathan", "Notaproblem23*"])
+        assert login(console) is None
+        assert get_user.call_count == USER_BURST
+        assert "Too many login attempts" in console.getvalue()
+    finally:
+        set_backend(None)
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import patch
+from unittest.mock import patch, ANY
 from products import searchAndBuyProduct
 
 # Fixture to mock the input function
@@ -28,7 +28,7 @@ def test_all(mock_input, login_stub, checkoutAndPayment_stub, display_csv_as_tab
     mock_input.side_effect = ["all", "y"]
     res = searchAndBuyProduct()
 
-    display_csv_as_table_stub.assert_called_once_with("products.csv")
+    display_csv_as_table_stub.assert_called_once_with("products.csv", console=ANY)
     assert display_filtered_table_stub.call_count == 0
 
 # Test searching for all
@@ -36,7 +36,7 @@ def test_all_upper(mock_input, login_stub, checkoutAndPayment_stub, display_csv_
     mock_input.side_effect = ["ALL", "y"]
     res = searchAndBuyProduct()
 
-    display_csv_as_table_stub.assert_called_once_with("products.csv")
+    display_csv_as_table_stub.assert_called_once_with("products.csv", console=ANY)
     assert display_filtered_table_stub.call_count == 0
 
 # Test searching for apple
@@ -44,7 +44,7 @@ def test_apple(mock_input, login_stub, checkoutAndPayment_stub, display_csv_as_t
     mock_input.side_effect = ["apple", "y"]
     res = searchAndBuyProduct()
 
-    display_filtered_table_stub.assert_called_once_with("products.csv", "apple")
+    display_filtered_table_stub.assert_called_once_with("products.csv", "apple", console=ANY)
     assert display_csv_as_table_stub.call_count == 0
 
 # Test searching for orange and apple
@@ -82,4 +82,12 @@ def test_orange_and_all(mock_input, login_stub, checkoutAndPayment_stub, display
     res = searchAndBuyProduct()
 
     assert display_filtered_table_stub.call_count == 1
-    assert display_csv_as_table_stub.call_count == 1
\ No newline at end of file
+    assert display_csv_as_table_stub.call_count == 1
+# Test that suggestions are shown when a search finds nothing
+def test_suggestions_for_no_match(mock_input, login_stub, checkoutAndPayment_stub, display_csv_as_table_stub, display_filtered_table_stub, mocker):
+    display_filtered_table_stub.return_value = 0
+    display_suggestions_stub = mocker.patch('products.display_suggestions')
+    mock_input.side_effect = ["bananna", "y"]
+    res = searchAndBuyProduct()
+
+    display_suggestions_stub.assert_called_once_with("products.csv", "bananna", console=ANY)
@@ -0,0 +1,76 @@
+from search_index import *
+import pytest
+
+# Fixture to create a small product CSV file
+@pytest.fixture
+def csv_file(tmp_path):
+    file_path = tmp_path / "products.csv"
+    file_path.write_text("Product,Price,Units\nApple,2,10\nPineapple,3,4\nBanana,1,15\nApple Juice,3,8\ncar,5,25\ncart,13,6\n")
+    return str(file_path)
+
+@pytest.fixture
+def index(csv_file):
+    return build_search_index(csv_file)
+
+# Test that the header is kept and every row is indexed
+def test_build_index(index):
+    assert index.header == ["Product", "Price", "Units"]
+    assert len(index.rows) == 6
+
+# Test substring search using the trigram index, in file order
+def test_substring_search(index):
+    assert index.search("apple") == [["Apple", "2", "10"], ["Pineapple", "3", "4"], ["Apple Juice", "3", "8"]]
+
+# Test that the search is case-insensitive
+def test_substring_search_case(index):
+    assert index.search("APPLE JUICE") == [["Apple Juice", "3", "8"]]
+
+# Test substring search shorter than a trigram
+def test_short_search(index):
+    assert index.search("ca") == [["car", "5", "25"], ["cart", "13", "6"]]
+
+# Test that a longer search does not match a shorter name
+def test_search_longer_than_name(index):
+    assert index.search("cart") == [["cart", "13", "6"]]
+
+# Test that an empty search matches nothing
+def test_empty_search(index):
+    assert index.search("") == []
+
+# Test a search with no matching name
+def test_no_match(index):
+    assert index.search("mango") == []
+
+# Test that regex characters in the search text are matched literally
+def test_search_special_characters(index):
+    assert index.search("a.p") == []
+
+# Test prefix search
+def test_prefix_search(index):
+    assert index.prefix_search("app") == [["Apple", "2", "10"], ["Apple Juice", "3", "8"]]
+    assert index.prefix_search("z") == []
+
+# Test regular expression search
+def test_regex_search(index):
+    assert index.regex_search("^car?t?$") == [["car", "5", "25"], ["cart", "13", "6"]]
+
+# Test that a misspelled name ranks the intended product first
+def test_fuzzy_search_misspelling(index):
+    results = index.fuzzy_search("bananna")
+    assert results[0][1] == ["Banana", "1", "15"]
+    assert 0 < results[0][0] < 1
+
+# Test that an exact name scores a similarity of 1
+def test_fuzzy_search_exact(index):
+    assert index.fuzzy_search("Apple")[0] == (1.0, ["Apple", "2", "10"])
+
+# Test that results are ranked and limited to the top k
+def test_fuzzy_search_top_k(index):
+    results = index.fuzzy_search("aple", threshold=0.1, limit=2)
+    assert [row[0] for similarity, row in results] == ["Apple", "Apple Juice"]
+    assert results[0][0] >= results[1][0]
+
+# Test that names below the similarity threshold are left out
+def test_fuzzy_search_threshold(index):
+    assert index.fuzzy_search("xyz") == []
+    assert index.fuzzy_search("bananna", threshold=0.99) == []
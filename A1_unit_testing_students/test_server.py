@@ -0,0 +1,151 @@
+from server import *
+from passwords import verify_password
+import asyncio
+import pytest
+
+# Function to send one command and read the reply, returns (ok, lines)
+async def request(reader, writer, line):
+    writer.write((line + "\n").encode())
+    await writer.drain()
+    status, count = (await reader.readline()).decode().split()
+    lines = [(await reader.readline()).decode().rstrip("\n") for _ in range(int(count))]
+    return status == "OK", lines
+
+# Function to start a server, run the clients against it and stop it
+def run_server(backend, *clients, path=None):
+    async def main():
+        server = ShopServer(backend, workers=4)
+        listener = await server.start(path=path)
+        try:
+            connections = []
+            for client in clients:
+                if path is not None:
+                    connections.append(await asyncio.open_unix_connection(path))
+                else:
+                    connections.append(await asyncio.open_connection(*listener.sockets[0].getsockname()[:2]))
+            return await asyncio.gather(*(client(*connection) for client, connection in zip(clients, connections)))
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+# Test a whole shopping trip over the protocol
+def test_shopping_trip(shop_backend):
+    async def client(reader, writer):
+        assert await request(reader, writer, "ADD 1") == (False, ["Please log in first."])
+        assert await request(reader, writer, "LOGIN Ramanathan wrong") == (False, ["Either username or password were incorrect"])
+        assert await request(reader, writer, "LOGIN Ramanathan Notaproblem23*") == (True, ["Successfully logged in"])
+        ok, lines = await request(reader, writer, "SEARCH salmon")
+        assert ok and lines == ["['Product', 'Price', 'Units']", "['Salmon', '10', '2']"]
+        assert await request(reader, writer, "ADD 20 2") == (True, ["Salmon added to your cart."])
+        assert await request(reader, writer, "CART") == (True, ["['Salmon', 10.0, 2]"] * 2)
+        ok, lines = await request(reader, writer, "CHECKOUT")
+        assert ok and lines[-1] == "Thank you for your purchase, Ramanathan! Your remaining balance is 80.0"
+        assert await request(reader, writer, "LOGOUT") == (True, ["You have been logged out"])
+        assert await request(reader, writer, "FLY") == (False, ["Unknown command FLY"])
+        assert await request(reader, writer, "QUIT") == (True, [])
+    run_server(shop_backend, client)
+    assert shop_backend.get_user("Ramanathan")["wallet"] == 80.0
+
+# Test that checking out an empty cart is reported as a failure
+def test_checkout_empty_cart(shop_backend):
+    async def client(reader, writer):
+        await request(reader, writer, "LOGIN Ramanathan Notaproblem23*")
+        return await request(reader, writer, "CHECKOUT")
+
+    [(ok, lines)] = run_server(shop_backend, client)
+    assert not ok and lines[-1] == "Your basket is empty. Please add items before checking out."
+
+# Test that a backend without a product file lists and searches the products of its inventory
+@pytest.mark.parametrize("shop_backend", ["sqlite"], indirect=True)
+def test_sqlite_products(shop_backend):
+    async def client(reader, writer):
+        ok, lines = await request(reader, writer, "LIST")
+        assert ok and lines[:2] == ["['Product', 'Price', 'Units']", "['Apple', '2', '10']"] and len(lines) == 72
+        await request(reader, writer, "LOGIN Ramanathan Notaproblem23*")
+        await request(reader, writer, "ADD 20 1")
+        await request(reader, writer, "CHECKOUT")
+        assert await request(reader, writer, "SEARCH salmon") == (True, ["['Product', 'Price', 'Units']", "['Salmon', '10', '1']"])
+        ok, lines = await request(reader, writer, "SEARCH salmn")
+        assert ok and lines[1:3] == ["Did you mean:", "['Salmon', '10', '1']"]
+
+    run_server(shop_backend, client)
+
+# Test that two connections buying the last units cannot both get them
+def test_shared_stock(shop_backend):
+    async def first(reader, writer):
+        await request(reader, writer, "LOGIN Ramanathan Notaproblem23*")
+        return await request(reader, writer, "ADD 20 2")
+
+    async def second(reader, writer):
+        await request(reader, writer, "LOGIN Samantha SecurePass123/^")
+        return await request(reader, writer, "ADD 20 1")
+
+    results = run_server(shop_backend, first, second)
+    assert sorted(ok for ok, lines in results) == [False, True]
+
+# Test that server clients buy from the inventory checkoutAndPayment sessions use
+def test_stock_shared_with_sessions(shop_backend):
+    products = get_inventory(shop_backend)
+    salmon = products.get("Salmon")
+    # A terminal session has reserved one of the two salmons
+    assert products.reserve(salmon, 1, object())
+
+    async def client(reader, writer):
+        await request(reader, writer, "LOGIN Ramanathan Notaproblem23*")
+        return await request(reader, writer, "ADD 20 2")
+
+    assert run_server(shop_backend, client) == [(False, ["Sorry, Salmon is out of stock."])]
+
+# Test that two connections of one user both pay, and logging out does not write back an old balance
+def test_same_user_twice(shop_backend):
+    barrier = asyncio.Barrier(2)
+
+    async def client(reader, writer):
+        await request(reader, writer, "LOGIN Ramanathan Notaproblem23*")
+        # Both are logged in before either buys
+        await barrier.wait()
+        await request(reader, writer, "ADD 2")
+        ok, lines = await request(reader, writer, "CHECKOUT")
+        await barrier.wait()
+        await request(reader, writer, "LOGOUT")
+        return ok
+
+    assert run_server(shop_backend, client, client) == [True, True]
+    assert shop_backend.get_user("Ramanathan")["wallet"] == 98.0
+
+# Test that two clients registering the same name at once get one account between them
+def test_register_race(shop_backend):
+    barrier = asyncio.Barrier(2)
+
+    async def client(reader, writer):
+        await barrier.wait()
+        ok, lines = await request(reader, writer, "REGISTER bob Passw0rd!%d" % id(writer))
+        return ok, lines[0]
+
+    results = run_server(shop_backend, client, client)
+    assert sorted(results) == [(False, "That username is not available"), (True, "New user was created!")]
+
+# Test registering a user over a Unix socket, and that a dropped connection ends its session
+def test_register_unix(shop_backend, tmp_path):
+    async def client(reader, writer):
+        assert (await request(reader, writer, "REGISTER Newbie short"))[0] is False
+        ok, lines = await request(reader, writer, "REGISTER Newbie LongEnough!")
+        assert ok and lines == ["New user was created!", "Successfully logged in"]
+        assert (await request(reader, writer, "ADD 1"))[0]
+        writer.close()
+        await writer.wait_closed()
+        await asyncio.sleep(0.05)
+        return len(get_session_manager())
+
+    assert run_server(shop_backend, client, path=str(tmp_path / "shop.sock")) == [0]
+    assert verify_password("LongEnough!", shop_backend.get_user("Newbie")["password"])
+
+# Test that a client guessing passwords is told to wait once the username has no attempts left
+def test_login_rate_limited(shop_backend):
+    async def client(reader, writer):
+        for _ in range(5):
+            assert (await request(reader, writer, "LOGIN Ramanathan wrong"))[0] is False
+        ok, lines = await request(reader, writer, "LOGIN Ramanathan Notaproblem23*")
+        assert not ok and lines[0].startswith("Too many login attempts")
+        await request(reader, writer, "QUIT")
+    run_server(shop_backend, client)
@@ -0,0 +1,115 @@
+from sessions import *
+from checkout_and_payment import Inventory, Product, checkoutAndPayment
+from console import ScriptedConsole
+import pytest
+import threading
+
+@pytest.fixture
+def manager():
+    sessions = SessionManager(idle_timeout=60, max_sessions=3)
+    sessions.now = 0.0
+    sessions.clock = lambda: sessions.now
+    return sessions
+
+@pytest.fixture
+def login_info():
+    return {"username": "TestUser", "wallet": 100}
+
+# Test that every session gets its own user and cart
+def test_separate_carts(manager, login_info):
+    first = manager.create(login_info)
+    second = manager.create({"username": "Other", "wallet": 5})
+    first.cart.add_item(Product("Apple", 2, 10))
+    assert first.session_id != second.session_id
+    assert len(second.cart) == 0
+    assert second.user.name == "Other"
+    assert manager.get(first.session_id) is first
+
+# Test that an idle session is ended and its reservations given back
+def test_idle_session_evicted(manager, login_info):
+    apple = Product("Apple", 2, 10)
+    products = Inventory([apple])
+    session = manager.create(login_info, products)
+    products.reserve(apple, 4, session.cart)
+    session.cart.add_item(apple, 4)
+    manager.now = 59.0
+    assert manager.get(session.session_id) is session
+    manager.now = 119.0
+    assert manager.evict_idle() == 1
+    assert manager.get(session.session_id) is None
+    assert len(session.cart) == 0
+    assert products.available(apple) == 10
+
+# Test that the least recently used session makes room for a new one
+def test_bounded(manager, login_info):
+    sessions = [manager.create(login_info) for _ in range(3)]
+    manager.now = 1.0
+    manager.get(sessions[0].session_id)
+    manager.create(login_info)
+    assert len(manager) == 3
+    assert manager.get(sessions[1].session_id) is None
+    assert manager.get(sessions[0].session_id) is sessions[0]
+
+# Test ending a session, twice
+def test_end(manager, login_info):
+    session = manager.create(login_info)
+    manager.end(session.session_id)
+    manager.end(session.session_id)
+    assert len(manager) == 0
+
+# Test that the shared manager is created once
+def test_shared_manager():
+    reset_session_manager()
+    assert get_session_manager() is get_session_manager()
+    reset_session_manager()
+
+# Test that two shoppers in the same process no longer share a cart
+def test_checkout_and_payment_sessions(shop_backend, mocker, capsys):
+    # The first shopper adds an apple and logs out without buying it
+    mocker.patch("builtins.input", side_effect=["1", "l", "y"])
+    checkoutAndPayment({"username": "Ramanathan", "wallet": 100})
+    # The second shopper's cart starts empty, so logging out asks nothing
+    mocker.patch("builtins.input", side_effect=["l"])
+    checkoutAndPayment({"username": "Samantha", "wallet": 150})
+    assert len(get_session_manager()) == 0
+    assert capsys.readouterr().out.count("Your cart is not empty") == 1
+
+#Console that makes every shopper wait for the others before answering, so the sessions overlap
+class TogetherConsole(ScriptedConsole):
+    def __init__(self, answers, barrier):
+        ScriptedConsole.__init__(self, answers)
+        self.barrier = barrier
+
+    def input(self, prompt=""):
+        self.barrier.wait(timeout=10)
+        return ScriptedConsole.input(self, prompt)
+
+# Function to run shoppers in threads and wait for all of them
+def run_shoppers(shoppers):
+    for shopper in shoppers:
+        shopper.start()
+    for shopper in shoppers:
+        shopper.join()
+
+# Test that two shoppers in separate sessions cannot both buy the last unit
+def test_concurrent_sessions_last_unit(shop_backend):
+    with open(shop_backend.products_file, "w") as file:
+        file.write("Product,Price,Units\nApple,2,1\n")
+    barrier = threading.Barrier(2)
+    consoles = [TogetherConsole(["1", "c", "y", "l"], barrier) for _ in range(2)]
+    run_shoppers([threading.Thread(target=checkoutAndPayment, args=(login_info, console))
+                  for login_info, console in zip([{"username": "Ramanathan", "wallet": 100},
+                                                  {"username": "Samantha", "wallet": 150}], consoles)])
+    transcripts = [console.getvalue() for console in consoles]
+    assert sum("Thank you for your purchase" in transcript for transcript in transcripts) == 1
+    assert sum("Sorry, Apple is out of stock." in transcript for transcript in transcripts) == 1
+
+# Test that logging out does not write back a balance another session of the same user has spent from
+def test_concurrent_sessions_same_user(shop_backend):
+    barrier = threading.Barrier(2)
+    # Both buy a banana for 1.00, logged in with the same starting balance
+    consoles = [TogetherConsole(["2", "c", "y", "l"], barrier) for _ in range(2)]
+    run_shoppers([threading.Thread(target=checkoutAndPayment, args=({"username": "Ramanathan", "wallet": 100}, console))
+                  for console in consoles])
+    assert shop_backend.get_user("Ramanathan")["wallet"] == 98.0
+    assert all("Thank you for your purchase" in console.getvalue() for console in consoles)
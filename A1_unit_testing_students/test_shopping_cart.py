@@ -0,0 +1,71 @@
+from checkout_and_payment import *
+import pytest
+
+@pytest.fixture
+def apple():
+    return Product("Apple", 2, 10)
+
+@pytest.fixture
+def banana():
+    return Product("Banana", 1.5, 15)
+
+# Test adding single units keeps one entry per unit, in order
+def test_add_single_units(apple, banana):
+    cart = ShoppingCart()
+    cart.add_item(apple)
+    cart.add_item(banana)
+    cart.add_item(apple)
+    assert cart.retrieve_item() == [apple, apple, banana]
+    assert cart.quantity(apple) == 2
+    assert len(cart) == 3
+    assert cart.get_total_price() == 5.5
+
+# Test adding many units at once
+def test_bulk_add(apple):
+    cart = ShoppingCart()
+    cart.add_item(apple, 1000)
+    assert len(cart) == 1000
+    assert cart.quantities == {apple: 1000}
+    assert cart.get_total_price() == 2000.0
+
+# Test removing units updates the running total
+def test_remove_units(apple, banana):
+    cart = ShoppingCart()
+    cart.add_item(apple, 3)
+    cart.add_item(banana)
+    cart.remove_item(apple, 2)
+    assert cart.items == [apple, banana]
+    assert cart.get_total_price() == 3.5
+    cart.remove_item(apple)
+    cart.remove_item(banana)
+    assert not cart.items
+    assert cart.get_total_price() == 0.0
+
+# Test removing more units than the cart holds
+def test_remove_missing(apple):
+    cart = ShoppingCart()
+    cart.add_item(apple)
+    with pytest.raises(ValueError):
+        cart.remove_item(apple, 2)
+    assert cart.quantity(apple) == 1
+
+# Test that adding no product or no units changes nothing
+def test_add_nothing(apple):
+    cart = ShoppingCart()
+    cart.add_item(None)
+    cart.add_item(apple, 0)
+    assert len(cart) == 0
+    with pytest.raises(ValueError):
+        cart.add_item(apple, -1)
+
+# Test checking out a bulk cart decrements the stock by the quantity
+def test_checkout_bulk_cart(apple, capfd):
+    products = Inventory([apple])
+    user = User("TestUser", 100)
+    cart = ShoppingCart()
+    cart.add_item(apple, 10)
+    checkout(user, cart, products)
+    assert user.wallet == 80.0
+    assert apple.units == 0
+    assert apple not in products
+    assert len(cart) == 0
@@ -0,0 +1,121 @@
+from snapshot import *
+from checkout_and_payment import load_products, load_products_from_csv
+from storage import FileBackend
+from user_store import UserStore
+import catalog
+import pytest
+import json
+import os
+
+# Samantha's wallet in users_file has cents, which the snapshot must keep
+pytestmark = pytest.mark.users(Samantha={"wallet": 150.25})
+
+@pytest.fixture
+def csv_file(tmp_path):
+    file_path = tmp_path / "products.csv"
+    file_path.write_text("Product,Price,Units\nApple,2,10\nBanana,0.75,15\nCafé au lait,1.10,3\n")
+    return str(file_path)
+
+# Test writing and reading back columns and strings
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "data.snap")
+    assert write_snapshot(path, PRODUCTS, (5, 6), [[1, 2], [-3, 2 ** 40]], ["a", "ü"])
+    columns, strings = read_snapshot(path, PRODUCTS, (5, 6))
+    assert [list(column) for column in columns] == [[1, 2], [-3, 2 ** 40]]
+    assert strings == ["a", "ü"]
+
+# Test that a snapshot of another source version or kind is not used
+def test_stale_or_wrong_kind(tmp_path):
+    path = str(tmp_path / "data.snap")
+    write_snapshot(path, PRODUCTS, (5, 6), [[1]], ["a"])
+    assert read_snapshot(path, PRODUCTS, (5, 7)) is None
+    assert read_snapshot(path, USERS, (5, 6)) is None
+
+# Test that a truncated snapshot is ignored
+def test_damaged(tmp_path):
+    path = str(tmp_path / "data.snap")
+    write_snapshot(path, PRODUCTS, (5, 6), [[1, 2]], ["a", "b"])
+    with open(path, "r+b") as file:
+        file.truncate(os.path.getsize(path) - 1)
+    assert read_snapshot(path, PRODUCTS, (5, 6)) is None
+
+# Test that strings the string table cannot hold are not snapshotted
+def test_nul_in_string(tmp_path):
+    assert not write_snapshot(str(tmp_path / "data.snap"), PRODUCTS, (5, 6), [[1]], ["a\0b"])
+
+# Test that the second load reads the snapshot instead of the CSV file
+def test_products_from_snapshot(csv_file, mocker):
+    first = [product.get_product() for product in load_products_from_csv(csv_file)]
+    assert os.path.exists(snapshot_path(csv_file))
+    catalog._catalogs.clear()
+    spy = mocker.spy(catalog.csv, "reader")
+    products = load_products_from_csv(csv_file)
+    assert spy.call_count == 0
+    assert [product.get_product() for product in products] == first
+    assert first[2] == ["Café au lait", 1.1, 3]
+    assert [product.product_id for product in products] == [0, 1, 2]
+
+# Test that the shop's inventory, loaded through the file backend, also comes from the snapshot
+def test_backend_products_from_snapshot(csv_file, users_file, mocker):
+    backend = FileBackend(users_file, csv_file)
+    first = [product.get_product() for product in load_products(backend)]
+    catalog._catalogs.clear()
+    spy = mocker.spy(catalog.csv, "reader")
+    assert [product.get_product() for product in load_products(backend)] == first
+    assert spy.call_count == 0
+
+# Test that the snapshot is rebuilt when the CSV file changes
+def test_products_rebuilt(csv_file):
+    load_products_from_csv(csv_file)
+    with open(csv_file, "a") as file:
+        file.write("Mango,2.5,4\n")
+    products = load_products_from_csv(csv_file)
+    assert products[3].get_product() == ["Mango", 2.5, 4]
+    catalog._catalogs.clear()
+    assert len(load_products_from_csv(csv_file)) == 4
+
+# Test that the user store loads users from the snapshot once it exists
+def test_users_from_snapshot(users_file, mocker):
+    assert UserStore(users_file).get_user("Samantha")["wallet"] == 150.25
+    assert os.path.exists(snapshot_path(users_file))
+    spy = mocker.spy(json, "load")
+    store = UserStore(users_file)
+    assert store.get_user("Samantha") == {"username": "Samantha", "password": "SecurePass123/^", "wallet": 150.25}
+    assert store.get_user("Ramanathan")["wallet"] == 100
+    assert spy.call_count == 0
+
+# Test that compacting the journal leaves a current snapshot behind
+def test_users_snapshot_after_compact(users_file, mocker):
+    store = UserStore(users_file)
+    store.add_user("Newbie", "Passw0rd!", 5)
+    store.compact()
+    spy = mocker.spy(json, "load")
+    assert UserStore(users_file).get_user("Newbie")["wallet"] == 5
+    assert spy.call_count == 0
+
+# Test that wallets come back from the snapshot exactly as the JSON file has them
+def test_users_snapshot_exact(tmp_path):
+    file_path = tmp_path / "users.json"
+    file_path.write_text(json.dumps([{"username": "A", "password": "B", "wallet": 100},
+                                     {"username": "C", "password": "D", "wallet": 12.5}]))
+    UserStore(str(file_path)).get_user("A")
+    assert os.path.exists(snapshot_path(str(file_path)))
+    wallet = UserStore(str(file_path)).get_user("A")["wallet"]
+    assert wallet == 100 and type(wallet) is int
+    assert UserStore(str(file_path)).get_user("C")["wallet"] == 12.5
+
+# Test that wallets the snapshot would change are read from the JSON file every time
+@pytest.mark.parametrize("wallet", [12.345, "7"])
+def test_users_snapshot_inexact(tmp_path, wallet):
+    file_path = tmp_path / "users.json"
+    file_path.write_text(json.dumps([{"username": "A", "password": "B", "wallet": wallet}]))
+    assert UserStore(str(file_path)).get_user("A")["wallet"] == wallet
+    assert not os.path.exists(snapshot_path(str(file_path)))
+    assert UserStore(str(file_path)).get_user("A")["wallet"] == wallet
+
+# Test that users with extra fields are read from the JSON file every time
+def test_users_extra_fields(tmp_path):
+    file_path = tmp_path / "users.json"
+    file_path.write_text(json.dumps([{"username": "A", "password": "B", "wallet": 1, "email": "a@b"}]))
+    assert UserStore(str(file_path)).get_user("A")["email"] == "a@b"
+    assert not os.path.exists(snapshot_path(str(file_path)))
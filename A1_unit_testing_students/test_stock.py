@@ -0,0 +1,138 @@
+from checkout_and_payment import *
+import threading
+import pytest
+
+@pytest.fixture
+def salmon():
+    return Product("Salmon", 10, 2)
+
+@pytest.fixture
+def products(salmon):
+    inventory = Inventory([salmon, Product("Apple", 2, 10)])
+    inventory.now = 0.0
+    inventory.clock = lambda: inventory.now
+    return inventory
+
+# Test that units reserved by one cart cannot be reserved by another
+def test_reserve(products, salmon):
+    first, second = ShoppingCart(), ShoppingCart()
+    assert products.reserve(salmon, 2, first)
+    assert not products.reserve(salmon, 1, second)
+    assert products.available(salmon, second) == 0
+    assert products.available(salmon, first) == 2
+    assert products.reserved_by(salmon, first) == 2
+
+# Test that reservations are given back once they expire
+def test_reservation_expires(products, salmon):
+    first, second = ShoppingCart(), ShoppingCart()
+    products.reserve(salmon, 2, first, ttl=60)
+    products.now = 59.0
+    assert not products.reserve(salmon, 1, second)
+    products.now = 60.0
+    assert products.reserve(salmon, 1, second)
+    assert products.reserved_by(salmon, first) == 0
+
+# Test that reserving again renews every reservation of the cart
+def test_reservation_renewed(products, salmon):
+    cart = ShoppingCart()
+    apple = products.get("Apple")
+    products.reserve(salmon, 1, cart, ttl=60)
+    products.now = 50.0
+    products.reserve(apple, 1, cart, ttl=60)
+    products.now = 100.0
+    assert products.reserved_by(salmon, cart) == 1
+
+# Test that expire() and release() leave no bookkeeping behind
+def test_release_and_expire(products, salmon):
+    first, second = ShoppingCart(), ShoppingCart()
+    products.reserve(salmon, 1, first, ttl=10)
+    products.reserve(products.get("Apple"), 3, second)
+    products.release(second)
+    products.now = 10.0
+    products.expire()
+    assert products.reservations == {}
+    assert products.held == {}
+
+# Test that checkout uses up the cart's own reservation
+def test_checkout_reserved(products, salmon, capfd):
+    cart = ShoppingCart()
+    products.reserve(salmon, 2, cart)
+    cart.add_item(salmon, 2)
+    user = User("TestUser", 100)
+    checkout(user, cart, products)
+    assert user.wallet == 80.0
+    assert salmon not in products
+    assert products.reservations == {}
+
+# Test that a checkout cannot buy units another cart has reserved
+def test_checkout_only_unreserved(products, salmon, capfd):
+    other = ShoppingCart()
+    products.reserve(salmon, 1, other)
+    cart = ShoppingCart()
+    cart.add_item(salmon, 2)
+    user = User("TestUser", 100)
+    checkout(user, cart, products)
+    assert "only 1 units of Salmon" in capfd.readouterr().out
+    assert user.wallet == 90.0
+    assert salmon.units == 1
+    assert salmon in products
+
+# Test that nothing is charged when nothing in the cart is in stock
+def test_checkout_nothing_in_stock(products, capfd):
+    cart = ShoppingCart()
+    cart.add_item(Product("Mango", 3, 5))
+    user = User("TestUser", 100)
+    checkout(user, cart, products)
+    assert "Mango is out of stock" in capfd.readouterr().out
+    assert user.wallet == 100.0
+    assert len(cart) == 1
+
+# Test that a checkout reads the clock at most once, and not at all without reservations
+def test_checkout_reads_clock_once(products, salmon, capfd):
+    readings = []
+    products.clock = lambda: readings.append(0.0) or 0.0
+    cart = ShoppingCart()
+    cart.add_item(salmon)
+    cart.add_item(products.get("Apple"))
+    checkout(User("TestUser", 100), cart, products)
+    assert readings == []
+    other = ShoppingCart()
+    products.reserve(salmon, 1, other)
+    products.reserve(products.get("Apple"), 1, other)
+    readings.clear()
+    cart.add_item(salmon)
+    cart.add_item(products.get("Apple"))
+    checkout(User("TestUser", 100), cart, products)
+    assert len(readings) == 1
+
+# Test that shoppers buying the same product at the same time never oversell it
+@pytest.mark.parametrize("inventory_class", ["eager", "lazy"])
+def test_no_oversell(inventory_class, tmp_path, capfd):
+    if inventory_class == "eager":
+        products = Inventory([Product("Salmon", 1, 50)])
+    else:
+        path = tmp_path / "products.csv"
+        path.write_text("Product,Price,Units\nSalmon,1,50\n")
+        products = load_products_from_csv(str(path), lazy=True)
+    salmon = products[0]
+    users = [User("User%d" % i, 1000) for i in range(8)]
+    start = threading.Barrier(len(users))
+
+    def shop(user):
+        start.wait()
+        for _ in range(20):
+            cart = ShoppingCart()
+            if products.reserve(salmon, 1, cart):
+                cart.add_item(salmon)
+            cart.add_item(salmon)
+            checkout(user, cart, products)
+
+    threads = [threading.Thread(target=shop, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    spent = sum(1000 - user.wallet for user in users)
+    assert salmon.units == 0
+    assert spent == 50
+    assert salmon not in products
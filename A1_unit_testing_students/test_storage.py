@@ -0,0 +1,114 @@
+from storage import *
+from checkout_and_payment import User, ShoppingCart, checkout, load_products
+from user_store import reset_user_stores
+import pytest
+
+# Runs a test on the shared shop with the SQLite backend
+on_sqlite = pytest.mark.parametrize("shop_backend", ["sqlite"], indirect=True)
+
+# Test that the database runs in WAL mode
+@on_sqlite
+def test_wal_mode(shop_backend):
+    assert shop_backend.connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+# Test looking up imported users
+@on_sqlite
+def test_sqlite_get_user(shop_backend):
+    assert shop_backend.get_user("Ramanathan") == {"username": "Ramanathan", "password": "Notaproblem23*", "wallet": 100}
+    assert shop_backend.get_user("Nobody") is None
+
+# Test creating a user and updating its wallet
+@on_sqlite
+def test_sqlite_add_user_and_wallet(shop_backend):
+    shop_backend.add_user("NewUser", "CorrectPassword!", 0)
+    shop_backend.update_wallet("NewUser", 12.5)
+    assert shop_backend.get_user("NewUser")["wallet"] == 12.5
+
+# Test that a taken username cannot be added again
+@on_sqlite
+def test_sqlite_add_taken_user(shop_backend):
+    assert shop_backend.add_user("Ramanathan", "Other", 0) is None
+    assert shop_backend.get_user("Ramanathan")["password"] == "Notaproblem23*"
+
+# Test that products keep the CSV order and values
+@on_sqlite
+def test_sqlite_products(shop_backend):
+    products = load_products(shop_backend)
+    assert len(products) == 71
+    assert products[0].get_product() == ["Apple", 2.0, 10]
+    assert products.get("Salmon").units == 2
+
+# Test a checkout that debits the wallet and decrements the stock together
+@on_sqlite
+def test_sqlite_checkout(shop_backend, capfd):
+    products = load_products(shop_backend)
+    salmon = products.get("Salmon")
+    cart = ShoppingCart()
+    cart.add_item(salmon)
+    cart.add_item(salmon)
+    user = User("Ramanathan", 100)
+
+    checkout(user, cart, products, shop_backend)
+
+    assert user.wallet == 80.0
+    assert shop_backend.get_user("Ramanathan")["wallet"] == 80.0
+    assert load_products(shop_backend).get("Salmon") is None
+
+# Test that a checkout is rolled back when the stock ran out in another session
+@on_sqlite
+def test_sqlite_checkout_rolled_back(shop_backend, capfd):
+    products = load_products(shop_backend)
+    salmon = products.get("Salmon")
+    banana = products.get("Banana")
+    cart = ShoppingCart()
+    cart.add_item(banana)
+    cart.add_item(salmon)
+    user = User("Ramanathan", 100)
+
+    # Another shopper buys both salmons first
+    shop_backend.connection().execute("UPDATE products SET units = 0 WHERE name = 'Salmon'")
+    checkout(user, cart, products, shop_backend)
+
+    captured = capfd.readouterr()
+    assert "Some items are no longer in stock or your balance has changed." in captured.out
+    assert user.wallet == 100.0
+    assert shop_backend.get_user("Ramanathan")["wallet"] == 100
+    assert load_products(shop_backend).get("Banana").units == 15
+    assert cart.items == [banana, salmon]
+
+# Test that the file backend only persists the wallet
+def test_file_backend_checkout(shop_backend, capfd):
+    products = load_products(shop_backend)
+    cart = ShoppingCart()
+    cart.add_item(products.get("Banana"))
+    user = User("Ramanathan", 100)
+
+    checkout(user, cart, products, shop_backend)
+
+    reset_user_stores()
+    assert shop_backend.get_user("Ramanathan")["wallet"] == 99.0
+    assert load_products(shop_backend).get("Banana").units == 15
+
+# Test that the file backend refuses a purchase of more units than the product has left
+def test_file_backend_checks_stock(shop_backend):
+    salmon = load_products(shop_backend).get("Salmon")
+    assert not shop_backend.commit_checkout("Ramanathan", 1000, {salmon: 3})
+    assert shop_backend.get_user("Ramanathan")["wallet"] == 100
+    assert shop_backend.commit_checkout("Ramanathan", 1000, {salmon: 2})
+    assert shop_backend.get_user("Ramanathan")["wallet"] == 90.0
+
+# Test that the backend can be chosen through the environment, and a new database is filled from the files
+def test_backend_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv(DATABASE_ENV, str(tmp_path / "env.db"))
+    monkeypatch.setattr("storage._backend", None)
+    backend = get_backend()
+    assert isinstance(backend, SQLiteBackend)
+    assert backend.get_user("Ramanathan")["wallet"] == 100
+    assert len(load_products(backend)) == 71
+    backend.update_wallet("Ramanathan", 50)
+    backend.close()
+    # Opened again, the database keeps its own data
+    monkeypatch.setattr("storage._backend", None)
+    backend = get_backend()
+    assert backend.get_user("Ramanathan")["wallet"] == 50
+    backend.close()
@@ -0,0 +1,150 @@
+from user_store import *
+import pytest
+import json
+import os
+
+# Every test gets a fresh set of cached stores (users_file and fresh_user_store are in conftest.py)
+pytestmark = pytest.mark.usefixtures("fresh_user_store")
+
+# Test looking up an existing user
+def test_get_existing_user(users_file):
+    store = UserStore(users_file)
+    assert store.get_user("Samantha") == {"username": "Samantha", "password": "SecurePass123/^", "wallet": 150}
+
+# Test looking up a user that does not exist
+def test_get_missing_user(users_file):
+    store = UserStore(users_file)
+    assert store.get_user("Nobody") is None
+
+# Test that the file is only parsed once while it is unchanged
+def test_file_loaded_once(users_file, mocker):
+    store = UserStore(users_file)
+    spy = mocker.spy(json, "load")
+    store.get_user("Ramanathan")
+    store.get_user("Samantha")
+    store.get_user("Nobody")
+    assert spy.call_count == 1
+
+# Test that the store reloads when the file changes on disk
+def test_reload_after_file_change(users_file):
+    store = UserStore(users_file)
+    assert store.get_user("Maximus") is None
+
+    with open(users_file, "w") as file:
+        json.dump([{"username": "Maximus", "password": "StrongPwd!23", "wallet": 75}], file)
+    # Make sure the modification time differs even on coarse filesystem clocks
+    stat = os.stat(users_file)
+    os.utime(users_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert store.get_user("Maximus")["wallet"] == 75
+    assert store.get_user("Ramanathan") is None
+
+# Test that a duplicated username resolves to the first entry
+def test_duplicate_username_keeps_first(tmp_path):
+    file_path = tmp_path / "users.json"
+    file_path.write_text(json.dumps([
+        {"username": "Leo", "password": "First!Pass1", "wallet": 1},
+        {"username": "Leo", "password": "Second!Pass2", "wallet": 2},
+    ]))
+    store = UserStore(str(file_path))
+    assert store.get_user("Leo")["wallet"] == 1
+
+# Test adding a user appends it to the journal instead of rewriting the snapshot
+def test_add_user(users_file):
+    with open(users_file) as file:
+        snapshot = file.read()
+    store = UserStore(users_file)
+    store.add_user("NewUser", "CorrectPassword!", 0)
+
+    assert store.get_user("NewUser")["wallet"] == 0
+    with open(users_file) as file:
+        assert file.read() == snapshot
+    with open(users_file + ".journal") as file:
+        assert [json.loads(line)["username"] for line in file] == ["NewUser"]
+
+# Test that adding a taken username fails, also when another store added it meanwhile
+def test_add_taken_user(users_file):
+    store = UserStore(users_file)
+    other = UserStore(users_file)
+    assert other.add_user("NewUser", "FirstPassword!", 0) is not None
+    assert store.add_user("NewUser", "SecondPassword!", 0) is None
+    assert store.add_user("Samantha", "SecondPassword!", 0) is None
+    assert store.get_user("NewUser")["password"] == "FirstPassword!"
+    assert store.add_users([{"username": "A", "password": "x", "wallet": 0},
+                            {"username": "A", "password": "y", "wallet": 0},
+                            {"username": "NewUser", "password": "z", "wallet": 0}]) == ["A"]
+    assert store.get_user("A")["password"] == "x"
+
+# Test that a new store replays journaled users and wallet changes
+def test_journal_replayed(users_file):
+    store = UserStore(users_file)
+    store.add_user("NewUser", "CorrectPassword!", 0)
+    store.update_wallet("NewUser", 25)
+    store.update_wallet("Samantha", 140.5)
+
+    other = UserStore(users_file)
+    assert other.get_user("NewUser")["wallet"] == 25
+    assert other.get_user("Samantha")["wallet"] == 140.5
+
+# Test that records appended by another store are picked up without a full reload
+def test_concurrent_sessions_see_appends(users_file, mocker):
+    first = UserStore(users_file)
+    second = UserStore(users_file)
+    first.refresh()
+    second.refresh()
+
+    spy = mocker.spy(json, "load")
+    first.add_user("NewUser", "CorrectPassword!", 0)
+    assert second.get_user("NewUser") is not None
+    assert spy.call_count == 0
+
+# Test that a record torn by a crash is ignored and does not swallow the next record
+def test_torn_journal_record(users_file):
+    with open(users_file + ".journal", "w") as file:
+        file.write('{"op": "add", "username": "Half')
+    store = UserStore(users_file)
+    assert store.get_user("Half") is None
+
+    store.add_user("NewUser", "CorrectPassword!", 0)
+    assert UserStore(users_file).get_user("NewUser") is not None
+
+# Test that compaction folds the journal into the snapshot
+def test_compact(users_file):
+    store = UserStore(users_file)
+    store.add_user("NewUser", "CorrectPassword!", 0)
+    store.update_wallet("Ramanathan", 42)
+    store.compact()
+
+    assert os.path.getsize(users_file + ".journal") == 0
+    with open(users_file) as file:
+        data = json.load(file)
+    assert [entry["username"] for entry in data] == ["Ramanathan", "Samantha", "NewUser"]
+    assert data[0]["wallet"] == 42
+    assert UserStore(users_file).get_user("NewUser") is not None
+
+# Test that the journal is compacted automatically once it is long enough
+def test_automatic_compaction(users_file):
+    store = UserStore(users_file, compact_every=3)
+    store.update_wallet("Ramanathan", 1)
+    store.update_wallet("Ramanathan", 2)
+    assert store.journal_records == 2
+    store.update_wallet("Ramanathan", 3)
+
+    assert store.journal_records == 0
+    with open(users_file) as file:
+        assert json.load(file)[0]["wallet"] == 3
+
+# Test that a store notices another store compacting the journal
+def test_compaction_by_other_store(users_file):
+    first = UserStore(users_file)
+    second = UserStore(users_file)
+    first.add_user("NewUser", "CorrectPassword!", 0)
+    assert second.get_user("NewUser") is not None
+
+    first.compact()
+    first.update_wallet("NewUser", 7)
+    assert second.get_user("NewUser")["wallet"] == 7
+
+# Test that the shared store is reused for the same file
+def test_get_user_store_shared(users_file):
+    assert get_user_store(users_file) is get_user_store(users_file)
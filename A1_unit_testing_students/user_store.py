@@ -0,0 +1,234 @@
+import json
+import os
+import threading
+from atomic import atomic_write, lock_file, unlock_file
+from snapshot import read_user_snapshot, write_user_snapshot
+
+# Compact the journal back into the snapshot after this many records
+COMPACT_EVERY = 1000
+
+# Function to get the modification time and size of a file, or None if it is missing
+def file_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+#In-memory user database indexed by username
+#The JSON file is a snapshot; new users and wallet changes are appended to a
+#JSON-lines journal next to it and folded back into the snapshot by compact()
+class UserStore:
+    def __init__(self, file_path, compact_every=COMPACT_EVERY):
+        self.file_path = file_path
+        self.journal_path = file_path + ".journal"
+        self.compact_every = compact_every
+        self.users = {}
+        self.signature = None
+        self.journal_offset = 0
+        self.journal_records = 0
+        # Serializes threads sharing the store; other processes are kept apart by the file locks
+        self.lock = threading.RLock()
+
+    # Method to (re)load the snapshot and journal, only reading what changed
+    def refresh(self):
+        signature = file_signature(self.file_path)
+        if signature is None:
+            raise FileNotFoundError(self.file_path)
+        if signature != self.signature:
+            # The binary snapshot is used while it matches the JSON file, else it is rebuilt
+            users = read_user_snapshot(self.file_path, signature)
+            if users is None:
+                with open(self.file_path, "r") as file:
+                    data = json.load(file)
+                users = {}
+                for entry in data:
+                    # Keep the first entry for a username, like the old linear scan did
+                    users.setdefault(entry["username"], entry)
+                write_user_snapshot(self.file_path, signature, users)
+            self.users = users
+            self.signature = signature
+            self.journal_offset = 0
+            self.journal_records = 0
+        self.replay_journal()
+
+    # Method to apply journal records appended since the last read
+    def replay_journal(self):
+        journal_signature = file_signature(self.journal_path)
+        if journal_signature is None:
+            self.journal_offset = 0
+            self.journal_records = 0
+            return
+        size = journal_signature[1]
+        if size < self.journal_offset:
+            # The journal was compacted by someone else, start over from the snapshot
+            self.signature = None
+            self.refresh()
+            return
+        if size == self.journal_offset:
+            return
+        with open(self.journal_path, "rb") as file:
+            file.seek(self.journal_offset)
+            chunk = file.read()
+        # A line without a newline is a write still in progress (or torn by a crash)
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            self.apply(record)
+            self.journal_records += 1
+        self.journal_offset += end
+
+    # Method to apply a single journal record to the index
+    def apply(self, record):
+        if record["op"] == "add":
+            self.users[record["username"]] = {"username": record["username"],
+                                              "password": record["password"],
+                                              "wallet": record["wallet"]}
+        elif record["op"] == "wallet":
+            entry = self.users.get(record["username"])
+            if entry is not None:
+                entry["wallet"] = record["wallet"]
+        elif record["op"] == "password":
+            entry = self.users.get(record["username"])
+            if entry is not None:
+                entry["password"] = record["password"]
+
+    # Method to append records to the journal in a single write
+    def append(self, records):
+        with open(self.journal_path, "ab") as file:
+            lock_file(file, exclusive=False)
+            try:
+                self.write_records(file, records)
+            finally:
+                unlock_file(file)
+        self.appended()
+
+    # Method to write records to the journal file, opened for appending and locked by the caller
+    def write_records(self, file, records):
+        data = "".join(json.dumps(record) + "\n" for record in records).encode()
+        # Start on a fresh line if a previous writer crashed mid-record
+        if file.tell() > 0:
+            with open(self.journal_path, "rb") as reader:
+                reader.seek(-1, os.SEEK_END)
+                if reader.read(1) != b"\n":
+                    data = b"\n" + data
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+    # Method to catch up after writing to the journal, compacting it when it has grown long
+    def appended(self):
+        # Pick up our own records (and any written concurrently by other sessions)
+        self.replay_journal()
+        if self.journal_records >= self.compact_every:
+            self.compact()
+
+    # Method to look up a user record by username
+    def get_user(self, username):
+        with self.lock:
+            self.refresh()
+            return self.users.get(username)
+
+    # Method to add a new user by appending it to the journal
+    # Returns the new entry, or None if the username is taken
+    def add_user(self, username, password, wallet=0):
+        with self.lock:
+            if not self.add_users([{"username": username, "password": password, "wallet": wallet}]):
+                return None
+            return self.users[username]
+
+    # Method to add many new users, as entries like get_user() returns, in one journal write
+    # Usernames that are taken are left out, an existing user is never replaced
+    # Returns the usernames that were added
+    def add_users(self, entries):
+        with self.lock:
+            with open(self.journal_path, "ab") as journal:
+                # Exclusive, so no other process adds a user between the check and the write
+                lock_file(journal, exclusive=True)
+                try:
+                    self.refresh()
+                    records = []
+                    added = set()
+                    for entry in entries:
+                        username = entry["username"]
+                        if username in self.users or username in added:
+                            continue
+                        added.add(username)
+                        records.append({"op": "add", "username": username, "password": entry["password"],
+                                        "wallet": entry["wallet"]})
+                    if records:
+                        self.write_records(journal, records)
+                finally:
+                    unlock_file(journal)
+            if records:
+                self.appended()
+            return [record["username"] for record in records]
+
+    # Method to record a new wallet balance for a user
+    def update_wallet(self, username, wallet):
+        with self.lock:
+            self.refresh()
+            self.append([{"op": "wallet", "username": username, "wallet": wallet}])
+
+    # Method to record many new wallet balances, as username -> wallet, in one journal write
+    def update_wallets(self, wallets):
+        with self.lock:
+            self.refresh()
+            self.append([{"op": "wallet", "username": username, "wallet": wallet}
+                         for username, wallet in wallets.items()])
+
+    # Method to replace the stored password (hash) of a user
+    def set_password(self, username, password):
+        self.set_passwords({username: password})
+
+    # Method to replace many stored passwords, as username -> password, in one journal write
+    def set_passwords(self, passwords):
+        with self.lock:
+            self.refresh()
+            self.append([{"op": "password", "username": username, "password": password}
+                         for username, password in passwords.items()])
+
+    # Method to fold the journal into a new snapshot and empty the journal
+    def compact(self):
+        with self.lock:
+            with open(self.journal_path, "ab") as journal:
+                lock_file(journal, exclusive=True)
+                try:
+                    self.refresh()
+                    # The journal lock already keeps other writers out
+                    with atomic_write(self.file_path) as file:
+                        file.write("[\n")
+                        file.write(",\n".join("  " + json.dumps(entry) for entry in self.users.values()))
+                        file.write("\n]\n")
+                    # Records are idempotent, so a crash between these two steps only replays them again
+                    journal.truncate(0)
+                    journal.flush()
+                    os.fsync(journal.fileno())
+                finally:
+                    unlock_file(journal)
+            self.signature = file_signature(self.file_path)
+            write_user_snapshot(self.file_path, self.signature, self.users)
+            self.journal_offset = 0
+            self.journal_records = 0
+
+# One store per user file, shared by every login in the process
+_stores = {}
+_stores_lock = threading.Lock()
+
+# Function to get the shared store for a user file
+def get_user_store(file_path):
+    key = os.path.abspath(file_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = UserStore(file_path)
+            _stores[key] = store
+        return store
+
+# Function to drop all cached stores (used by tests)
+def reset_user_stores():
+    with _stores_lock:
+        _stores.clear()